@@ -0,0 +1,43 @@
+import contextlib
+import io
+import time
+
+import core.simple_logging as simple_logging
+
+
+def quiet():
+    """
+    Turns off verbose and timing output the same way run_test.py does when verbose output is not requested
+    :return: None
+    """
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+
+def make_env(description, generics=None):
+    """
+    Creates, instantiates and starts test environment. UML output of scheme is suppressed
+    :param description: test environment description (path to file or string with description itself)
+    :param generics: test environment generics
+    :return: TestEnv instance with all platforms running
+    """
+    from core.testenv import TestEnv
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=description, generics=generics)
+    env.instantiate()
+    env.start_platforms()
+    return env
+
+
+def measure(f, *args, **kwargs):
+    """
+    Calls f and measures elapsed time
+    :return: tuple with f's return value and elapsed time in seconds
+    """
+    start_time = time.perf_counter()
+    r = f(*args, **kwargs)
+    return r, time.perf_counter() - start_time
+
+
+def report(name, count, elapsed, unit="messages"):
+    print("{:<48} {:>10} {} in {:.3f}s: {:>12.0f} {}/sec".format(name, count, unit, elapsed, count / elapsed, unit))
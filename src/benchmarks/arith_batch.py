@@ -0,0 +1,72 @@
+h = """
+usage: python -m benchmarks.arith_batch [<operations>] [<batch>] [<port>]
+
+Measures arith operations that are made with scalar requests (one request per
+operation) and with batch requests (sum_batch with array.array operands, one
+request per batch). Mocked calc platform, which is checked by arith scoreboard,
+is compared with calc platform that uses example Calc App (comealongs/calc/calc.py)
+via line framed TcpIO, where whole batch is sent with single write.
+
+  operations - amount of arith operations. Default: 10000
+  batch      - amount of operations per batch. Default: 1000
+  port       - TCP port for Calc App. Default: 30061
+"""
+
+import sys
+from array import array
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.tcpio_calc import calc_env, run_calc_app
+from core.platformix_core import new_message
+
+
+mocked_env = 'test_env:\n  - name: "arith batch"\n    calc:\n      - name: "calc_if"\n        mock: 1\n' \
+             '    scoreboard:\n      - name: "calc_sb"\n        rules: "ip.arith.scoreboard_arith_all"\n' \
+             '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+             '        res:\n          channel: "@calc_if"\n          interface: "arith"\n'
+
+
+def bench_batches(env, name, operations, batch):
+    a = array("i", (i % 1000 for i in range(operations)))
+    b = array("i", (i % 7 for i in range(operations)))
+
+    def run_scalar():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", a[i], b[i])) is True, "Operation failed"
+
+    def run_batch():
+        for i in range(0, operations, batch):
+            assert env.transaction("@calc_if", new_message("arith", "sum_batch", a[i:i + batch], b[i:i + batch])) \
+                is True, "Batch failed"
+
+    report("{}, scalar requests".format(name), operations, measure(run_scalar)[1], "operations")
+    report("{}, {} operations per batch".format(name, batch), operations, measure(run_batch)[1], "operations")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 10000
+    batch = 1000
+    port = 30061
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        batch = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        port = int(sys.argv[3])
+    quiet()
+
+    env = make_env(mocked_env)
+    bench_batches(env, "mocked calc", operations, batch)
+    sb = env.farm.expose_data().platforms["calc_sb"]
+    assert sb.success == operations + (operations + batch - 1) // batch and len(sb.errors) == 0, \
+        "Scoreboard should accept all results"
+    env.stop_platforms()
+
+    app = run_calc_app(port)
+    env = make_env(calc_env(port, "line"))
+    bench_batches(env, "calc app, line framed", operations // 10, batch)
+    env.stop_platforms()
+    app.wait(5.0)
@@ -0,0 +1,47 @@
+h = """
+usage: python -m benchmarks.conversation_log [<runs>]
+
+Measures memory held by channels conversation logs after constrained random
+run of mocked calc for every conversation retention policy
+
+  runs  - amount of requests issued by sequencer. Default: 5000
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.messages import _calc_crt_env
+from core.platformix_core import pref, new_message
+
+
+def bench_retention(runs, retention, release_completed):
+    pref.conversation_retention = retention
+    pref.release_completed_threads = release_completed
+    gc.collect()
+    tracemalloc.start()
+    env = make_env(_calc_crt_env)
+    r, elapsed = measure(env.transaction, "#sequencer", new_message("sequencer", "run", runs))
+    assert r is True, "Sequencer run failed"
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    kept = sum(len(c.conversation_log.threads) for c in env.farm._channels.values())
+    env.stop_platforms()
+    name = "{}{}".format(retention, ", release completed" if release_completed else "")
+    report(name, runs, elapsed, "ops")
+    print("  conversations kept: {}, memory held: {:.1f} MiB".format(kept, held / 2**20))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    runs = 5000
+    if len(sys.argv) > 1:
+        runs = int(sys.argv[1])
+    quiet()
+    for retention, release_completed in (("full", False), ("ring", False), ("failures", False),
+                                         ("ring", True), ("failures", True)):
+        bench_retention(runs, retention, release_completed)
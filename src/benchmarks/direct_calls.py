@@ -0,0 +1,48 @@
+h = """
+usage: python -m benchmarks.direct_calls [<operations>]
+
+Measures arith operations on calc platform which does requests to it's parent
+(mocked TcpIO) on parent's personal channel. Requests that are passed directly
+to parent (see PlatformsFarm.direct_call) are compared with requests that are
+sent via channel. Synchronous and asyncio farms are measured.
+
+  operations - amount of arith operations. Default: 5000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import pref, new_message
+
+
+stack_env = 'test_env:\n  - name: "direct calls"\n    tcpio:\n      - name: "calc_tcpio"\n        port: 0\n' \
+            '        host: "127.0.0.1"\n        mock: 1\n        mock_eval: 1\n' \
+            '    calc:\n      - name: "calc_if"\n        platform: "calc_tcpio"\n        io_interface: "stream_io"\n'
+
+
+def bench_stack(operations, mode, direct):
+    pref.asyncio = mode == "asyncio"
+    pref.direct_calls = direct
+    env = make_env(stack_env)
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+    report("{} farm, {}".format(mode, ["via channel", "direct calls"][direct]), operations, measure(run)[1],
+           "operations")
+    env.stop_platforms()
+    pref.asyncio = False
+    pref.direct_calls = True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 5000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    quiet()
+    for mode in ("sync", "asyncio"):
+        for direct in (False, True):
+            bench_stack(operations, mode, direct)
@@ -0,0 +1,60 @@
+h = """
+usage: python -m benchmarks.fake_ops [<operations>] [<fakes>]
+
+Measures arith operations on mocked calc platform while fake-op instructions
+(see fake_op_message) are registered on calc's channel. Instructions are faking
+replies to 'div' only, so each 'sum' operation is checked against head
+instruction but isn't faked. Operations without registered instructions are
+measured for reference. Also measures matching itself - incoming 'sum' message
+is checked against instructions (dry run, see
+PlatformProtocolCore._fake_next_op) without processing.
+
+  operations - amount of arith operations. Default: 10000
+  fakes      - amount of registered instructions. Default: 1000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import new_message, fake_op_message, proto_failure, TalkContext
+
+
+calc_env = 'test_env:\n  - name: "fake ops"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+
+def bench_fakes(operations, fakes):
+    env = make_env(calc_env)
+    if fakes > 0:
+        info = fake_op_message("arith", proto_failure("Faked div"), on_message=new_message("arith", "div", 1, 0))
+        assert env.transaction("@calc_if", new_message("arith", "__testing__", "fake_next_op",
+                                                       [info.args[1]] * fakes)) is True, "Fakes weren't registered"
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+    def run_matching():
+        for i in range(operations):
+            protocol._fake_next_op(context, message, dry_run=True)
+
+    report("{} fake-op instructions".format(fakes), operations, measure(run)[1], "operations")
+    protocol = env.farm.expose_data().platforms["calc_if"]._protocols["arith"]
+    context = TalkContext("@calc_if", 0, "arith")
+    message = new_message("arith", "sum", 1, 2).replace(sender="__root__")
+    report("{} fake-op instructions, matching only".format(fakes), operations * 10,
+           measure(lambda: [run_matching() for i in range(10)])[1], "messages")
+    env.stop_platforms()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 10000
+    fakes = 1000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        fakes = int(sys.argv[2])
+    quiet()
+    bench_fakes(operations, 0)
+    bench_fakes(operations, fakes)
@@ -0,0 +1,69 @@
+h = """
+usage: python -m benchmarks.farm_async [<platforms count>] [<transactions>]
+
+Compares sequential synchronous transactions with awaitable transactions
+on asyncio driven farm. Awaitable transactions are issued all at once
+(with asyncio.gather) to independent platforms so they are in progress
+concurrently. Also measures awaitable requests issued by a platform.
+
+  platforms count - amount of platforms in environment. Default: 100
+  transactions    - amount of transactions. Default: 2000
+"""
+
+import asyncio
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.farm_scheduler import flat_env
+from core.platformix_core import pref, new_message
+
+
+def bench_sync(count, transactions):
+    pref.asyncio = False
+    env = make_env(flat_env(count))
+    message = new_message("platformix", "get", "running")
+
+    def run():
+        for i in range(transactions):
+            assert env.transaction("@p{}".format(i % count), message) is True, "Transaction failed"
+    report("sequential transactions, {} platforms".format(count), transactions, measure(run)[1], "transactions")
+    env.stop_platforms()
+
+
+def bench_async(count, transactions):
+    pref.asyncio = True
+    env = make_env(flat_env(count))
+    message = new_message("platformix", "get", "running")
+
+    async def run():
+        r = await asyncio.gather(*[env.transaction_async("@p{}".format(i % count), message)
+                                   for i in range(transactions)])
+        assert all(r), "Transaction failed"
+    report("awaitable transactions, {} platforms".format(count), transactions,
+           measure(asyncio.run, run())[1], "transactions")
+
+    requester = env.farm._platforms["p0"]
+
+    async def run_requests():
+        r = await asyncio.gather(*[requester.request_async(message, channel="@p{}".format(1 + i % (count - 1)))
+                                   for i in range(transactions)])
+        assert all(requester._request_state_is_success(s) for s in r), "Request failed"
+    report("awaitable requests, {} platforms".format(count), transactions,
+           measure(asyncio.run, run_requests())[1], "requests")
+    env.stop_platforms()
+    pref.asyncio = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    count = 100
+    transactions = 2000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        transactions = int(sys.argv[2])
+    quiet()
+    bench_sync(count, transactions)
+    bench_async(count, transactions)
@@ -0,0 +1,108 @@
+h = """
+usage: python -m benchmarks.farm_bridge [<transactions>] [<port>]
+
+Runs test environment distributed across two farms on localhost. Mocked calc
+is hosted by farm in child process while scoreboard and transactions are in
+main process. Channel '@calc_if' is mirrored between farms by a bridge.
+Compares with the same environment within single farm. Transactions are
+issued sequentially and then all at once on asyncio farm so messages are
+batched by bridge.
+
+  transactions - amount of transactions. Default: 1000
+  port         - TCP port for bridge. Default: 30021
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_bridge import FarmBridge
+from core.platformix_core import pref, new_message
+
+calc_env = 'test_env:\n  - name: "bridged calc"\n' \
+           '    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+checker_env = 'scoreboard:\n      - name: "calc_sb"\n        rules: "ip.arith.scoreboard_arith_all"\n' \
+              '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+              '        res:\n          channel: "@calc_if"\n          interface: "arith"\n'
+
+front_env = 'test_env:\n  - name: "bridge front"\n    ' + checker_env
+
+single_env = calc_env + '    ' + checker_env
+
+
+def serve_calc(port, authkey):
+    """
+    Hosts mocked calc and serves it over bridge until connection is closed
+    """
+    quiet()
+    env = make_env(calc_env)
+    FarmBridge.listen(env.farm, port, ["@calc_if"], authkey, node=0).serve()
+
+
+def requests(transactions):
+    return [new_message("arith", "sum", i, i % 7) for i in range(transactions)]
+
+
+def check(env, transactions):
+    r = env.transaction("#scoreboard", new_message("platformix", "get", "scoreboard"), more_info=True)
+    assert all(m.kwargs["scoreboard"]["success"] == transactions for m in r["replies"].values()), \
+        "Scoreboard hasn't checked all requests"
+
+
+def bench_single(transactions):
+    env = make_env(single_env)
+
+    def run():
+        for m in requests(transactions):
+            assert env.transaction("@calc_if", m) is True, "Transaction failed"
+    report("single farm", transactions, measure(run)[1], "transactions")
+    check(env, transactions)
+    env.stop_platforms()
+
+
+def bench_bridged(transactions, port, awaitable):
+    authkey = os.urandom(16)
+    server = multiprocessing.get_context("fork").Process(target=serve_calc, args=(port, authkey), daemon=True)
+    server.start()
+    pref.asyncio = awaitable
+    env = make_env(front_env)
+    bridge = FarmBridge.connect(env.farm, port, ["@calc_if"], authkey, node=1)
+
+    def run():
+        for m in requests(transactions):
+            assert env.transaction("@calc_if", m) is True, "Transaction failed"
+
+    async def run_async():
+        r = await asyncio.gather(*[env.transaction_async("@calc_if", m) for m in requests(transactions)])
+        assert all(r), "Transaction failed"
+
+    if awaitable:
+        elapsed = measure(asyncio.run, run_async())[1]
+    else:
+        elapsed = measure(run)[1]
+    report("bridged farms, {}".format(["sequential", "awaitable"][awaitable]), transactions, elapsed, "transactions")
+    print("  {} records in {} frames".format(bridge.records, bridge.frames))
+    check(env, transactions)
+    env.stop_platforms()
+    bridge.close()
+    server.join(5.0)
+    pref.asyncio = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    transactions = 1000
+    port = 30021
+    if len(sys.argv) > 1:
+        transactions = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        port = int(sys.argv[2])
+    quiet()
+    bench_single(transactions)
+    bench_bridged(transactions, port, False)
+    bench_bridged(transactions, port + 1, True)
@@ -0,0 +1,87 @@
+h = """
+usage: python -m benchmarks.farm_processes [<scoreboards count>] [<runs>] [<cost>]
+
+Compares scoreboards hosted by farm's process with scoreboards hosted by
+child processes (marked with 'process: True'). Sequencer issues requests to
+mocked calc while scoreboards check them with CPU heavy reference model
+(model burns <cost> loop iterations per command). Transaction is completed
+when all scoreboards have processed all commands and responses.
+
+  scoreboards count - amount of scoreboards. Default: 4
+  runs              - amount of requests issued by sequencer. Default: 200
+  cost              - reference model's cost per command. Default: 20000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import new_message
+from ip.arith.scoreboard_arith_all import ScoreboardArithAll
+
+
+class Scoreboard(ScoreboardArithAll):
+    """
+    Arith scoreboard with expensive reference model
+    """
+
+    def __init__(self, host, cost=20000, **kwargs):
+        super(Scoreboard, self).__init__(host, **kwargs)
+        self._cost = cost
+
+    def cmd(self, context, message):
+        x = 0
+        for i in range(self._cost):
+            x += i * i
+        return super(Scoreboard, self).cmd(context, message)
+
+
+def scoreboards_env(count, runs, cost, process):
+    """
+    :param count: amount of scoreboards
+    :param runs: amount of requests issued by sequencer
+    :param cost: reference model's cost per command
+    :param process: True if scoreboards should be hosted by child processes
+    :return: test environment description
+    """
+    d = 'test_env:\n  - name: "farm processes benchmark"\n' \
+        '    calc:\n      - name: "calc_if"\n        mock: 1\n' \
+        '    sequencer:\n      - name: "calc_seq"\n        platform: "calc_if"\n        runs: {}\n' \
+        '        expr: "[\'arith\', \'sum\', rand(2).randint(-99,99), rand(3).randint(-9,9)]"\n' \
+        '    scoreboard:\n'.format(runs)
+    for i in range(count):
+        d += '      - name: "sb{}"\n        process: {}\n        rules: "benchmarks.farm_processes"\n' \
+             '        rules_kwargs:\n          cost: {}\n' \
+             '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+             '        res:\n          channel: "@calc_if"\n          interface: "arith"\n'.format(i, process, cost)
+    return d
+
+
+def bench_scoreboards(count, runs, cost, process):
+    env = make_env(scoreboards_env(count, runs, cost, process))
+    r, elapsed = measure(env.transaction, "#sequencer", new_message("sequencer", "run"))
+    assert r is True, "Sequencer run failed"
+    r = env.transaction("#scoreboard", new_message("platformix", "get", "scoreboard"), more_info=True)
+    assert all(m.kwargs["scoreboard"]["success"] == runs for m in r["replies"].values()), \
+        "Scoreboards haven't checked all requests"
+    env.stop_platforms()
+    env.farm.close_processes()
+    report("{} scoreboards, {}".format(count, ["farm's process", "child processes"][process]),
+           runs, elapsed, "requests")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    count = 4
+    runs = 200
+    cost = 20000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        runs = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        cost = int(sys.argv[3])
+    quiet()
+    bench_scoreboards(count, runs, cost, False)
+    bench_scoreboards(count, runs, cost, True)
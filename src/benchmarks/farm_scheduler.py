@@ -0,0 +1,47 @@
+h = """
+usage: python -m benchmarks.farm_scheduler [<platforms count 1>] [<platforms count 2>] ...
+
+Measures cost of messages processing with many idle platforms in the farm.
+Test environment issues transactions to a single platform through it's
+personal channel while all other platforms have nothing to do.
+
+  platforms count - amount of platforms in environment. Default: 10 1000 10000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import new_message
+
+
+def flat_env(count):
+    """
+    :param count: amount of platforms
+    :return: test environment description with independent platforms
+    """
+    platforms = ['        - name: "p{}"'.format(i) for i in range(count)]
+    return 'test_env:\n  - name: "farm scheduler benchmark"\n    platforms:\n      platformix:\n{}\n'.format(
+        '\n'.join(platforms))
+
+
+def bench_transactions(count, transactions):
+    env = make_env(flat_env(count))
+    message = new_message("platformix", "get", "running")
+
+    def run():
+        for _ in range(transactions):
+            assert env.transaction("@p0", message) is True, "Transaction failed"
+    report("transactions with {} platforms".format(count), transactions, measure(run)[1], "transactions")
+    env.stop_platforms()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    counts = [int(c) for c in sys.argv[1:]]
+    if len(counts) == 0:
+        counts = [10, 1000, 10000]
+    quiet()
+    for c in counts:
+        bench_transactions(c, 2000)
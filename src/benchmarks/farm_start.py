@@ -0,0 +1,47 @@
+h = """
+usage: python -m benchmarks.farm_start [<platforms count 1>] [<platforms count 2>] ...
+
+Measures time to start and stop generated environment of platformix platforms.
+Platforms are organized into binary tree (each platform is hosted by parent
+platform) so most of platforms are waiting for others on start and on stop.
+
+  platforms count - amount of platforms in environment. Default: 100 500 1000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+
+
+def tree_env(count):
+    """
+    :param count: amount of platforms
+    :return: test environment description with platforms organized into binary tree
+    """
+    platforms = []
+    for i in range(count):
+        if i == 0:
+            platforms.append('        - name: "p{}"'.format(i))
+        else:
+            platforms.append('        - name: "p{}"\n          platform: "p{}"'.format(i, (i - 1) // 2))
+    return 'test_env:\n  - name: "farm start benchmark"\n    platforms:\n      platformix:\n{}\n'.format(
+        '\n'.join(platforms))
+
+
+def bench_start_stop(count):
+    env, elapsed = measure(make_env, tree_env(count))
+    report("start (incl. instantiation) {} platforms".format(count), count, elapsed, "platforms")
+    elapsed = measure(env.stop_platforms)[1]
+    report("stop {} platforms".format(count), count, elapsed, "platforms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    counts = [int(c) for c in sys.argv[1:]]
+    if len(counts) == 0:
+        counts = [100, 500, 1000]
+    quiet()
+    for c in counts:
+        bench_start_stop(c)
@@ -0,0 +1,74 @@
+h = """
+usage: python -m benchmarks.farm_threads [<DUTs count>] [<runs>]
+
+Compares single-threaded and multithreaded farm on independent DUTs.
+For each DUT a comealongs/calc app is launched and connected over TCP
+(host -> tcpio -> calc, with own sequencer). All sequencers are run with a
+single transaction. In single-threaded mode DUTs are served one by one, in
+multithreaded mode they progress concurrently while tcpio platforms are
+blocked in socket calls.
+
+  DUTs count    - amount of independent DUTs. Default: 4
+  runs          - amount of requests issued by each sequencer. Default: 50
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import pref, new_message
+
+_base_port = 30101
+
+
+def duts_env(count, runs):
+    """
+    :param count: amount of DUTs
+    :param runs: amount of requests issued by each sequencer
+    :return: test environment description
+    """
+    d = 'test_env:\n  - name: "farm threads benchmark"\n    host:\n      - name: "calc_host"\n' \
+        '        host: "127.0.0.1"\n'
+    for kind, fmt in (
+            ("tcpio", '      - name: "tcpio{0}"\n        platform: "calc_host"\n        port: {1}\n'
+                      '        timeout: 0.01\n'),
+            ("calc", '      - name: "calc{0}"\n        platform: "tcpio{0}"\n        io_interface: "stream_io"\n'),
+            ("sequencer", '      - name: "seq{0}"\n        platform: "calc{0}"\n        runs: {2}\n'
+                          '        expr: "[\'arith\', \'sum\', rand(2).randint(-99,99), rand(3).randint(-9,9)]"\n')):
+        d += '    {}:\n'.format(kind) + ''.join(fmt.format(i, _base_port + i, runs) for i in range(count))
+    return d
+
+
+def bench_duts(count, runs, multithreading):
+    pref.multithreading = multithreading
+    env = make_env(duts_env(count, runs))
+    r, elapsed = measure(env.transaction, "#sequencer", new_message("sequencer", "run"))
+    assert r is True, "Sequencers run failed"
+    env.stop_platforms()
+    report("{} DUTs, {}".format(count, ["single thread", "multithreading"][multithreading]),
+           count * runs, elapsed, "ops")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    count = 4
+    runs = 50
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        runs = int(sys.argv[2])
+    quiet()
+    calc = os.path.join(os.path.dirname(__file__), "..", "comealongs", "calc", "calc.py")
+    apps = [subprocess.Popen([sys.executable, calc, str(_base_port + i), "0"], stderr=subprocess.DEVNULL)
+            for i in range(count)]
+    try:
+        time.sleep(0.5)
+        bench_duts(count, runs, False)
+        bench_duts(count, runs, True)
+    finally:
+        for a in apps:
+            a.kill()
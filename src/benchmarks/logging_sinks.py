@@ -0,0 +1,87 @@
+h = """
+usage: python -m benchmarks.logging_sinks [<operations>] [<path>]
+
+Measures arith operations on mocked calc platform which is driven via TcpIO
+(mocked) with verbose and timing output turned off, directed into file with
+print, and directed into file by BufferedSink (see simple_logging) that is
+written by background thread. Verbose output of test environment (messages
+printing by channels) is turned on in verbose modes, like run_test.py does
+with -v option. Also measures lazy logging call (vlog) versus vprint with
+formatted message when verbose output is off.
+
+  operations - amount of arith operations. Default: 5000
+  path       - path of log file. Default: .bench.log
+"""
+
+import contextlib
+import io
+import sys
+
+import core.simple_logging as simple_logging
+from benchmarks._bench_helper import quiet, measure, report
+from benchmarks.direct_calls import stack_env
+from core.platformix_core import new_message
+
+
+def make_verbose_env(description, verbose):
+    from core.testenv import TestEnv
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=description, verbose=verbose)
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def bench_sink(operations, path, sink):
+    if sink is None:
+        quiet()
+        vf = None
+    else:
+        vf = open(path, "w") if sink == "print" else simple_logging.BufferedSink(path)
+
+        def to_file(*args, **kwargs):
+            kwargs["file"] = vf
+            print(*args, **kwargs)
+        simple_logging.vprint_worker = to_file
+        simple_logging.tprint_worker = to_file
+    env = make_verbose_env(stack_env, sink is not None)
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+        if vf is not None:
+            vf.close()  # NOTE: BufferedSink writes remaining text on close so it's measured too
+    report("verbose output {}".format({None: "off", "print": "into file", "sink": "into BufferedSink"}[sink]),
+           operations, measure(run)[1], "operations")
+    quiet()
+    env.stop_platforms()
+
+
+def bench_lazy(calls):
+    quiet()
+    name = "calc_if"
+
+    def run_vprint():
+        for i in range(calls):
+            simple_logging.vprint("{} is waiting for reply on {}:{}".format(name, "@calc_tcpio", i))
+
+    def run_vlog():
+        for i in range(calls):
+            simple_logging.vlog("{} is waiting for reply on {}:{}", name, "@calc_tcpio", i)
+    report("output off, vprint with formatted message", calls, measure(run_vprint)[1], "calls")
+    report("output off, vlog", calls, measure(run_vlog)[1], "calls")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 5000
+    path = ".bench.log"
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        path = sys.argv[2]
+    for sink in (None, "print", "sink"):
+        bench_sink(operations, path, sink)
+    bench_lazy(operations * 100)
@@ -0,0 +1,63 @@
+h = """
+usage: python -m benchmarks.mailboxes [<operations>] [<capacity>]
+
+Measures batch of arith transactions that are sent all at once to calc platform
+which makes nested request to it's parent (mocked TcpIO) for each operation.
+Unbounded mailboxes are compared with bounded ones (see
+PlatformixPreferecenes.mailbox_policies). With "block" policy batch respects
+backpressure, so calc's mailbox peak stays at capacity and all operations are
+completed. Batch that ignores backpressure is measured with "reject" and
+"drop_oldest" policies. Peak amount of queued messages, amounts of rejected and
+dropped requests and amount of completed operations are shown. Peak is counted
+for bounded mailboxes only. Failed transactions are reported into stderr.
+
+  operations - amount of arith operations. Default: 5000
+  capacity   - mailbox capacity. Default: 64
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.direct_calls import stack_env
+from core.platformix_core import pref, new_message
+
+
+def bench_mailbox(operations, capacity, policy):
+    pref.direct_calls = False
+    pref.mailbox_capacity = capacity
+    pref.mailbox_overflow = policy
+    env = make_env(stack_env)
+    calc = env.farm.expose_data().platforms["calc_if"]
+    if policy != "block":
+        env.farm.congested = lambda channel, message: False     # Backpressure is ignored
+    results = {}
+
+    def run():
+        results.update(env.transactions("@calc_if",
+                                        [new_message("arith", "sum", i, i % 7) for i in range(operations)],
+                                        in_flight=None))
+    report("unbounded" if capacity is None else "capacity {}, {}".format(capacity, policy), operations,
+           measure(run)[1], "operations")
+    print("  mailbox {}, completed {}".format(
+        ", ".join("{} {}".format(k, v) for k, v in calc.mailbox_stats.items()),
+        sum(1 for r in results["results"] if r is True)))
+    env.stop_platforms()
+    pref.direct_calls = True
+    pref.mailbox_capacity = None
+    pref.mailbox_overflow = "block"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 5000
+    capacity = 64
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        capacity = int(sys.argv[2])
+    quiet()
+    bench_mailbox(operations, None, "block")
+    for policy in pref.mailbox_policies:
+        bench_mailbox(operations, capacity, policy)
@@ -0,0 +1,80 @@
+h = """
+usage: python -m benchmarks.messages [<runs>]
+
+Measures PlatformMessage handling throughput:
+ * message hop - parsing of already received message as it's done by every
+   platform on receive
+ * reply - creating success reply and passing it through a hop
+ * calc crt - constrained random run of mocked calc through whole platforms
+   farm (sequencer -> calc -> scoreboard)
+
+  runs  - amount of requests issued by sequencer for calc crt. Default: 2000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import PlatformMessage as PM, new_message
+import core.platformix_core as platformix_core
+
+
+_calc_crt_env = """
+test_env:
+  - name: "calc crt benchmark"
+    calc:
+      - name: "calc_if"
+        mock: 1
+    sequencer:
+      - name: "calc_seq"
+        platform: "calc_if"
+        expr: "['arith', ['sum','sub','mult','div','power'][rand(1).randint(0,4)], rand(2).randint(-99,99), rand(3).randint(-9,9)]"
+    scoreboard:
+      - name: "calc_sb"
+        rules: "ip.arith.scoreboard_arith_all"
+        cmd:
+          channel: "@calc_if"
+          interface: "arith"
+        res:
+          channel: "@calc_if"
+          interface: "arith"
+"""
+
+
+def bench_hop(count):
+    m = new_message("arith", "sum", 1, 2, tag={"seq": [1, 2, 3]})
+
+    def run():
+        for _ in range(count):
+            PM.parse(m)
+    report("message hop", count, measure(run)[1])
+
+
+def bench_reply(count):
+    def run():
+        for i in range(count):
+            PM.parse(PM.success({"value": i, "history": [i, i]}, None))
+    report("reply", count, measure(run)[1])
+
+
+def bench_calc_crt(runs):
+    env = make_env(_calc_crt_env)
+    first = next(platformix_core._mc)
+    r, elapsed = measure(env.transaction, "#sequencer", new_message("sequencer", "run", runs))
+    assert r is True, "Sequencer run failed"
+    deliveries = next(platformix_core._mc) - first
+    env.stop_platforms()
+    report("calc crt (arith ops)", runs, elapsed, "ops")
+    report("calc crt (channel deliveries)", deliveries, elapsed)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    runs = 2000
+    if len(sys.argv) > 1:
+        runs = int(sys.argv[1])
+    quiet()
+    bench_hop(200000)
+    bench_reply(200000)
+    bench_calc_crt(runs)
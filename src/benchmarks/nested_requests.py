@@ -0,0 +1,61 @@
+h = """
+usage: python -m benchmarks.nested_requests [<operations>]
+
+Measures batch of arith transactions on calc platform which makes nested request
+to it's parent (mocked TcpIO) for each operation. All transactions are sent at
+once, so calc's queue is as long as the batch. Requests that are received by calc
+while it waits for replies are deferred (see PlatformBase.process_queued_messages)
+so stack depth is bounded regardless of batch size. Max stack depth within calc's
+handler is shown. Direct calls are disabled so each request goes via channel.
+
+  operations - amount of arith operations. Default: 5000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.direct_calls import stack_env
+from core.platformix_core import pref, new_message
+
+
+def bench_nested(operations, mode):
+    pref.asyncio = mode == "asyncio"
+    pref.multithreading = mode == "multithreading"
+    pref.direct_calls = False
+    env = make_env(stack_env)
+    calc = env.farm.expose_data().platforms["calc_if"]
+    depth = [0]
+    calculate = calc.calculate
+
+    def probe(*args, **kwargs):
+        f = sys._getframe()
+        d = 0
+        while f is not None:
+            d += 1
+            f = f.f_back
+        depth[0] = max(depth[0], d)
+        return calculate(*args, **kwargs)
+
+    calc.calculate = probe
+
+    def run():
+        assert env.transactions("@calc_if", [new_message("arith", "sum", i, i % 7) for i in range(operations)],
+                                in_flight=None)["result"] is True, "Operations failed"
+    report("{} farm".format(mode), operations, measure(run)[1], "operations")
+    print("  max stack depth {}".format(depth[0]))
+    env.stop_platforms()
+    pref.asyncio = False
+    pref.multithreading = False
+    pref.direct_calls = True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 5000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    quiet()
+    for mode in ("sync", "multithreading", "asyncio"):
+        bench_nested(operations, mode)
@@ -0,0 +1,49 @@
+h = """
+usage: python -m benchmarks.notify_modes [<operations>]
+
+Measures arith operations on mocked calc platform with each of protocols
+notify modes ("all", "coalesce", "drop", see PlatformProtocolCore.notify_modes).
+In "all" mode notify is sent before each reply, so each operation takes two
+messages deliveries on channel. Amount of deliveries per operation and farm's
+notifies statistics are shown.
+
+  operations - amount of arith operations. Default: 10000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import pref, new_message
+
+
+calc_env = 'test_env:\n  - name: "notify modes"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+
+def bench_notify(operations, mode):
+    pref.notify = mode
+    env = make_env(calc_env)
+    log = env.farm.expose_data().channels["@calc_if"].conversation_log
+    log.clear()
+    stats = env.farm.notify_stats()
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+    report("notify mode '{}'".format(mode), operations, measure(run)[1], "operations")
+    print("  {:.1f} deliveries per operation on @calc_if, notifies: {}".format(
+        sum(len(log.records(t)) for t in log.threads) / operations,
+        ", ".join("{} {}".format(k, v - stats[k]) for k, v in env.farm.notify_stats().items())))
+    env.stop_platforms()
+    pref.notify = "all"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 10000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    quiet()
+    for mode in ("all", "coalesce", "drop"):
+        bench_notify(operations, mode)
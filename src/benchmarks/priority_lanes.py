@@ -0,0 +1,54 @@
+h = """
+usage: python -m benchmarks.priority_lanes [<operations>]
+
+Sends batch of arith transactions to mocked calc platform all at once and then
+platformix 'get' request to the same platform, so control request is queued
+behind data backlog. Since messages are processed by priority lanes (see
+PlatformMessage.lanes) control request is served before the backlog. Amount of
+arith operations that were completed before 'get' was served is shown (order of
+replies is observed with a tap, see Tap) as well as whole batch throughput.
+Synchronous, multithreading and asyncio farms are measured.
+
+  operations - amount of arith operations. Default: 5000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import pref, new_message, Tap
+
+
+calc_env = 'test_env:\n  - name: "priority lanes"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+
+def bench_lanes(operations, mode):
+    pref.asyncio = mode == "asyncio"
+    pref.multithreading = mode == "multithreading"
+    env = make_env(calc_env)
+    replies = []
+    tap = Tap("replies", replies.extend, [("arith", "__reply__"), ("platformix", "__reply__")])
+    env.farm.add_tap(tap, "@calc_if")
+    messages = [new_message("arith", "sum", i, i % 7) for i in range(operations)] + \
+        [new_message("platformix", "get", "running")]
+
+    def run():
+        assert env.transactions("@calc_if", messages, in_flight=None)["result"] is True, "Transactions failed"
+    report("{} farm".format(mode), operations, measure(run)[1], "operations")
+    served = [r.message.interface for r in replies if r.message.is_success]
+    print("  'get' served after {} of {} arith operations".format(served.index("platformix"), operations))
+    env.farm.remove_tap(tap, "@calc_if")
+    env.stop_platforms()
+    pref.asyncio = False
+    pref.multithreading = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 5000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    quiet()
+    for mode in ("sync", "multithreading", "asyncio"):
+        bench_lanes(operations, mode)
@@ -0,0 +1,51 @@
+h = """
+usage: python -m benchmarks.reply_timeouts [<handlers>] [<polls>]
+
+Measures polling of platform's waiting state (PlatformBase.waiting_reply)
+while platform has many registered reply handlers. Farm that handles reply
+waits timeouts with timers is compared with multithreading farm, which has no
+timers so deadlines of all handlers are checked on each poll.
+
+  handlers - amount of registered reply handlers. Default: 1000
+  polls    - amount of polls. Default: 2000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.farm_scheduler import flat_env
+from core.platformix_core import pref
+
+
+def bench_polls(handlers, polls, threaded):
+    pref.multithreading = threaded
+    env = make_env(flat_env(2))
+    p = env.farm.expose_data().platforms["p0"]
+    contexts = [p.start_conversation("@p1", "platformix") for i in range(handlers)]
+    for c in contexts:
+        p._register_reply_handler(c, p._default_request_handler, [], {}, timeout=60.0)
+
+    def run():
+        for i in range(polls):
+            assert p.waiting_reply, "Platform should be waiting for replies"
+    report("{} handlers, {}".format(handlers, ["timers", "polled deadlines"][threaded]), polls, measure(run)[1],
+           "polls")
+    for c in contexts:
+        p._unregister_reply_handler(c, True, {}, dont_check=True)
+    env.stop_platforms()
+    pref.multithreading = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    handlers = 1000
+    polls = 2000
+    if len(sys.argv) > 1:
+        handlers = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        polls = int(sys.argv[2])
+    quiet()
+    bench_polls(handlers, polls, False)
+    bench_polls(handlers, polls, True)
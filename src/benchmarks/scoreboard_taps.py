@@ -0,0 +1,62 @@
+h = """
+usage: python -m benchmarks.scoreboard_taps [<operations>]
+
+Measures arith operations on mocked calc platform which is checked by arith
+scoreboard and gathered by arith coverage. Scoreboard and coverage observe
+calc's channel with taps (see Tap). Tap with capacity 1 checks each message as
+soon as it's sent, like a subscriber would do, while bigger taps check messages
+in batches, when transaction is ended or buffer is full. Operations without
+observers are measured for reference.
+
+  operations - amount of arith operations. Default: 10000
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import new_message
+
+
+calc_env = 'test_env:\n  - name: "scoreboard taps"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+
+def observers_env(capacity):
+    return calc_env + \
+        '    scoreboard:\n      - name: "calc_sb"\n        rules: "ip.arith.scoreboard_arith_all"\n' \
+        '        clean_completed: 1\n        tap_capacity: {0}\n' \
+        '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+        '        res:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+        '    coverage:\n      - name: "calc_cov"\n        rules: "ip.arith.coverage_arith_all"\n' \
+        '        tap_capacity: {0}\n        channel: "@calc_if"\n        interface: "arith"\n'.format(capacity)
+
+
+def bench_taps(operations, capacity):
+    env = make_env(calc_env if capacity is None else observers_env(capacity))
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+
+    def run_batch():
+        assert env.transactions("@calc_if", [new_message("arith", "sum", i, i % 7) for i in range(operations)])[
+            "result"] is True, "Operations failed"
+
+    name = "no observers" if capacity is None else "tap capacity {}".format(capacity)
+    report("{}, transaction per operation".format(name), operations, measure(run)[1], "operations")
+    report("{}, batch of transactions".format(name), operations, measure(run_batch)[1], "operations")
+    if capacity is not None:
+        sb = env.farm.expose_data().platforms["calc_sb"].scoreboard
+        assert sb["success"] == operations * 2 and sb["errors"] == 0, "Scoreboard should accept all results"
+    env.stop_platforms()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 10000
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    quiet()
+    for capacity in (None, 1, 1000):
+        bench_taps(operations, capacity)
@@ -0,0 +1,90 @@
+h = """
+usage: python -m benchmarks.tcpio_calc [<operations>] [<port>]
+
+Runs example Calc App (comealongs/calc/calc.py) and measures arith operations
+that are made via calc platform and TcpIO with stream and line framed modes.
+In stream mode each response is received until socket timeout (0.01s) while in
+framed mode receive is ended as soon as response line is received. Calc's
+separate send and receive requests are compared with single transact request
+and amount of messages deliveries on TcpIO's channel per operation is shown.
+Also measures expressions that are pipelined by TcpIO.tcp_transact in framed
+mode.
+
+  operations - amount of arith operations. Default: 200
+  port       - TCP port for Calc App. Default: 30051
+"""
+
+import subprocess
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from core.platformix_core import new_message
+
+
+def calc_env(port, framing):
+    return 'test_env:\n  - name: "tcpio calc"\n    host:\n      - name: "calc_host"\n        host: "127.0.0.1"\n' \
+           '    tcpio:\n      - name: "calc_tcpio"\n        platform: "calc_host"\n' \
+           '        port: {}\n        timeout: 0.01\n        framing: {}\n        send_on_stop:\n          - "exit"\n' \
+           '    calc:\n      - name: "calc_if"\n        platform: "calc_tcpio"\n        io_interface: "stream_io"\n' \
+           ''.format(port, '"{}"'.format(framing) if framing is not None else "null")
+
+
+def run_calc_app(port):
+    return subprocess.Popen([sys.executable, "-m", "comealongs.calc.calc", str(port), "0"],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def bench_operations(operations, port, framing, transact):
+    app = run_calc_app(port)
+    env = make_env(calc_env(port, framing))
+    calc = env.farm.expose_data().platforms["calc_if"]
+    assert calc._io_transact, "TcpIO is expected to support transact"
+    calc._io_transact = transact
+    log = env.farm.expose_data().channels["@calc_tcpio"].conversation_log
+    log.clear()
+
+    def run():
+        for i in range(operations):
+            assert env.transaction("@calc_if", new_message("arith", "sum", i, i % 7)) is True, "Operation failed"
+    report("calc platform, {}, {}".format("stream" if framing is None else framing + " framed",
+                                          ["send and receive", "transact"][transact]),
+           operations, measure(run)[1], "operations")
+    print("  {:.1f} deliveries per operation on @calc_tcpio".format(
+        sum(len(log.records(t)) for t in log.threads) / operations))
+    env.stop_platforms()
+    app.wait(5.0)
+
+
+def bench_pipelined(operations, port, batch):
+    app = run_calc_app(port)
+    env = make_env(calc_env(port, "line"))
+    io = env.farm.expose_data().platforms["calc_tcpio"]
+    expressions = ["{}+{}".format(i, i % 7) for i in range(operations)]
+
+    def run():
+        for i in range(0, operations, batch):
+            r = io.tcp_transact(expressions[i:i + batch])
+            assert r.success and r.retval == [str(j + j % 7) for j in range(i, min(i + batch, operations))], \
+                "Transaction failed"
+    report("tcp_transact, {} expressions per transaction".format(batch), operations, measure(run)[1], "operations")
+    env.stop_platforms()
+    app.wait(5.0)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    operations = 200
+    port = 30051
+    if len(sys.argv) > 1:
+        operations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        port = int(sys.argv[2])
+    quiet()
+    bench_operations(operations, port, None, False)
+    bench_operations(operations, port + 1, None, True)
+    bench_operations(operations * 10, port + 2, "line", False)
+    bench_operations(operations * 10, port + 3, "line", True)
+    for batch in (1, 16, 256):
+        bench_pipelined(operations * 10, port + 4, batch)
@@ -0,0 +1,91 @@
+h = """
+usage: python -m benchmarks.tcpio_stream [<frame size>] [<frames>] [<rounds>] [<port>]
+
+Measures TcpIO throughput on loopback. Batch of frames is sent with single
+tcp_send call to echo server, then echoed data is received with single
+tcp_receive call. Text mode (str frames, received data is decoded) is compared
+with binary mode (bytes frames, received data isn't decoded).
+
+  frame size - size of a frame in bytes. Default: 4096
+  frames     - amount of frames per batch. Default: 64
+  rounds     - amount of batches. Default: 200
+  port       - TCP port for echo server. Default: 30031
+"""
+
+import socket
+import sys
+import threading
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+
+
+def echo_server(port):
+    """
+    Starts thread that accepts single connection and sends back everything it receives
+    :return: listening socket
+    """
+    server = socket.create_server(("127.0.0.1", port))
+
+    def serve():
+        conn = server.accept()[0]
+        buffer = bytearray(1 << 20)
+        with conn:
+            while True:
+                n = conn.recv_into(buffer)
+                if n == 0:
+                    return
+                conn.sendall(memoryview(buffer)[:n])
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server
+
+
+def tcpio_env(port):
+    return 'test_env:\n  - name: "tcpio stream"\n    host:\n      - name: "echo_host"\n        host: "127.0.0.1"\n' \
+           '    tcpio:\n      - name: "echo_io"\n        platform: "echo_host"\n' \
+           '        port: {}\n        timeout: 0.1\n'.format(port)
+
+
+def bench_stream(frame_size, frames, rounds, port, binary):
+    server = echo_server(port)
+    env = make_env(tcpio_env(port))
+    io = env.farm.expose_data().platforms["echo_io"]
+    if binary:
+        batch = [bytes(range(256)) * (frame_size // 256) + bytes(frame_size % 256)] * frames
+        decode = None
+    else:
+        batch = ["0123456789abcdef" * (frame_size // 16) + "-" * (frame_size % 16)] * frames
+        decode = 'UTF-8'
+
+    def run():
+        for i in range(rounds):
+            assert io.tcp_send(batch).success, "Send failed"
+            r = io.tcp_receive(frame_size * frames, decode=decode)
+            assert r.success and len(r.retval) == frame_size * frames, "Receive failed"
+
+    elapsed = measure(run)[1]
+    report("{} mode, {} x {} bytes frames".format(["text", "binary"][binary], frames, frame_size),
+           rounds * frames * frame_size, elapsed, "bytes")
+    env.stop_platforms()
+    server.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    frame_size = 4096
+    frames = 64
+    rounds = 200
+    port = 30031
+    if len(sys.argv) > 1:
+        frame_size = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        rounds = int(sys.argv[3])
+    if len(sys.argv) > 4:
+        port = int(sys.argv[4])
+    quiet()
+    bench_stream(frame_size, frames, rounds, port, False)
+    bench_stream(frame_size, frames, rounds, port + 1, True)
@@ -0,0 +1,56 @@
+h = """
+usage: python -m benchmarks.testenv_transactions [<platforms count>] [<transactions>]
+
+Compares sequential transactions (TestEnv.transaction) with batched
+transactions (TestEnv.transactions) with different amount of transactions in
+progress at once. Transactions are issued to platforms' personal channels in
+round robin order with single personal channel per batch.
+
+  platforms count - amount of platforms in environment. Default: 16
+  transactions    - amount of transactions per platform. Default: 500
+"""
+
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.farm_scheduler import flat_env
+from core.platformix_core import new_message
+
+
+def bench_sequential(env, count, transactions):
+    message = new_message("platformix", "get", "running")
+
+    def run():
+        for i in range(count):
+            for j in range(transactions):
+                assert env.transaction("@p{}".format(i), message) is True, "Transaction failed"
+    report("sequential transactions", count * transactions, measure(run)[1], "transactions")
+
+
+def bench_batched(env, count, transactions, in_flight):
+    messages = [new_message("platformix", "get", "running")] * transactions
+
+    def run():
+        for i in range(count):
+            r = env.transactions("@p{}".format(i), messages, in_flight=in_flight)
+            assert r["result"] is True and len(r["results"]) == transactions, "Transactions failed"
+    report("batched transactions, {} in flight".format("all" if in_flight is None else in_flight),
+           count * transactions, measure(run)[1], "transactions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    count = 16
+    transactions = 500
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        transactions = int(sys.argv[2])
+    quiet()
+    env = make_env(flat_env(count))
+    bench_sequential(env, count, transactions)
+    for in_flight in (1, 16, None):
+        bench_batched(env, count, transactions, in_flight)
+    env.stop_platforms()
@@ -0,0 +1,71 @@
+h = """
+usage: python -m benchmarks.virtual_clock [<requests>] [<timeout>]
+
+Measures requests that are never replied so they are completed by timeout.
+Requests are sent one by one and each is waited until it's timeouted. Farm's
+wall clock is compared with virtual clock, which moves time straight to the
+nearest timeout when farm is idle, on synchronous, multithreading and asyncio
+farms.
+
+  requests - amount of requests. Default: 20
+  timeout  - requests timeout in seconds. Default: 0.1
+"""
+
+import asyncio
+import sys
+
+from benchmarks._bench_helper import quiet, make_env, measure, report
+from benchmarks.farm_scheduler import flat_env
+from core.platformix_core import pref, new_message
+
+
+def bench_timeouts(requests, timeout, mode, virtual):
+    pref.multithreading = mode == "multithreading"
+    pref.asyncio = mode == "asyncio"
+    pref.virtual_clock = virtual
+    env = make_env(flat_env(2))
+    p = env.farm.expose_data().platforms["p0"]
+    message = new_message("nosuch", "call")     # NOTE: p1 doesn't support interface so request is never replied
+    states = []
+
+    def run():
+        for i in range(requests):
+            c = p.request(message, None, [], {}, channel="@p1", timeout=timeout)
+            while p.waiting_reply_on(c, None):   # NOTE: farm could handle timeout on later passes
+                env.farm.settle()
+                env.farm.clock.sleep(0.001)
+            states.append(p._pop_request_state(c))
+
+    async def run_async():
+        for i in range(requests):
+            states.append(await p.request_async(message, channel="@p1", timeout=timeout))
+
+    if mode == "asyncio":
+        elapsed = measure(asyncio.run, run_async())[1]
+    else:
+        elapsed = measure(run)[1]
+    assert len(states) == requests and all(s is not None and s["__success__"] is False for s in states), \
+        "All requests should be failed by timeout"
+    report("{} farm, {} clock".format(mode, ["wall", "virtual"][virtual]), requests, elapsed, "timeouts")
+    if virtual:
+        print("  {:.3f} s of farm's time".format(env.farm.clock.now()))
+    env.stop_platforms()
+    pref.multithreading = False
+    pref.asyncio = False
+    pref.virtual_clock = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '-h':
+        print(h)
+        exit(0)
+    requests = 20
+    timeout = 0.1
+    if len(sys.argv) > 1:
+        requests = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        timeout = float(sys.argv[2])
+    quiet()
+    for mode in ("sync", "multithreading", "asyncio"):
+        for virtual in (False, True):
+            bench_timeouts(requests, timeout, mode, virtual)
@@ -47,6 +47,7 @@ class Calc(object):
             if self._debug:
                 print("{0:.7f}:".format(time())+" Opening connection...", file=sys.stderr)
             conn.settimeout(0.1)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)   # Results are sent as soon as they are ready
             t = Thread(target=handler, args=[conn])
             t.daemon = True
             t.start()
@@ -76,6 +77,7 @@ class Calc(object):
         :return: Nothing
         """
         print("{0:.7f}:".format(time())+" Started tcpio thread...", file=sys.stderr)
+        pending = b""
         while not self._stop:
             try:
                 buffer = conn.recv(1024)
@@ -90,6 +92,15 @@ class Calc(object):
                 except:
                     pass
                 break
+            if len(buffer) > 0:
+                # NOTE: expressions that are sent back to back could be split between reads.
+                #       If read is full then incomplete last line is kept until the rest of it is received
+                full = len(buffer) == 1024
+                buffer = pending + buffer
+                pending = b""
+                if full and not buffer.endswith(b"\n"):
+                    last = buffer.rfind(b"\n") + 1
+                    buffer, pending = buffer[:last], buffer[last:]
             if len(buffer) > 0:
                 if self._debug:
                     print("{0:.7f}:".format(time())+" Got request, processing", file=sys.stderr)
@@ -125,6 +136,8 @@ class Calc(object):
         if len(data) > 0:
             data = data.decode('UTF-8').strip().split('\n')
             for line in data:
+                if line.strip() == "":  # NOTE: empty lines are skipped so expressions could be sent with delimiters
+                    continue
                 result.append(self.handle_request(line, quiet=True))
                 if self._stop:
                     break
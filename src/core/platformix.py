@@ -1,9 +1,10 @@
 from core.platformix_core import pref
 from core.platformix_core import proto_success
-from core.platformix_core import PlatformMessage as PM, TalkContext
+from core.platformix_core import PlatformMessage as PM
 from ip.platformix.definitions import PlatformixProtocol, PlatformixWrapper
-from core.simple_logging import vprint, eprint
-import time
+from core.simple_logging import vprint, vlog, eprint
+import threading
+from collections import deque
 
 
 class PlatformBase(object):
@@ -22,7 +23,8 @@ class PlatformBase(object):
     and only with total understanding of PlatformBase Class and it's role in whole system
     """
 
-    def __init__(self, name, farm, base_platform=None, platform=None, wait=None):
+    def __init__(self, name, farm, base_platform=None, platform=None, wait=None, mailbox_capacity=None,
+                 mailbox_overflow=None):
         """
         Inits platform
         During init setups necessary binding with co-operating platforms
@@ -32,6 +34,9 @@ class PlatformBase(object):
         :param base_platform: Name of Package in which Wrapper Class is contained (used for Information)
         :param  platform: a Name of Platform which hosts this very Platform (i.e. Parent Platform)
         :param wait: list with Names of Platforms that should be started before this one
+        :param mailbox_capacity: max amount of queued messages. If None then pref.mailbox_capacity is used
+        :param mailbox_overflow: what is done when mailbox is full (see PlatformixPreferecenes.mailbox_policies).
+                                 If None then pref.mailbox_overflow is used
         """
         self._farm = farm
         self._base_platform = base_platform
@@ -71,10 +76,32 @@ class PlatformBase(object):
 
         self._wait_reply_from = {}  # Map with context to wait reply on as a key
                                     # and callback function with args as a value
+        self._polled_timeouts = 0   # Amount of handlers which timeouts are polled (if farm has no timers)
         self._request_end_state = {}  # Map with request's context as key and requests completition results as value
-        self._receive_queue = []    # When message is received it's put in this queue
-        self._messages_queue = []   # Received messages are transfered into this queue before processing
-                                    # by queue_received_messages method
+        self._request_futures = {}  # Map with request's context as key and future to resolve on request completition
+                                    # as value. Used by request_async
+        self._receive_queue = deque()   # When message is received it's put in this queue
+        # and platform is enlisted into farm's ready queue
+        self._receive_lock = threading.Lock()  # Protects receive queue since messages could come from other threads
+        self._lanes = tuple(deque() for _ in PM.lanes)   # Received messages are transfered into these queues
+                                    # by queue_received_messages method. Queue per priority lane (see PM.lanes)
+        self._deferred = tuple(deque() for _ in PM.lanes)    # Requests that were queued already when platform
+                                    # started to wait for replies within processing (see process_queued_messages)
+        self._processing = False    # True while queued messages are processed
+        self._barrier = None        # Amount of messages in each lane that were queued before processed message
+                                    # were taken. None if they are deferred already or if there were none
+        if mailbox_capacity is None:
+            mailbox_capacity = pref.mailbox_capacity
+        if mailbox_overflow is None:
+            mailbox_overflow = pref.mailbox_overflow
+        assert mailbox_capacity is None or (isinstance(mailbox_capacity, int) and mailbox_capacity > 0), \
+            "mailbox_capacity should be positive integer or None"
+        assert mailbox_overflow in pref.mailbox_policies, "Unknown mailbox overflow policy '{}'. " \
+                                                          "Expected one of {}".format(mailbox_overflow,
+                                                                                      pref.mailbox_policies)
+        self._mailbox_capacity = mailbox_capacity   # Max amount of queued messages. If None then unbounded
+        self._mailbox_overflow = mailbox_overflow   # Mailbox overflow policy
+        self._mailbox_stats = {"peak": 0, "rejected": 0, "dropped": 0}
         self._protocols = {}        # Protocols map. Key is interface name and value is protocol implementation instance
 
         self.platformix = PlatformixWrapper.get_wrapper(self, "_")  # Self's private properties and methods
@@ -92,6 +119,7 @@ class PlatformBase(object):
         assert protocol.name not in self._protocols, "Protocol with name {} is already supported by {}".format(
             protocol.name, self.name)
         self._protocols[protocol.name] = protocol
+        self._farm.reroute(self)
 
     @property
     def name(self):
@@ -100,6 +128,13 @@ class PlatformBase(object):
         """
         return self._name
 
+    @property
+    def farm(self):
+        """
+        :return: Platform's farm
+        """
+        return self._farm
+
     @property
     def base_platform(self):
         """
@@ -145,12 +180,29 @@ class PlatformBase(object):
         """
         return len(self._receive_queue)
 
+    @property
+    def mailbox_full(self):
+        """
+        Backpressure signal. Stimulus generators should hold requests while it's True
+        :return: True if platform's mailbox is bounded and it's full
+        """
+        return self._mailbox_capacity is not None and \
+            len(self._receive_queue) + self.queued_messages >= self._mailbox_capacity
+
+    @property
+    def mailbox_stats(self):
+        """
+        :return: dict with peak amount of queued messages (counted for bounded mailbox only) and amounts of
+                 rejected and dropped requests
+        """
+        return dict(self._mailbox_stats)
+
     @property
     def queued_messages(self):
         """
         :return: Amount of queued messages for processing
         """
-        return len(self._messages_queue)
+        return sum(len(q) for q in self._lanes) + sum(len(q) for q in self._deferred)
 
     def waiting_reply_on(self, context, interface):
         """
@@ -162,31 +214,60 @@ class PlatformBase(object):
         """
         if len(self._wait_reply_from) == 0:
             return False
+        if self._polled_timeouts == 0:
+            # NOTE: timeouts are handled by farm's timers so there is no deadlines to check
+            if context is not None:
+                return context in self._wait_reply_from and (interface is None or context.interface == interface)
+            return interface is None or any(c.interface == interface for c in self._wait_reply_from)
         if context is not None:
-            if context.str not in self._wait_reply_from:
+            if context not in self._wait_reply_from:
                 return False
             else:
-                contexts = [context.str]
+                contexts = [context]
         else:
             contexts = list(self._wait_reply_from.keys())
-        now = time.time()
+        now = self._farm.clock.now()
         r = False
         for c in contexts:
-            if interface is not None and TalkContext.deserialize(c).interface != interface:
+            if interface is not None and c.interface != interface:
                 continue
             d = self._wait_reply_from[c]
-            if now < d["timeout"]:
+            if d["timeout"] is None or now < d["timeout"]:
                 r = True
             else:
-                if not d["send_message"]:
-                    r = d["method"](context, False, True, *d["args"], **d["kwargs"])
-                else:
-                    r = d["method"](context, PM.failure(state={"timeouted": True}),
-                                    False, True, *d["args"], **d["kwargs"])
-                eprint("{}:{} didn't get reply on {}:{}".format(
-                    self.name, context.interface, context.channel, context.thread))
+                r = self._reply_timeout(c, d)
+        return r
+
+    def _reply_timeout(self, context, handler):
+        """
+        Invokes reply handler with timeouted set to True
+        Called when wait timeout is detected by waiting_reply_on or by farm's timer
+        :param context: messaging context
+        :param handler: reply handler's description as it's stored into self._wait_reply_from.
+                        Nothing is done if it's not registered anymore (i.e. reply were received before timeout)
+        :return: handler's result
+        """
+        if self._wait_reply_from.get(context, None) is not handler:
+            return False
+        if not handler["send_message"]:
+            r = handler["method"](context, False, True, *handler["args"], **handler["kwargs"])
+        else:
+            r = handler["method"](context, PM.failure(state={"timeouted": True}),
+                                  False, True, *handler["args"], **handler["kwargs"])
+        eprint("{}:{} didn't get reply on {}:{}".format(
+            self.name, context.interface, context.channel, context.thread))
         return r
 
+    @property
+    def reply_deadline(self):
+        """
+        :return: nearest deadline of reply waits which timeouts are polled (in farm's clock time),
+                 None if there is no such waits
+        """
+        if self._polled_timeouts == 0:
+            return None
+        return min(d["timeout"] for d in self._wait_reply_from.values() if d["timeout"] is not None)
+
     @property
     def waiting_reply(self):
         """
@@ -241,6 +322,18 @@ class PlatformBase(object):
         self._farm.unsubscribe(self, channel)
         del self._subscriptions[self._subscriptions.index(channel)]
 
+    def routes(self, channel):
+        """
+        Returns messages that platform could accept on specified channel
+        Used by messaging channels to pass messages only to platforms that could accept them
+        Derived classes that override receive_message should override this method too
+        Replies are passed to platform with registered reply handler regardless of routes
+        :param channel: channel's name
+        :return: list of (interface, method) pairs. If method is None then any method of interface is accepted
+                 If None is returned then all messages are accepted
+        """
+        return [r for p in self._protocols.values() for r in p.routes() if r[0] in self._protocols]
+
     def receive_message(self, context, message):
         """
         Method that is used by messaging channel to pass messages into platform.
@@ -253,76 +346,304 @@ class PlatformBase(object):
         message = PM.parse(message)
         if message.sender == self.name:
             return False
-        if message.is_reply and context.str in self._wait_reply_from:
-            d = self._wait_reply_from[context.str]
-            if d["timeout"] is not None and time.time() >= d["timeout"]:
+        d = self._wait_reply_from.get(context, None) if message.is_reply else None
+        if d is not None:
+            if d["timeout"] is not None and self._farm.clock.now() >= d["timeout"]:
                 return False
             if not d["send_message"]:
                 r = d["method"](context, True, False, *d["args"], **d["kwargs"])
             else:
                 r = d["method"](context, message, True, False, *d["args"], **d["kwargs"])
             if r:
-                self._receive_queue.append((context, message))
+                self._enqueue(context, message)
                 return True
             else:
                 return False
         elif message.interface in self._protocols and self._protocols[message.interface].supports(message):
-            self._receive_queue.append((context, message))
+            self._enqueue(context, message)
+            return True
+        return False
+
+    def receive_direct_message(self, context, message):
+        """
+        Processes request that is passed directly by farm, bypassing channel and queues (see PlatformsFarm.direct_call)
+        :param context: messaging context
+        :param message: PlatformMessage instance with request's content
+        :return: None
+        """
+        self._protocols[message.interface].process_message(context, message)
+
+    def receive_direct_reply(self, context, message):
+        """
+        Passes reply to a direct call straight to registered reply handler (see PlatformsFarm.direct_call)
+        :param context: messaging context
+        :param message: PlatformMessage instance with reply's content
+        :return: True if reply were handled, otherwise False
+        """
+        d = self._wait_reply_from.get(context, None)
+        if d is None:
+            return False
+        if not d["send_message"]:
+            if d["method"](context, True, False, *d["args"], **d["kwargs"]):
+                d["method"](context, False, False, *d["args"], **d["kwargs"])
+                return True
+        elif d["method"](context, message, True, False, *d["args"], **d["kwargs"]):
+            d["method"](context, message, False, False, *d["args"], **d["kwargs"])
             return True
         return False
 
+    def _direct_target(self, channel, message):
+        """
+        Returns platform that request could be passed to directly, bypassing channel
+        Only in-process platform which have nothing queued to process yet is accepted
+        so request won't overtake messages that were received earlier
+        :param channel: channel's name
+        :param message: request message
+        :return: platform instance or None
+        """
+        direct_receiver = getattr(self._farm, "direct_receiver", None)  # NOTE: farm within child process has none
+        if direct_receiver is None:
+            return None
+        target = direct_receiver(self, channel, message)
+        if not isinstance(target, PlatformBase) or len(target._receive_queue) > 0 or target.queued_messages > 0 \
+                or message.interface not in target._protocols:
+            return None
+        return target
+
+    def _enqueue(self, context, message):
+        """
+        Puts received message into queue and tells farm that platform has work to do
+        If mailbox is bounded and full then request is handled according to overflow policy.
+        Control requests are always accepted so platform stays manageable under load
+        :param context: messaging context
+        :param message: PlatformMessage instance
+        :return: None
+        """
+        if self._mailbox_capacity is not None and not message.is_reply and message.lane > 0 \
+                and self._overflow(context):
+            return
+        with self._receive_lock:
+            self._receive_queue.append((context, message))
+            ready = len(self._receive_queue) == 1
+        if ready:
+            self._farm.mark_ready(self)
+
+    def _overflow(self, context):
+        """
+        Applies mailbox overflow policy to incoming request
+        :param context: request's messaging context
+        :return: True if request shouldn't be queued
+        """
+        queued = len(self._receive_queue) + self.queued_messages
+        if queued >= self._mailbox_capacity:
+            if self._mailbox_overflow == "reject":
+                self._mailbox_stats["rejected"] += 1
+                self._reply(context, PM.failure("Mailbox of {} is full".format(self.name)))
+                return True
+            if self._mailbox_overflow == "drop_oldest":
+                if not self._drop_oldest():
+                    # NOTE: there is nothing to drop but control requests and replies so incoming request is rejected
+                    self._mailbox_stats["rejected"] += 1
+                    self._reply(context, PM.failure("Mailbox of {} is full".format(self.name)))
+                    return True
+                self._mailbox_stats["dropped"] += 1
+                queued -= 1
+            # NOTE: with block policy request is queued anyway. It's up to stimulus generators to respect backpressure
+        if queued >= self._mailbox_stats["peak"]:
+            self._mailbox_stats["peak"] = queued + 1
+        return False
+
+    def _drop_oldest(self):
+        """
+        Drops oldest queued request and replies failure to it's sender so sender isn't waiting until timeout.
+        Deferred requests are the oldest ones, then requests in lanes and then received requests.
+        Lowest priority lanes are looked first. Control requests and replies are never dropped
+        :return: True if request were dropped
+        """
+        dropped = None
+        with self._receive_lock:
+            for queue in self._deferred[:0:-1] + self._lanes[:0:-1] + (self._receive_queue, ):
+                for item in list(queue):
+                    if item[1].is_reply or item[1].lane == 0:
+                        continue
+                    try:
+                        queue.remove(item)
+                    except (ValueError, IndexError):
+                        continue    # NOTE: request were taken for processing meanwhile
+                    dropped = item
+                    break
+                if dropped is not None:
+                    break
+        if dropped is None:
+            return False
+        self._reply(dropped[0], PM.failure("Request were dropped since mailbox of {} is full".format(self.name)))
+        return True
+
     def queue_received_messages(self):
         """
         Move received messages queue into processing queue
         :return: None
         """
-        self._messages_queue += self._receive_queue
-        self._receive_queue = []
+        with self._receive_lock:
+            received = self._receive_queue
+            self._receive_queue = deque()
+        lanes = self._lanes
+        for c, m in received:
+            lanes[m.lane].append((c, m))
 
     def process_queued_messages(self):
         """
         Used to invoke processing of queued message
+        Call is nested if platform sends request while it's processing message and waits for replies.
+        Nested call defers requests that were queued already when processed message were taken and requests
+        of platforms that this platform isn't waiting for (see _awaited_senders). Deferred requests are processed
+        by outer call one after another, after message that is currently processed. So nesting depth doesn't grow
+        with length of the queue.
+        Replies and requests of awaited platforms that are received within the wait (like request back to this
+        platform that awaited platform makes to complete request) are processed by nested call
+        Messages are processed by priority lanes (see PM.lanes). Messages that are received while processing
+        are taken into lanes before each message, so control messages aren't waiting behind data backlog
         :return: None
         """
-        while len(self._messages_queue) > 0:
-            c, m = self._messages_queue.pop(0)
-            if m.is_reply and c.str in self._wait_reply_from:  # Pass replies to registered handler
-                d = self._wait_reply_from[c.str]
-                if d["timeout"] is not None and time.time() >= d["timeout"]:
-                    continue
-                if not d["send_message"]:
-                    d["method"](c, False, False, *d["args"], **d["kwargs"])
+        if self._processing:
+            barrier = self._barrier
+            if barrier is not None:
+                self._barrier = None
+                for queue, deferred, count in zip(self._lanes, self._deferred, barrier):
+                    replies = []
+                    for i in range(min(count, len(queue))):
+                        c, m = queue.popleft()
+                        if m.is_reply:
+                            replies.append((c, m))
+                        else:
+                            deferred.append((c, m))
+                    queue.extendleft(reversed(replies))
+            awaited = False     # NOTE: awaited senders are gathered on first request only
+            for queue, deferred in zip(self._lanes, self._deferred):
+                while len(queue) > 0:
+                    c, m = queue.popleft()
+                    if not m.is_reply:
+                        if awaited is False:
+                            awaited = self._awaited_senders()
+                        if awaited is not None and m.sender not in awaited:
+                            deferred.append((c, m))
+                            continue
+                    self._process_message(c, m)
+            return
+        self._processing = True
+        try:
+            while True:
+                if len(self._receive_queue) > 0:
+                    self.queue_received_messages()
+                for queue, deferred in zip(self._lanes, self._deferred):
+                    # NOTE: deferred requests were received before requests that are still queued
+                    if len(deferred) > 0:
+                        c, m = deferred.popleft()
+                        break
+                    if len(queue) > 0:
+                        c, m = queue.popleft()
+                        break
                 else:
-                    d["method"](c, m, False, False, *d["args"], **d["kwargs"])
+                    break
+                barrier = tuple(map(len, self._lanes))
+                self._barrier = barrier if any(barrier) else None
+                self._process_message(c, m)
+        finally:
+            self._processing = False
+            self._barrier = None
+
+    def _awaited_senders(self):
+        """
+        :return: set with names of platforms that could reply to this platform's requests in progress
+                 (subscribers of requests' channels) or None if it's unknown
+        """
+        subscribers_names = getattr(self._farm, "subscribers_names", None)  # NOTE: farm within child process has none
+        if subscribers_names is None:
+            return None
+        names = set()
+        for context in self._wait_reply_from:
+            names.update(subscribers_names(context.channel))
+        return names
+
+    def _process_message(self, c, m):
+        """
+        Processes queued message
+        :param c: messaging context
+        :param m: PlatformMessage instance
+        :return: None
+        """
+        if m.is_reply and c in self._wait_reply_from:  # Pass replies to registered handler
+            d = self._wait_reply_from[c]
+            if d["timeout"] is not None and self._farm.clock.now() >= d["timeout"]:
+                return
+            if not d["send_message"]:
+                d["method"](c, False, False, *d["args"], **d["kwargs"])
             else:
-            # TODO: ?? check whether protocol is ready to process message and stop processing if not ??
-            #       queue processing would be continued
-            #       OR this should be done by protocol ??
-                self._protocols[m.interface].process_message(c, m)
+                d["method"](c, m, False, False, *d["args"], **d["kwargs"])
+        else:
+        # TODO: ?? check whether protocol is ready to process message and stop processing if not ??
+        #       queue processing would be continued
+        #       OR this should be done by protocol ??
+            self._protocols[m.interface].process_message(c, m)
 
     def _register_reply_handler(self, context, method, args, kwargs, timeout, send_message=True, force=False,
-                                store_state=True):
-        assert force or context.str not in self._wait_reply_from, "Reply handler for {} of {} " \
-            "is already registered ({}({},{})!".format(context.str, self.name, *self._wait_reply_from[context.str])
-        if timeout is not None:
-            timeout += time.time()
-        self._wait_reply_from[context.str] = {
+                                store_state=True, senders=None):
+        assert force or context not in self._wait_reply_from, "Reply handler for {} of {} " \
+            "is already registered ({}({},{})!".format(context.str, self.name, *self._wait_reply_from[context])
+        self._drop_reply_handler(context)
+        self._farm.register_reply_handler(self, context, senders)
+        handler = self._wait_reply_from[context] = {
             "method": method, "args": args, "kwargs": kwargs,
-            "send_message": send_message, "timeout": timeout, "store_state": store_state
+            "send_message": send_message, "timeout": None, "timer": None, "store_state": store_state
         }
-        vprint("{} is waiting for reply on {}:{}".format(self.name, context.channel, context.thread))
+        if timeout is not None:
+            self._set_reply_timeout(context, handler, timeout)
+        vlog("{} is waiting for reply on {}:{}", self.name, context.channel, context.thread)
+
+    def _set_reply_timeout(self, context, handler, timeout):
+        """
+        Sets timeout for reply wait
+        :param context: messaging context
+        :param handler: reply handler's description as it's stored into self._wait_reply_from
+        :param timeout: timeout in seconds
+        :return: Nothing
+        """
+        # If farm has timers then timeout is handled by timer, otherwise it's polled
+        handler["timer"] = self._farm.call_later(timeout, self._reply_timeout, context, handler)
+        if handler["timer"] is None:
+            handler["timeout"] = self._farm.clock.now() + timeout
+            self._polled_timeouts += 1
 
     def _unregister_reply_handler(self, context, success, state, dont_check=False):
-        assert dont_check or context.str in self._wait_reply_from, "Reply handler for {} of {} not found!".format(
+        assert dont_check or context in self._wait_reply_from, "Reply handler for {} of {} not found!".format(
             context.str, self.name)
-        if not dont_check or context.str in self._wait_reply_from:
-            if self._wait_reply_from[context.str]["store_state"]:
+        if not dont_check or context in self._wait_reply_from:
+            if self._wait_reply_from[context]["store_state"]:
                 assert isinstance(state, dict), "state expected to be a dict"
-                assert context.str not in self._request_end_state, "unexpected to see a state in a storage " \
+                assert context not in self._request_end_state, "unexpected to see a state in a storage " \
                                                                "before it was actually stored"
                 state["__success__"] = success
-                self._request_end_state[context.str] = state
-            del self._wait_reply_from[context.str]
+                self._request_end_state[context] = state
+            self._drop_reply_handler(context)
+            self._farm.unregister_reply_handler(self, context)
+            self._farm.complete_thread(self, context)
+            future = self._request_futures.pop(context, None)
+            if future is not None and not future.done():
+                future.set_result(self._pop_request_state(context))
+
+    def _drop_reply_handler(self, context):
+        """
+        Removes reply handler from handlers map and cancels it's timeout
+        :param context: messaging context
+        :return: Nothing
+        """
+        handler = self._wait_reply_from.pop(context, None)
+        if handler is None:
+            return
+        if handler["timer"] is not None:
+            self._farm.cancel_timer(handler["timer"])
+        if handler["timeout"] is not None:
+            self._polled_timeouts -= 1
 
     def start_conversation(self, channel, interface, reply_to_tc=None):
         """
@@ -337,7 +658,7 @@ class PlatformBase(object):
         """
         return self._farm.start_thread(self, channel, interface, reply_to_tc)
 
-    def send_message(self, context, message):
+    def send_message(self, context, message, processing=None):
         # TODO: "strict" parameter - if True then anyone received this message should support it or fail
         """
         Sends message into messaging channel and into thread with specified ID
@@ -345,11 +666,10 @@ class PlatformBase(object):
         Will fail if channel or thread is not exists
         :param context: messaging context - channel, thread, interface
         :param message: PlatformMessage instance with message's content
+        :param processing: messages processing level. See PlatformsFarm.send_message
         :return: None
         """
-        message.sender = self.name
-        message.interface = context.interface
-        self._farm.send_message(context, message)
+        self._farm.send_message(context, message.replace(sender=self.name, interface=context.interface), processing)
 
     def request(self, request, handler, hargs, hkwargs, hsend_message=True,
                 channel=None, timeout=1.0, store_state=True):
@@ -392,16 +712,57 @@ class PlatformBase(object):
                 raise ValueError("channel can't be None if parent is not set")
             else:
                 channel = "@{}".format(self.parent.name)
+        target = self._direct_target(channel, request)
         c = self.start_conversation(channel, request.interface)
-        self._register_reply_handler(c, handler, hargs, hkwargs, timeout=timeout, send_message=hsend_message,
+        if target is None:
+            self._register_reply_handler(c, handler, hargs, hkwargs, timeout=timeout, send_message=hsend_message,
+                                         store_state=store_state)
+            self.send_message(c, request)
+            return c
+        # NOTE: request is processed by target right away, so timeout is set only if request is still in progress
+        #       after that (i.e. if target replies later)
+        self._register_reply_handler(c, handler, hargs, hkwargs, timeout=None, send_message=hsend_message,
                                      store_state=store_state)
-        self.send_message(c, request)
+        request = request.replace(sender=self.name, interface=c.interface)
+        handler = self._wait_reply_from[c]
+        self._farm.direct_call(self, target, c, request)
+        if self._wait_reply_from.get(c, None) is handler:
+            if timeout is not None:
+                self._set_reply_timeout(c, handler, timeout)
+            self._farm.wait_reply(self, c)
         return c
 
+    def request_async(self, request, handler=None, hargs=None, hkwargs=None, hsend_message=True,
+                      channel=None, timeout=1.0):
+        """
+        Awaitable counterpart of request method
+        With asyncio farm (see PlatformixPreferecenes.asyncio) request is sent without waiting for it's processing.
+        Returned future is resolved with request's end state (see _pop_request_state) as soon as reply handler
+        unregisters itself. Timeout is handled by event loop's timer
+        Other farms are processing request synchronously, just like request method does, and return future that is
+        resolved already (unless request is still in progress after farm has settled down)
+        Arguments are the same as for request method
+        :return: asyncio future with asyncio farm, otherwise - concurrent.futures.Future
+        """
+        if handler is None:
+            handler = self._default_request_handler
+        if channel is None:
+            if self.parent is None:
+                raise ValueError("channel can't be None if parent is not set")
+            else:
+                channel = "@{}".format(self.parent.name)
+        future = self._farm.create_future()
+        c = self.start_conversation(channel, request.interface)
+        self._request_futures[c] = future
+        self._register_reply_handler(c, handler, hargs or [], hkwargs or {}, timeout=timeout,
+                                     send_message=hsend_message, store_state=True)
+        self.send_message(c, request, processing=0 if self._farm.awaitable else None)
+        return future
+
     def _pop_request_state(self, context):
-        if context.str not in self._request_end_state:
+        if context not in self._request_end_state:
             return None
-        return self._request_end_state.pop(context.str)
+        return self._request_end_state.pop(context)
 
     def _request_state_is_success(self, state):
         return state.get("__success__", None) is True
@@ -492,5 +853,4 @@ class PlatformBase(object):
         :return: None
         """
         for c in contexts:
-            m = PM.parse(message.serialize())  # NOTE: Do a copy
-            self._reply(c, m)
+            self._reply(c, message)  # NOTE: message is immutable so it's shared by all replies
@@ -0,0 +1,558 @@
+from core.platformix_core import PlatformMessage as PM, TalkContext
+from core.simple_logging import vprint, eprint
+from collections import deque
+import hmac
+import io
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+
+# Bridge mirrors selected channels of a farm onto the same channels of remote farm so single test environment
+# could be distributed across nodes. I.e. DUT's interface platform is hosted by one farm, and sequencers,
+# scoreboards and the test itself are hosted by another one. Every farm holds FarmBridge instance that is subscribed
+# to mirrored channels and stands in for remote farm's platforms:
+# * Messages of local platforms are passed to remote farm if any of remote platforms could accept them
+#   (bridge's routes are routes of remote farm) and into threads that were started by remote farm
+#   (bridge is topic caster of such threads)
+# * Messages of remote platforms are sent by bridge into local channels as is - with same sender, thread ID
+#   and interface, so contexts and replies correlation are the same within both farms
+# Thread IDs are not collided since each farm starts threads with own IDs subset (see TalkChannel.number_threads)
+# and the thread that is started by remote farm is adopted by local channel on it's first message
+# (see TalkChannel.adopt_thread)
+#
+# Remote farm is treated as busy (see PlatformsFarm.processes_busy) until it has acknowledged all sent messages.
+# Messages are acknowledged when farm that has received them has processed everything that could be processed
+# locally (see PlatformsFarm.settle). Messages produced by their processing are sent before acknowledgement
+# so by the moment remote farm is not busy replies are already received
+#
+# Connection is authenticated with shared secret key before anything else is passed. Each side sends random
+# challenge and replies with HMAC of the peer's challenge, so the key itself isn't passed (see _authenticate).
+# Frames are unpickled with restricted unpickler that refuses any class but plain data types (see _Unpickler)
+# so frame couldn't make farm to run any code. Values of messages that aren't plain data (like exceptions)
+# are passed as their repr.
+#
+# Records are passed in frames. Frame is 4 bytes of little endian length followed by pickled list of records.
+# Records that are posted while previous frame is being sent are gathered into single frame.
+# Record is a tuple with record's kind as 1st item. Channels are referred by their index in mirrored channels list:
+#   (_HELLO, node, nodes, channels, routes) - 1st record of each side. routes is a list with farm's routes
+#                                             for each mirrored channel
+#   (_TOPIC, channel, thread, interface, sender, msg_interface, method, args, kwargs, reply_to_tc)
+#                                           - initial message of a thread (thread is adopted by receiving farm)
+#   (_MSG, channel, thread, interface, sender, msg_interface, method, args, kwargs) - other messages
+#   (_ACK, count)                           - amount of messages that are processed by farm
+#   (_ROUTES, channel, routes)              - farm's routes for a channel were changed
+
+_HELLO = 0
+_TOPIC = 1
+_MSG = 2
+_ACK = 3
+_ROUTES = 4
+
+_header = struct.Struct("<I")
+
+_challenge_size = 32
+_digest = "sha256"
+_handshake_timeout = 10.0
+
+_scalars = frozenset((type(None), bool, int, float, complex, str, bytes))   # Values that are passed as is
+_containers = frozenset((tuple, list, set, frozenset))  # Containers that are passed as is if items are passed
+_classes = frozenset(("complex", "set", "frozenset", "bytearray"))  # Builtins that frames could refer to
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Unpickler that accepts plain data only. Any reference to class or function but few builtin data types is refused
+    """
+
+    def find_class(self, module, name):
+        if module == "builtins" and name in _classes:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError("Bridge's frame refers to forbidden {}.{}".format(module, name))
+
+
+def _data_only(v):
+    """
+    :return: True if value consists of plain data types only and could be passed as is
+    """
+    t = type(v)
+    if t in _scalars:
+        return True
+    if t in _containers:
+        return all(_data_only(i) for i in v)
+    if t is dict:
+        return all(_data_only(k) and _data_only(i) for k, i in v.items())
+    return False
+
+
+def _plain(v):
+    """
+    Converts value into plain data. Subclasses of plain types (like enums or numpy's scalars) are converted
+    to their base types, containers are converted item by item and anything else is replaced with it's repr
+    """
+    if _data_only(v):
+        return v
+    for t in (bool, int, float, complex, str, bytes):
+        if isinstance(v, t):
+            return t(v)
+    for t in (tuple, list, set, frozenset):
+        if isinstance(v, t):
+            return t(_plain(i) for i in v)
+    if isinstance(v, dict):
+        return {_plain(k): _plain(i) for k, i in v.items()}
+    return repr(v)
+
+
+def _portable(record):
+    """
+    Replaces message's values that aren't plain data (like exceptions) with their plain counterparts
+    :param record: record with message
+    :return: record that could be passed to remote farm
+    """
+    args, kwargs = record[7], record[8]
+    if all(_data_only(v) for v in args) and all(_data_only(v) for v in kwargs.values()):
+        return record
+    return record[:7] + (tuple(_plain(v) for v in args), {k: _plain(v) for k, v in kwargs.items()}) + record[9:]
+
+
+def _recv_exactly(sock, size):
+    """
+    Receives specified amount of bytes from socket
+    :return: bytearray with data or None if connection is closed
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    while size > 0:
+        n = sock.recv_into(view[-size:], size)
+        if n == 0:
+            return None
+        size -= n
+    return data
+
+
+def _authenticate(sock, authkey, role):
+    """
+    Mutual challenge-response authentication with shared secret key
+    Responses are bound to the side's role so peer couldn't pass by reflecting challenge back
+    :param sock: connected socket
+    :param authkey: bytes, shared secret key
+    :param role: b"listen" or b"connect"
+    :return: True if remote side knows the key
+    """
+    peer_role = b"connect" if role == b"listen" else b"listen"
+    challenge = os.urandom(_challenge_size)
+    sock.sendall(challenge)
+    peer_challenge = _recv_exactly(sock, _challenge_size)
+    if peer_challenge is None:
+        return False
+    sock.sendall(hmac.new(authkey, role + peer_challenge, _digest).digest())
+    response = _recv_exactly(sock, hmac.new(authkey, digestmod=_digest).digest_size)
+    return response is not None and hmac.compare_digest(bytes(response),
+                                                        hmac.new(authkey, peer_role + challenge, _digest).digest())
+
+
+class FarmBridge(object):
+    """
+    Mirrors selected channels between farm and remote farm over TCP connection
+    Use FarmBridge.listen and FarmBridge.connect to establish connection. Both sides should mirror the same channels,
+    should have different node numbers and the same amount of nodes.
+    Channels should be mirrored before any thread is started on them
+    NOTE: platforms names should be unique across all farms. Remote platforms reply handlers are not mirrored so
+          replies are delivered to remote platforms only if they are topic casters or if they accept replies by routes
+    NOTE: both sides should use the same authkey. Anyone who knows it could send messages into mirrored channels
+    """
+
+    def __init__(self, farm, sock, channels, node, nodes):
+        """
+        Mirrors channels over connected socket. Blocks until remote side has mirrored channels too
+        :param farm: platforms farm
+        :param sock: connected socket that is authenticated already (see _authenticate)
+        :param channels: list with names of channels to mirror
+        :param node: node number of the farm, in range [0, nodes)
+        :param nodes: amount of farms that are bridged together
+        """
+        assert 0 <= node < nodes, "Node {} should be in range [0, {})".format(node, nodes)
+        self._farm = farm
+        self._sock = sock
+        self._names = tuple(channels)
+        self._index = {c: i for i, c in enumerate(self._names)}  # Key is channel's name, value is it's index
+        self._channels = []         # Mirrored channels (TalkChannel instances) in the same order as names
+        self._remote_routes = []    # Routes of remote farm for each mirrored channel
+        self._local_routes = []     # Routes of local farm for each mirrored channel as they were sent to remote farm
+        self._versions = []         # Channels' routes versions that local routes were gathered for
+        self.name = "__bridge_{}__".format(node)
+
+        self._sent = 0              # Amount of messages sent to remote farm
+        self._acked = 0             # Amount of sent messages that were processed by remote farm
+        self._received = 0          # Amount of messages that were received from remote farm and were sent locally
+        self._injecting = None      # Message that is sent locally by bridge right now
+        self._frames = 0            # Amount of sent frames
+        self._records = 0           # Amount of sent records
+
+        self._inbox = deque()       # Records are received into this queue
+        self._inbox_lock = threading.Lock()
+        self._queue = deque()       # Received records are transferred into this queue before processing
+        self._out = []              # Records to send
+        self._out_cv = threading.Condition()
+        self._ack_cv = threading.Condition()
+        self._ack = None            # Amount of messages to acknowledge after farm is settled down (by acker thread)
+        self._closed = False
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for c in self._names:
+            farm.subscribe(self, c)
+            channel = farm.expose_data().channels[c]
+            channel.number_threads(node, nodes)
+            self._channels.append(channel)
+            self._versions.append(channel.routes_version)
+            self._local_routes.append(self._gather_routes(channel))
+        self._send_frame([(_HELLO, node, nodes, self._names, self._local_routes)])
+        hello = self._recv_frame()
+        if hello is None or hello[0][0] != _HELLO:
+            raise RuntimeError("Bridge's connection is closed on handshake")
+        _, remote_node, remote_nodes, remote_names, self._remote_routes = hello[0]
+        if remote_nodes != nodes or remote_node == node or tuple(remote_names) != self._names:
+            raise RuntimeError("Bridged farms mismatch: node {} of {} with channels {}, remote is node {} of {} "
+                               "with channels {}".format(node, nodes, self._names,
+                                                         remote_node, remote_nodes, remote_names))
+        for c in self._channels:
+            c.reroute()
+        self._versions = [c.routes_version for c in self._channels]
+
+        self._threads = [threading.Thread(target=t, name="bridge-{}-{}".format(node, t.__name__[1:]), daemon=True)
+                         for t in (self._read, self._write, self._acknowledge)]
+        for t in self._threads:
+            t.start()
+        farm.add_bridge(self)
+        vprint("{} is bridged with node {} by channels {}".format(self.name, remote_node, ", ".join(self._names)))
+
+    @classmethod
+    def listen(cls, farm, address, channels, authkey, node=0, nodes=2):
+        """
+        Waits for remote farm's connection and mirrors channels
+        Connections that fail authentication are dropped and next connection is awaited
+        :param address: (host, port) pair to listen on or just a port to listen on localhost only.
+                        Host should be specified explicitly to accept connections from other nodes
+        :param authkey: bytes, secret key that is shared with remote farm
+        :return: FarmBridge instance
+        """
+        if isinstance(address, int):
+            address = ("127.0.0.1", address)
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            server.bind(address)
+            server.listen(1)
+            while True:
+                sock, peer = server.accept()
+                try:
+                    sock.settimeout(_handshake_timeout)
+                    if _authenticate(sock, authkey, b"listen"):
+                        sock.settimeout(None)
+                        break
+                    eprint("Bridge's connection from {} has failed authentication".format(peer))
+                except OSError as e:
+                    eprint("Bridge's connection from {} is lost on authentication: {}".format(peer, e))
+                sock.close()
+        finally:
+            server.close()
+        return cls(farm, sock, channels, node, nodes)
+
+    @classmethod
+    def connect(cls, farm, address, channels, authkey, node=1, nodes=2, timeout=10.0):
+        """
+        Connects to remote farm and mirrors channels. Connection is retried until timeout expires
+        so farms could be started in any order
+        :param address: (host, port) pair of remote farm or just a port if remote farm is on localhost
+        :param authkey: bytes, secret key that is shared with remote farm
+        :param timeout: connection timeout in seconds
+        :return: FarmBridge instance
+        """
+        if isinstance(address, int):
+            address = ("127.0.0.1", address)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                sock = socket.create_connection(address, max(deadline - time.monotonic(), 0.01))
+                break
+            except ConnectionRefusedError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+        sock.settimeout(_handshake_timeout)
+        try:
+            if not _authenticate(sock, authkey, b"connect"):
+                raise RuntimeError("Bridge's connection to {} has failed authentication".format(address))
+        except BaseException:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        return cls(farm, sock, channels, node, nodes)
+
+    def __repr__(self):
+        return "<FarmBridge {}>".format(self.name)
+
+    @property
+    def busy(self):
+        """
+        :return: True if remote farm hasn't processed sent messages yet or if there are received messages to send
+        """
+        return self._sent > self._acked or len(self._inbox) > 0 or len(self._queue) > 0
+
+    @property
+    def received_messages(self):
+        return len(self._inbox)
+
+    @property
+    def queued_messages(self):
+        return len(self._queue)
+
+    @property
+    def frames(self):
+        """
+        :return: amount of frames sent to remote farm
+        """
+        return self._frames
+
+    @property
+    def records(self):
+        """
+        :return: amount of records sent to remote farm. Records to frames ratio shows batching efficiency
+        """
+        return self._records
+
+    def _gather_routes(self, channel):
+        """
+        Gathers routes of local subscribers of the channel
+        :param channel: TalkChannel instance
+        :return: set of (interface, method) pairs or None if any message is accepted
+        """
+        routes = set()
+        for s in channel.subscribers:
+            if s is self:
+                continue
+            if not hasattr(s, "routes"):
+                return None
+            r = s.routes(channel.name)
+            if r is None:
+                return None
+            routes.update(tuple(k) for k in r)
+        return routes
+
+    def _sync_routes(self):
+        """
+        Tells remote farm about changed routes of local subscribers
+        :return: Nothing
+        """
+        for i, c in enumerate(self._channels):
+            if c.routes_version != self._versions[i]:
+                self._versions[i] = c.routes_version
+                routes = self._gather_routes(c)
+                if routes != self._local_routes[i]:
+                    self._local_routes[i] = routes
+                    self._post((_ROUTES, i, routes))
+
+    def routes(self, channel):
+        if channel not in self._index:
+            return []
+        return self._remote_routes[self._index[channel]]
+
+    def receive_message(self, context, message):
+        """
+        Passes message of local platform to remote farm
+        """
+        if message is self._injecting or self._closed:
+            return False
+        i = self._index.get(context.channel, None)
+        if i is None:
+            return False
+        message = PM.parse(message)
+        self._sync_routes()
+        kwargs = dict(message.kwargs)   # NOTE: message's kwargs are read-only dict that isn't plain data type
+        if message.is_reply:
+            record = (_MSG, i, context.thread, context.interface, message.sender, message.interface, message.method,
+                      message.args, kwargs)
+        else:
+            record = (_TOPIC, i, context.thread, context.interface, message.sender, message.interface, message.method,
+                      message.args, kwargs, self._channels[i].reply_mode(context.thread))
+        self._post(record, True)
+        return True
+
+    def queue_received_messages(self):
+        with self._inbox_lock:
+            self._queue += self._inbox
+            self._inbox = deque()
+
+    def process_queued_messages(self):
+        """
+        Sends messages of remote platforms into local channels. Messages are acknowledged after farm is settled down
+        """
+        received = self._received
+        while len(self._queue) > 0:
+            r = self._queue.popleft()
+            if r[0] == _ROUTES:
+                self._remote_routes[r[1]] = r[2]
+                self._channels[r[1]].reroute()
+                continue
+            if r[0] == _TOPIC:
+                self._channels[r[1]].adopt_thread(r[2], self, r[9])
+            message = PM(r[4], r[5], r[6], r[7], r[8])
+            self._injecting = message
+            try:
+                self._farm.send_message(TalkContext(self._names[r[1]], r[2], r[3]), message, 0)
+            finally:
+                self._injecting = None
+            self._received += 1
+        if self._received == received:
+            return
+        self._sync_routes()
+        if self._farm.in_worker:
+            # NOTE: worker can't wait for other workers. Messages are acknowledged by acker thread
+            with self._ack_cv:
+                self._ack = self._received
+                self._ack_cv.notify()
+        else:
+            self._farm.settle()
+            # NOTE: messages that were received by nested calls are settled down too
+            self._post((_ACK, self._received))
+
+    def _acknowledge(self):
+        """
+        Acker thread's loop. Acknowledges messages processed by farm's workers
+        :return: Nothing
+        """
+        while True:
+            with self._ack_cv:
+                while self._ack is None and not self._closed:
+                    self._ack_cv.wait()
+                if self._closed:
+                    return
+                count = self._ack
+                self._ack = None
+            self._farm.settle()
+            self._post((_ACK, count))
+
+    def _post(self, record, message=False):
+        """
+        Enqueues record for sending
+        :param record: record to send
+        :param message: True if record is a message that should be acknowledged by remote farm
+        :return: Nothing
+        """
+        with self._out_cv:
+            if self._closed:
+                return
+            self._out.append(record)
+            if message:
+                self._sent += 1
+            if len(self._out) == 1:
+                self._out_cv.notify()
+
+    def _send_frame(self, records):
+        data = pickle.dumps([_portable(r) if r[0] in (_TOPIC, _MSG) else r for r in records],
+                            pickle.HIGHEST_PROTOCOL)
+        self._sock.sendall(_header.pack(len(data)) + data)
+        self._frames += 1
+        self._records += len(records)
+
+    def _recv_frame(self):
+        """
+        :return: list of records or None if connection is closed
+        """
+        header = _recv_exactly(self._sock, _header.size)
+        if header is None:
+            return None
+        data = _recv_exactly(self._sock, _header.unpack(header)[0])
+        if data is None:
+            return None
+        return _Unpickler(io.BytesIO(data)).load()
+
+    def _write(self):
+        """
+        Writer thread's loop. Sends records that are posted while previous frame were sent as a single frame
+        :return: Nothing
+        """
+        try:
+            while True:
+                with self._out_cv:
+                    while len(self._out) == 0 and not self._closed:
+                        self._out_cv.wait()
+                    if len(self._out) == 0:
+                        return
+                    records = self._out
+                    self._out = []
+                self._send_frame(records)
+        except OSError as e:
+            if not self._closed:
+                eprint("{}: connection is lost: {}".format(self.name, e))
+            self._lost()
+
+    def _read(self):
+        """
+        Reader thread's loop. Queues received records and accounts acknowledgements
+        :return: Nothing
+        """
+        try:
+            while True:
+                records = self._recv_frame()
+                if records is None:
+                    break
+                acked = None
+                with self._inbox_lock:
+                    for r in records:
+                        if r[0] == _ACK:
+                            acked = r[1]
+                        else:
+                            self._inbox.append(r)
+                if acked is not None:
+                    # NOTE: inbox is filled before acknowledgement so bridge stays busy until records are processed
+                    self._acked = max(self._acked, acked)
+                self._farm.mark_ready_threadsafe(self)
+        except OSError as e:
+            if not self._closed:
+                eprint("{}: connection is lost: {}".format(self.name, e))
+        except pickle.UnpicklingError as e:
+            eprint("{}: malformed frame is received, connection is dropped: {}".format(self.name, e))
+        self._lost()
+
+    def _lost(self):
+        """
+        Marks bridge as closed so farm won't wait for remote farm anymore
+        :return: Nothing
+        """
+        with self._out_cv:
+            self._closed = True
+            self._acked = self._sent
+            self._out_cv.notify()
+        with self._ack_cv:
+            self._ack_cv.notify()
+        self._farm.mark_ready_threadsafe(self)
+
+    def serve(self):
+        """
+        Processes farm's messages until connection is closed
+        Used by farm that is driven by remote farm (i.e. it hosts platforms only and the test is run by remote farm)
+        :return: Nothing
+        """
+        while not self._closed:
+            self._farm.settle()
+            self._farm.wait_marked_ready(0.1)
+
+    def close(self):
+        """
+        Closes connection and stops mirroring
+        :return: Nothing
+        """
+        self._lost()
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        for t in self._threads:
+            if t is not threading.current_thread():
+                t.join(1.0)
+        for c in self._names:
+            self._farm.unsubscribe(self, c)
@@ -1,20 +1,17 @@
+import asyncio
+import concurrent.futures
 import copy
+import heapq
+import itertools
+import threading
 import time
-from core.simple_logging import vprint, eprint, exprint
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from core.simple_logging import vprint, vlog, eprint, exprint
 
 
-def _mc_gen():
-    """
-    Used by all TalkChannels when logging messages to preserve messages order
-    :return:
-    """
-    n = 1
-    while True:
-        yield n
-        n += 1
-
-
-_mc = _mc_gen()  # An instance of _mc_gen that should be used by talk channels when getting order number for message log
+_mc = itertools.count(1)  # Used by all TalkChannels when logging messages to preserve messages order
+# NOTE: itertools.count is used instead of generator since it's safe to call next on it from multiple threads
 
 
 class PlatformixPreferecenes(object):
@@ -22,13 +19,65 @@ class PlatformixPreferecenes(object):
     Contains global platformix setup data
     """
 
+    mailbox_policies = ("block", "reject", "drop_oldest")
+    # Platforms mailbox overflow policies. Policy is applied to requests only, replies are always accepted
+    # since they are completing work that is already in progress:
+    # * block - request is accepted, but stimulus generators (Sequencer, PlatformsFarm.send_messages) are holding
+    #   next requests until mailbox has room (see PlatformsFarm.relieve)
+    # * reject - request is replied with failure right away
+    # * drop_oldest - oldest queued request (deferred ones first, then lowest priority lanes first) is dropped
+    #   and replied with failure. If there are no requests but control ones then new request is rejected
+
     def __init__(self):
         self._platform_start_timeout = 10.0  # By default 10 seconds max are given for platforms to start
         self._platform_stop_timeout = 10.0   # By default 10 seconds max are given for platforms to stop
+        self._multithreading = False         # When True then farms process platforms messages by worker threads
+        self._worker_threads = 4             # Amount of worker threads per farm in multithreading mode
+        self._max_worker_threads = 32        # Max amount of worker threads per farm including extra ones that are
+                                             # started to replace workers waiting for replies
+        self._asyncio = False                # When True then test environment uses asyncio driven farm
+        self._conversation_retention = "full"   # Which conversations logs are kept by channels
+        self._conversation_ring_size = 1000     # Number of last threads kept in "ring" and "failures" modes
+        self._release_completed_threads = False  # When True then channels drops state of completed threads
+        self._virtual_clock = False          # When True then farms use virtual clock for timeouts (see VirtualClock)
+        self._notify = "all"                 # How protocols are sending intermediate notifies (see notify_modes)
+        self._direct_calls = True            # When True then requests are passed directly to the only receiver
+        self._mailbox_capacity = None        # Max amount of messages queued by platform. If None then unbounded
+        self._mailbox_overflow = "block"     # What is done when platform's mailbox is full (see mailbox_policies)
 
     @property
     def multithreading(self):
-        return False
+        return self._multithreading
+
+    @multithreading.setter
+    def multithreading(self, value):
+        self._multithreading = bool(value)
+
+    @property
+    def asyncio(self):
+        return self._asyncio
+
+    @asyncio.setter
+    def asyncio(self, value):
+        self._asyncio = bool(value)
+
+    @property
+    def worker_threads(self):
+        return self._worker_threads
+
+    @worker_threads.setter
+    def worker_threads(self, value):
+        assert isinstance(value, int) and value > 0, "worker_threads should be positive integer"
+        self._worker_threads = value
+
+    @property
+    def max_worker_threads(self):
+        return self._max_worker_threads
+
+    @max_worker_threads.setter
+    def max_worker_threads(self, value):
+        assert isinstance(value, int) and value > 0, "max_worker_threads should be positive integer"
+        self._max_worker_threads = value
 
     @property
     def platform_start_timeout(self):
@@ -50,17 +99,151 @@ class PlatformixPreferecenes(object):
     def send_message_print_level_change(self):
         return False
 
+    @property
+    def conversation_retention(self):
+        return self._conversation_retention
+
+    @conversation_retention.setter
+    def conversation_retention(self, value):
+        assert value in ConversationLog.retentions, "Unknown conversation retention '{}'. Expected one of {}".format(
+            value, ConversationLog.retentions)
+        self._conversation_retention = value
+
+    @property
+    def conversation_ring_size(self):
+        return self._conversation_ring_size
+
+    @conversation_ring_size.setter
+    def conversation_ring_size(self, value):
+        assert isinstance(value, int) and value > 0, "conversation_ring_size should be positive integer"
+        self._conversation_ring_size = value
+
+    @property
+    def release_completed_threads(self):
+        return self._release_completed_threads
+
+    @release_completed_threads.setter
+    def release_completed_threads(self, value):
+        self._release_completed_threads = bool(value)
+
+    @property
+    def virtual_clock(self):
+        return self._virtual_clock
+
+    @virtual_clock.setter
+    def virtual_clock(self, value):
+        self._virtual_clock = bool(value)
+
+    @property
+    def notify(self):
+        return self._notify
+
+    @notify.setter
+    def notify(self, value):
+        assert value in PlatformProtocolCore.notify_modes, "Unknown notify mode '{}'. Expected one of {}".format(
+            value, PlatformProtocolCore.notify_modes)
+        self._notify = value
+
+    @property
+    def direct_calls(self):
+        return self._direct_calls
+
+    @direct_calls.setter
+    def direct_calls(self, value):
+        self._direct_calls = bool(value)
+
+    @property
+    def mailbox_capacity(self):
+        return self._mailbox_capacity
+
+    @mailbox_capacity.setter
+    def mailbox_capacity(self, value):
+        assert value is None or (isinstance(value, int) and value > 0), \
+            "mailbox_capacity should be positive integer or None"
+        self._mailbox_capacity = value
+
+    @property
+    def mailbox_overflow(self):
+        return self._mailbox_overflow
+
+    @mailbox_overflow.setter
+    def mailbox_overflow(self, value):
+        assert value in self.mailbox_policies, "Unknown mailbox overflow policy '{}'. Expected one of {}".format(
+            value, self.mailbox_policies)
+        self._mailbox_overflow = value
+
 
 pref = PlatformixPreferecenes()
 
 
+class _FrozenDict(dict):
+    """
+    Read-only dict used to hold message's keyworded args
+    Behaves like a regular dict for reading (and for isinstance checks) but any attempt to modify it raises TypeError
+    Since it can't be changed it's safely shared between messages, channels and platforms without copying
+    """
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Message's kwargs are read-only. Use PlatformMessage.replace to get modified message")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return _FrozenDict(copy.deepcopy(dict(self), memo))
+
+    def __reduce__(self):
+        return _FrozenDict, (dict(self), )
+
+
+_empty_kwargs = _FrozenDict()
+
+
+def _freeze_args(args):
+    if args is None:
+        return ()
+    if isinstance(args, tuple):
+        return args
+    return tuple(args)
+
+
+def _freeze_kwargs(kwargs):
+    if kwargs is None:
+        return _empty_kwargs
+    if isinstance(kwargs, _FrozenDict):
+        return kwargs
+    return _FrozenDict(kwargs)
+
+
 class PlatformMessage(object):
     """
     Class for information transfer between platforms (calls and replies)
     And it's called "Message"
+    Message is immutable: args are stored as tuple and kwargs as read-only dict.
+    So single instance is shared by all channels and platforms on it's way without copying.
+    Use replace method to get message with changed fields (payload is shared, not copied)
+    NOTE: only top level of args and kwargs is frozen. Values itself are not copied and shouldn't be changed by
+    receivers
     """
+    __slots__ = ("_sender", "_interface", "_method", "_args", "_kwargs")
     _signature = 0x1400
 
+    lanes = ("control", "testing", "data")
+    # Priority lanes. Channels and platforms are passing queued messages of higher priority lanes first:
+    # * control - platformix messages (start, stop, get, report etc.) and their replies
+    # * testing - messages with fake-op instructions (see fake_next_op)
+    # * data - everything else
+
     def __init__(self, sender=None, interface=None, method=None, args=None, kwargs=None):
         """
         :param sender: Source of message. Symbolic name expected
@@ -69,41 +252,91 @@ class PlatformMessage(object):
         :param args: Args to method
         :param kwargs: Keyworded args to method or reply data
         """
-        self.sender = sender
-        self.interface = interface
-        self.method = method
-        self.args = args
-        if self.args is None:
-            self.args = []
-        self.kwargs = kwargs
-        if self.kwargs is None:
-            self.kwargs = {}
+        self._sender = sender
+        self._interface = interface
+        self._method = method
+        self._args = _freeze_args(args)
+        self._kwargs = _freeze_kwargs(kwargs)
+
+    @property
+    def sender(self):
+        return self._sender
+
+    @property
+    def interface(self):
+        return self._interface
+
+    @property
+    def method(self):
+        return self._method
+
+    @property
+    def args(self):
+        return self._args
+
+    @property
+    def lane(self):
+        """
+        :return: index of message's priority lane (see lanes)
+        """
+        if self._interface == "platformix":
+            return 0
+        if self._method == "__testing__":
+            return 1
+        return 2
+
+    @property
+    def kwargs(self):
+        return self._kwargs
+
+    def replace(self, **fields):
+        """
+        Creates new message with specified fields replaced. Fields that are not specified are shared with this message
+        :param fields: any of sender, interface, method, args, kwargs
+        :return: new PlatformMessage instance or self if there is nothing to change
+        """
+        for f in fields:
+            if f not in ("sender", "interface", "method", "args", "kwargs"):
+                raise ValueError("Unknown message field {}".format(f))
+        if all(getattr(self, f) is fields[f] for f in fields):
+            return self
+        return PlatformMessage(fields.get("sender", self._sender), fields.get("interface", self._interface),
+                               fields.get("method", self._method), fields.get("args", self._args),
+                               fields.get("kwargs", self._kwargs))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return PlatformMessage(self._sender, self._interface, self._method,
+                               copy.deepcopy(self._args, memo), copy.deepcopy(self._kwargs, memo))
+
+    def __reduce__(self):
+        return PlatformMessage, (self._sender, self._interface, self._method, self._args, dict(self._kwargs))
 
     @classmethod
     def parse(cls, message):
         """
         Transforms message into PlatformMessage object
-        :param message: serialized message of PlatformMessage object
-        :return: recreated PlatformMessage object
+        :param message: serialized message or PlatformMessage object
+        :return: PlatformMessage object. If PlatformMessage were passed then it's returned as is since it's immutable
         """
         if isinstance(message, PlatformMessage):
-            inst = PlatformMessage.parse(message.serialize())
-            return inst
-        inst = PlatformMessage()
-        if message is not None:
-            assert isinstance(message, (list, tuple)), "Message is expected to be a list or a tuple"
-            assert len(message) >= 4, "Message's length expected to be at least 4"
-            assert message[0] == PlatformMessage._signature, "Message's signature is incorrect"
-            inst.sender = message[1]
-            inst.interface = message[2]
-            inst.method = message[3]
-            if len(message) > 4:
-                assert isinstance(message[4], (list, tuple)), "Message's args expected to be list or tuple"
-                inst.args = copy.deepcopy(message[4])
-            if len(message) > 5:
-                assert isinstance(message[5], dict), "Message's kwargs expected to be a dict"
-                inst.kwargs = copy.deepcopy(message[5])
-        return inst
+            return message
+        if message is None:
+            return PlatformMessage()
+        assert isinstance(message, (list, tuple)), "Message is expected to be a list or a tuple"
+        assert len(message) >= 4, "Message's length expected to be at least 4"
+        assert message[0] == PlatformMessage._signature, "Message's signature is incorrect"
+        args = None
+        kwargs = None
+        if len(message) > 4:
+            assert isinstance(message[4], (list, tuple)), "Message's args expected to be list or tuple"
+            args = message[4]
+        if len(message) > 5:
+            assert isinstance(message[5], dict), "Message's kwargs expected to be a dict"
+            kwargs = message[5]
+        return PlatformMessage(message[1], message[2], message[3], args, kwargs)
 
     @classmethod
     def get_sender(cls, message):
@@ -167,7 +400,7 @@ class PlatformMessage(object):
             assert len(message) >= 4, "Message's length expected to be at least 4"
             assert message[0] == PlatformMessage._signature, "Message's signature is incorrect"
             if len(message) > 4:
-                return copy.deepcopy(message[4])
+                return _freeze_args(message[4])
             else:
                 return None
         return None
@@ -186,7 +419,7 @@ class PlatformMessage(object):
             assert len(message) >= 4, "Message's length expected to be at least 4"
             assert message[0] == PlatformMessage._signature, "Message's signature is incorrect"
             if len(message) > 5:
-                return copy.deepcopy(message[5])
+                return _freeze_kwargs(message[5])
             else:
                 return None
         return None
@@ -194,9 +427,10 @@ class PlatformMessage(object):
     def serialize(self):
         """
         Transforms self into list with key fields values
+        NOTE: args and kwargs are not copied
         :return: list of values (key fields of object)
         """
-        return [self._signature, self.sender, self.interface, self.method, self.args, self.kwargs]
+        return [self._signature, self._sender, self._interface, self._method, self._args, self._kwargs]
 
     @classmethod
     def success(cls, retval, retvalname='value'):
@@ -210,7 +444,8 @@ class PlatformMessage(object):
         :return: PlatformMessage instance
         """
         if isinstance(retval, dict) and retvalname is None:
-            retval["__result__"] = "success"    # TODO: right here just modified input dict. That's not good
+            retval = dict(retval)
+            retval["__result__"] = "success"
         else:
             retval = {"__result__": "success", retvalname: retval}
         return PlatformMessage(method="__reply__", kwargs=retval)
@@ -331,13 +566,52 @@ def new_message(interface, method, *args, **kwargs):
 class TalkContext(object):
     """
     Class to hold context of conversation
+    Context is immutable and hashable so it's used as is as a key of reply handlers, requests states etc.
+    Channel's and interface's names are interned into integer IDs, so contexts are hashed and compared by
+    integers only. String form (see str property) is intended for logs
     """
+    __slots__ = ("_channel", "_thread", "_interface", "_key", "_hash", "_as_str")
+    _ids = {}       # Interned channels and interfaces names. Key is name and value is it's ID
+    _ids_lock = threading.Lock()
+
     def __init__(self, channel, thread, interface):
         self._channel = channel
         self._thread = thread
         self._interface = interface
+        ids = TalkContext._ids
+        c = ids.get(channel, None)
+        if c is None:
+            c = TalkContext._intern(channel)
+        i = ids.get(interface, None)
+        if i is None:
+            i = TalkContext._intern(interface)
+        self._key = (c, thread, i)
+        self._hash = hash(self._key)
         self._as_str = None
 
+    @classmethod
+    def _intern(cls, name):
+        with cls._ids_lock:
+            if name not in cls._ids:
+                cls._ids[name] = len(cls._ids)
+            return cls._ids[name]
+
+    def __eq__(self, other):
+        return self is other or other.__class__ is TalkContext and self._key == other._key
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # NOTE: IDs are process specific so context is passed by names
+        return TalkContext, (self._channel, self._thread, self._interface)
+
+    def __repr__(self):
+        return "<TalkContext {}>".format(self.str)
+
     def serialize(self):
         return self._channel, self._thread, self._interface
 
@@ -348,8 +622,8 @@ class TalkContext(object):
             return TalkContext(*serialized)
         elif isinstance(serialized, str):
             data = serialized.split(':')
-            assert len(data) != 3, "Expecting string with 3 items - channel, thread, interface, separated with ':'"
-            return TalkContext(*data)
+            assert len(data) == 3, "Expecting string with 3 items - channel, thread, interface, separated with ':'"
+            return TalkContext(data[0], int(data[1]), data[2])
         else:
             raise ValueError("Expecting list/tuple with 3 items - channel, thread, interface"
                              " or string with 3 items - channel, thread, interface, separated with ':'")
@@ -373,36 +647,284 @@ class TalkContext(object):
         return self._as_str
 
 
+class _ThreadLog(object):
+    """
+    Conversation log of a single thread
+    Each delivery is stored as a fixed size record of integers (see ConversationLog._fields)
+    Messages are kept by reference for args and kwargs (messages are immutable and shared by deliveries)
+    """
+    __slots__ = ("records", "payloads", "failed")
+
+    def __init__(self):
+        self.records = array('q')
+        self.payloads = []
+        self.failed = False
+
+
+class ConversationLog(object):
+    """
+    Compact storage for channel's conversations
+    Deliveries are logged as binary records with interned senders/receivers names and interface/method pairs
+    and monotonic timestamps in ns. Conversation is formatted into text only when it's requested
+    Retention policies:
+    * full - logs of all threads are kept
+    * ring - logs of last ring_size threads are kept
+    * failures - only logs of threads with failures or undelivered messages are kept.
+      Logs of other threads are dropped when thread is completed or when it's out of last ring_size threads
+    """
+    retentions = ("full", "ring", "failures")
+    _fields = ("idx", "sender", "delivered", "receiver", "op", "start", "end")
+    _stride = len(_fields)
+
+    def __init__(self, retention="full", ring_size=1000):
+        """
+        :param retention: Retention policy. One of "full", "ring", "failures"
+        :param ring_size: Number of last threads which logs are kept in "ring" and "failures" modes
+        """
+        assert retention in self.retentions, "Unknown conversation retention '{}'. Expected one of {}".format(
+            retention, self.retentions)
+        assert isinstance(ring_size, int) and ring_size > 0, "ring_size should be positive integer"
+        self.retention = retention
+        self.ring_size = ring_size
+        self._wallref = time.time()             # Wall time and monotonic time taken at once
+        self._monoref = time.monotonic_ns()     # to convert monotonic timestamps back into wall time
+        self._names = {}        # Interned names. Key is name and value is integer ID
+        self._names_list = []   # Names by ID
+        self._ops = {}          # Interned (interface, method) pairs. Key is pair and value is integer ID
+        self._ops_list = []     # Pairs by ID
+        self._live = OrderedDict()  # Logs of threads that are subject to retention. Key is thread ID
+        self._kept = {}         # Logs of failed threads in "failures" mode. Key is thread ID
+
+    def _name_id(self, name):
+        i = self._names.get(name, None)
+        if i is None:
+            i = self._names[name] = len(self._names_list)
+            self._names_list.append(name)
+        return i
+
+    def _op_id(self, interface, method):
+        key = (interface, method)
+        i = self._ops.get(key, None)
+        if i is None:
+            i = self._ops[key] = len(self._ops_list)
+            self._ops_list.append(key)
+        return i
+
+    def start(self, thread):
+        """
+        Starts log for new thread. Drops oldest threads logs if they are out of ring
+        :param thread: thread ID
+        :return: Nothing
+        """
+        self._live[thread] = _ThreadLog()
+        if self.retention != "full":
+            while len(self._live) > self.ring_size:
+                t, log = self._live.popitem(last=False)
+                if log.failed and self.retention == "failures":
+                    self._kept[t] = log
+
+    def log(self, thread, idx, message, delivered, receiver, start, end, failed=False):
+        """
+        Logs message delivery
+        :param thread: thread ID
+        :param idx: message's order number
+        :param message: PlatformMessage instance
+        :param delivered: True if receiver have accepted message
+        :param receiver: receiver's name or None if message have not reached anyone
+        :param start: delivery start time (as returned by time.monotonic_ns())
+        :param end: delivery end time (as returned by time.monotonic_ns())
+        :param failed: True if thread should be treated as failed
+        :return: Nothing
+        """
+        log = self._live.get(thread, None)
+        if log is None:
+            log = self._kept.get(thread, None)
+            if log is None:  # Thread log were dropped already
+                return
+        log.records.extend((idx, self._name_id(message.sender), int(delivered),
+                            -1 if receiver is None else self._name_id(receiver),
+                            self._op_id(message.interface, message.method), start, end))
+        log.payloads.append(message)
+        if failed:
+            log.failed = True
+
+    def complete(self, thread):
+        """
+        Tells that conversation in thread is completed. In "failures" mode log is dropped unless thread has failed
+        :param thread: thread ID
+        :return: Nothing
+        """
+        if self.retention == "failures":
+            log = self._live.pop(thread, None)
+            if log is not None and log.failed:
+                self._kept[thread] = log
+
+    def clear(self):
+        """
+        Drops all logs
+        :return: Nothing
+        """
+        self._live = OrderedDict()
+        self._kept = {}
+
+    @property
+    def threads(self):
+        """
+        :return: sorted list with IDs of threads which logs are kept
+        """
+        return sorted(list(self._live) + list(self._kept))
+
+    def records(self, thread):
+        """
+        Returns raw records for a thread
+        :param thread: thread ID
+        :return: list of dicts with record fields (names and ops are resolved)
+        """
+        log = self._live.get(thread, None) or self._kept.get(thread, None)
+        assert log is not None, "Conversation for thread {} isn't kept".format(thread)
+        result = []
+        for n in range(0, len(log.payloads)):
+            r = dict(zip(self._fields, log.records[n*self._stride:(n+1)*self._stride]))
+            r["sender"] = self._names_list[r["sender"]]
+            r["receiver"] = None if r["receiver"] < 0 else self._names_list[r["receiver"]]
+            r["delivered"] = bool(r["delivered"])
+            r["op"] = self._ops_list[r["op"]]
+            r["args"], r["kwargs"] = log.payloads[n].args, log.payloads[n].kwargs
+            result.append(r)
+        return result
+
+    def conversation(self, thread):
+        """
+        Formats conversation for a thread
+        :param thread: thread ID
+        :return: list of strings formated for plantuml
+        """
+        result = []
+        for r in self.records(thread):
+            start = self._wallref + (r["start"] - self._monoref) / 1e9
+            result.append("#{}:{} {} {} {} : {} ({})".format(
+                r["idx"], start, r["sender"], ["-->x", "-->"][r["delivered"]], r["receiver"],
+                [*r["op"], r["args"], r["kwargs"]], (r["end"] - r["start"]) / 1e9))
+        return result
+
+
+TapRecord = namedtuple("TapRecord", ("context", "message"))
+# Message observed by a tap. Messages are immutable, so records are shared with channels without copying
+
+
+class Tap(object):
+    """
+    Passive observer of channels messages
+    Messages that are passing filters are buffered and delivered to handler in batches, aside of messages delivery.
+    Observer doesn't take part in messages delivery, so it's not slowing it down by it's own processing
+    Buffer is drained when farm's transaction is ended, when buffer is full and on demand
+    Single tap could observe multiple channels, records are delivered in the order messages were sent
+    """
+
+    def __init__(self, name, handler, filters=None, capacity=1000):
+        """
+        :param name: tap's name (i.e. observer platform's name)
+        :param handler: function that is called with list of TapRecord instances
+        :param filters: list of (interface, method) pairs for messages to observe. If method is None then any method
+                        of interface is observed. Replies method is '__reply__'. If None then all messages are observed
+        :param capacity: max amount of buffered records. Buffer is drained as soon as it's full
+        """
+        assert isinstance(capacity, int) and capacity > 0, "capacity should be positive integer"
+        self.name = name
+        self._handler = handler
+        self._filters = None if filters is None else set(tuple(f) for f in filters)
+        self._capacity = capacity
+        self._buffer = []
+        self._lock = threading.Lock()           # Protects buffer
+        self._drain_lock = threading.RLock()    # Keeps batches in order. Reentrant since handler could send messages
+        self.records = 0    # Amount of observed messages
+        self.batches = 0    # Amount of batches delivered to handler
+
+    def accepts(self, key):
+        """
+        :param key: (interface, method) pair
+        :return: True if message passes tap's filters
+        """
+        return self._filters is None or key in self._filters or (key[0], None) in self._filters
+
+    def put(self, context, message):
+        """
+        Buffers message. Called by channels
+        :param context: messaging context
+        :param message: PlatformMessage instance
+        :return: Nothing
+        """
+        with self._lock:
+            self._buffer.append(TapRecord(context, message))
+            self.records += 1
+            full = len(self._buffer) >= self._capacity
+        if full:
+            self.drain()
+
+    def drain(self):
+        """
+        Delivers buffered records to handler
+        :return: Nothing
+        """
+        with self._drain_lock:
+            while len(self._buffer) > 0:
+                with self._lock:
+                    records = self._buffer
+                    self._buffer = []
+                self.batches += 1
+                self._handler(records)
+
+
 class TalkChannel(object):
     """
     Class to manage subscription of platforms to a channel and send messages to subscribed instances
     To isolate different conversations messages are supplied with thread ID (which should be used by messages receivers)
     """
+    _released = {"tc": None, "reply_to_tc": False, "topic": True}  # State used for messages into released threads
 
-    def __init__(self, name, print_messages=False, gather_conversation=True, gather_all=False, timeref=0):
+    def __init__(self, name, print_messages=False, gather_conversation=True, gather_all=False, timeref=0,
+                 retention="full", ring_size=1000, release_completed=False):
         """
         :param name: Channels's name
         :param print_messages: When True then all conversation is printed to stdout
         :param gather_conversation: When True then messages are logged
         :param gather_all: When False then logged only messages with response
+        :param retention: Conversation log retention policy (see ConversationLog)
+        :param ring_size: Number of last threads which logs are kept in "ring" and "failures" modes
+        :param release_completed: When True then thread's state is dropped as soon as thread is completed
         """
         self.name = name
         self.print_messages = print_messages
         self.gather_conversation = gather_conversation
         self.gather_all = gather_all
+        self.release_completed = release_completed
         self._timeref = timeref
+        self._log = ConversationLog(retention, ring_size)
+        self._lock = threading.RLock()  # Serializes access from farm's worker threads. Reentrant since sending
+        # a message could invoke sending of another message into same channel
 
         self._subscribers = []  # List of channels subscribers (instances refs)
-        self._threads = []      # List of channels threads
-        self._topics = []       # List of thread topics (first message in a thread)
-
-        self._queue = []        # Queue of messages to send.
+        self._subscribed = set()    # Same subscribers but as a set for fast lookup
+        self._routes = {}       # Routing table. Key is (interface, method) pair and value is list of subscribers
+        # that could accept such message. Filled up on demand and dropped when subscribers are changed
+        self._reply_handlers = {}   # Subscribers that are waiting for replies. Key is thread ID and value is dict
+        # that maps (subscriber, interface) registration to the list of awaited senders (or None if any sender)
+        self._reply_index = {}      # Same registrations indexed for delivery. Key is thread ID and value is dict
+        # that maps sender's name (None for any sender) to dict of (subscriber, interface) -> subscriber
+        self._threads = {}      # Channels threads. Key is thread ID and value is thread's state
+        self._next_thread = 0   # ID for the next thread. IDs are never reused so released threads are distinguished
+        self._thread_step = 1   # Step between IDs of threads started by this channel (see number_threads)
+        self._routes_version = 0    # Incremented each time routing table is dropped
+
+        self._queue = tuple(deque() for _ in PlatformMessage.lanes)   # Queues of messages to send by priority lanes
         # When sending message to multiple subscribers incoming send_message requests are queued
         # so different messages won't be shuffled with each other in chaotic order
         self._busy = False      # True if currently busy with sending certain message to subscribers
+        self._taps = []         # Passive observers (see Tap)
 
     def __del__(self):
         self._subscribers = []
+        self._subscribed = set()
 
     @property
     def subscribers(self):
@@ -414,9 +936,16 @@ class TalkChannel(object):
     @property
     def conversations(self):
         """
-        :return: list with all conversations
+        :return: list with all kept conversations
+        """
+        return [self._log.conversation(t) for t in self._log.threads]
+
+    @property
+    def conversation_log(self):
+        """
+        :return: ConversationLog instance
         """
-        return [self.conversation(t) for t in range(0, len(self._threads))]
+        return self._log
 
     def conversation(self, thread):
         """
@@ -424,9 +953,9 @@ class TalkChannel(object):
         :param thread: thread ID to get conversation for
         :return: list of strings formated for plantuml
         """
-        assert isinstance(thread, int) and 0 <= thread < len(self._threads), "Thread {} don't exists at channel {}!".\
+        assert isinstance(thread, int) and 0 <= thread < self._next_thread, "Thread {} don't exists at channel {}!".\
             format(thread, self.name)
-        return self._threads[thread]["conversation"]
+        return self._log.conversation(thread)
 
     def subscribe(self, inst):
         """
@@ -434,9 +963,13 @@ class TalkChannel(object):
         :param inst: ref to instance to subscribe
         :return: Nothing
         """
-        if inst not in self._subscribers:
-            self._subscribers.append(inst)
-            vprint("{} is subscribed to {}".format(inst.name, self.name))
+        with self._lock:
+            if inst not in self._subscribers:
+                self._subscribers.append(inst)
+                self._subscribed.add(inst)
+                self._routes = {}
+                self._routes_version += 1
+                vlog("{} is subscribed to {}", inst.name, self.name)
 
     def unsubscribe(self, inst):
         """
@@ -444,9 +977,154 @@ class TalkChannel(object):
         :param inst: ref to instance to unsubscribe
         :return: Nothing
         """
-        if inst in self._subscribers:
-            self._subscribers.remove(inst)
-            vprint("{} is unsubscribed from {}".format(inst.name, self.name))
+        with self._lock:
+            if inst in self._subscribers:
+                self._subscribers.remove(inst)
+                self._subscribed.discard(inst)
+                self._routes = {}
+                self._routes_version += 1
+                for thread in list(self._reply_handlers):
+                    for key in [k for k in self._reply_handlers[thread] if k[0] is inst]:
+                        self.unregister_reply_handler(inst, thread, key[1])
+                vlog("{} is unsubscribed from {}", inst.name, self.name)
+
+    def add_tap(self, tap):
+        """
+        Adds passive observer onto channel
+        :param tap: Tap instance
+        :return: Nothing
+        """
+        with self._lock:
+            if tap not in self._taps:
+                self._taps = self._taps + [tap]
+
+    def remove_tap(self, tap):
+        """
+        Removes passive observer from channel
+        :param tap: Tap instance
+        :return: Nothing
+        """
+        with self._lock:
+            if tap in self._taps:
+                self._taps = [t for t in self._taps if t is not tap]
+
+    def _tap(self, context, message):
+        """
+        Passes message to taps
+        :param context: messaging context
+        :param message: PlatformMessage instance
+        :return: Nothing
+        """
+        key = (message.interface, message.method)
+        for t in self._taps:
+            if t.accepts(key):
+                t.put(context, message)
+
+    def reroute(self):
+        """
+        Drops routing table. Should be called if any subscriber changed set of messages it accepts
+        :return: Nothing
+        """
+        self._routes = {}
+        self._routes_version += 1
+
+    @property
+    def routes_version(self):
+        """
+        :return: number that is changed each time subscribers or their routes are changed
+        """
+        return self._routes_version
+
+    def register_reply_handler(self, inst, thread, interface=None, senders=None):
+        """
+        Registers subscriber as the one that is waiting for replies within thread.
+        Replies are routed to such subscribers regardless of their routes.
+        Replies of other senders are not delivered to subscriber if senders list is specified.
+        That's what keeps start/stop on a shared thread linear - each platform receives replies of
+        the platforms it's waiting for only, not the replies of the whole farm
+        Repeated registration with same interface replaces previous one
+        :param inst: ref to subscriber
+        :param thread: thread ID
+        :param interface: messaging interface of the context that handler is registered for
+        :param senders: list with names of platforms which replies are awaited. If None then any sender
+        :return: Nothing
+        """
+        with self._lock:
+            self.unregister_reply_handler(inst, thread, interface)
+            key = (inst, interface)
+            if senders is not None:
+                senders = tuple(set(senders))
+            self._reply_handlers.setdefault(thread, {})[key] = senders
+            index = self._reply_index.setdefault(thread, {})
+            for s in (None,) if senders is None else senders:
+                index.setdefault(s, {})[key] = inst
+
+    def unregister_reply_handler(self, inst, thread, interface=None):
+        """
+        Removes registration made with register_reply_handler
+        :param inst: ref to subscriber
+        :param thread: thread ID
+        :param interface: messaging interface of the context that handler were registered for
+        :return: Nothing
+        """
+        with self._lock:
+            handlers = self._reply_handlers.get(thread, None)
+            key = (inst, interface)
+            if handlers is None or key not in handlers:
+                return
+            senders = handlers.pop(key)
+            index = self._reply_index[thread]
+            for s in (None,) if senders is None else senders:
+                del index[s][key]
+                if len(index[s]) == 0:
+                    del index[s]
+            if len(handlers) == 0:
+                del self._reply_handlers[thread]
+                del self._reply_index[thread]
+
+    def _accepts(self, inst, key):
+        """
+        Checks subscriber's routes against message's key
+        :param inst: ref to subscriber
+        :param key: (interface, method) pair
+        :return: True if subscriber could accept message, otherwise False
+        """
+        if not hasattr(inst, "routes"):
+            return True
+        routes = inst.routes(self.name)
+        if routes is None:
+            return True
+        return key in routes or (key[0], None) in routes
+
+    def congested(self, message):
+        """
+        :param message: initial (non-reply) message
+        :return: True if any subscriber that would receive message has full mailbox (see PlatformBase.mailbox_full)
+        """
+        with self._lock:
+            return any(getattr(s, "mailbox_full", False) for s in self._receivers(None, message))
+
+    def _receivers(self, thread, message):
+        """
+        Returns subscribers that could accept the message. Other subscribers are not bothered with it
+        :param thread: thread ID
+        :param message: PlatformMessage instance
+        :return: list of subscribers
+        """
+        key = (message.interface, message.method)
+        receivers = self._routes.get(key, None)
+        if receivers is None:
+            receivers = self._routes[key] = [s for s in self._subscribers if self._accepts(s, key)]
+        if message.is_reply and thread in self._reply_index:
+            index = self._reply_index[thread]
+            waiting = []
+            for s in (None, message.sender):
+                if s in index:
+                    waiting += [h for h in index[s].values() if h not in waiting]
+            if len(waiting) > 0:
+                routed = set(receivers)
+                receivers = receivers + [h for h in waiting if h not in routed and h in self._subscribed]
+        return receivers
 
     def start_thread(self, topic_caster, reply_to_tc=None):
         """
@@ -458,26 +1136,123 @@ class TalkChannel(object):
             if True then messages are sent to topic_caster only
         :return: new thread ID
         """
-        thread_id = len(self._threads)
-        self._threads.append({"tc": topic_caster, "reply_to_tc": reply_to_tc, "conversation": []})
-        self._topics.append(None)
-        if self.print_messages:
-            vprint("{}: {} started thread {} @ channel {}".format(time.time() - self._timeref, topic_caster.name,
-                                                                  thread_id, self.name))
-        return thread_id
+        with self._lock:
+            thread_id = self._next_thread
+            self._next_thread += self._thread_step
+            self._threads[thread_id] = {"tc": topic_caster, "reply_to_tc": reply_to_tc, "topic": None}
+            if self.gather_conversation:
+                self._log.start(thread_id)
+            if self.print_messages:
+                vprint("{}: {} started thread {} @ channel {}".format(time.time() - self._timeref, topic_caster.name,
+                                                                      thread_id, self.name))
+            return thread_id
 
-    def _log_conv(self, thread, conv, idx):
+    def number_threads(self, base, step):
         """
-        Creates conversation log in plant uml format (TODO: realy plant uml?)
-        :param thread:
-        :param conv:
-        :param idx:
-        :return:
+        Sets up numbering of threads IDs so threads that are started by same channels of different farms
+        are not collided (see core.platformix_bridge). IDs of threads started by this channel are base + N * step
+        Should be called before threads are started
+        :param base: number of the channel among the same channels, in range [0, step)
+        :param step: amount of the same channels
+        :return: Nothing
+        """
+        assert 0 <= base < step, "Base {} should be in range [0, {})".format(base, step)
+        with self._lock:
+            self._thread_step = step
+            self._next_thread += (base - self._next_thread) % step
+
+    def adopt_thread(self, thread, topic_caster, reply_to_tc=None):
+        """
+        Starts thread with ID that were given by other party (i.e. by the same channel of other farm)
+        :param thread: thread ID
+        :param topic_caster: instance that stands in for thread's topic caster
+        :param reply_to_tc: defines behaviour for replies (see start_thread)
+        :return: Nothing
+        """
+        with self._lock:
+            assert isinstance(thread, int) and thread >= 0 and thread not in self._threads, \
+                "Thread {} already exists at channel {}!".format(thread, self.name)
+            if thread >= self._next_thread:
+                # NOTE: keep own numbering but make sure that adopted ID is treated as existing one
+                self._next_thread += (thread - self._next_thread) // self._thread_step * self._thread_step \
+                    + self._thread_step
+            self._threads[thread] = {"tc": topic_caster, "reply_to_tc": reply_to_tc, "topic": None}
+            if self.gather_conversation:
+                self._log.start(thread)
+
+    def reply_mode(self, thread):
+        """
+        :param thread: thread ID
+        :return: reply_to_tc value thread were started with (see start_thread).
+                 False if thread were released or don't exists
+        """
+        return self._threads.get(thread, self._released)["reply_to_tc"]
+
+    def complete_thread(self, thread, topic_caster):
+        """
+        Tells that conversation in a thread is completed. Only topic caster can complete thread
+        Conversation log is handled according to retention policy
+        and thread's state is released if channel is set to release completed threads
+        :param thread: thread ID
+        :param topic_caster: ref to instance that completes thread
+        :return: Nothing
+        """
+        with self._lock:
+            state = self._threads.get(thread, None)
+            if state is None or state["tc"] is not topic_caster:
+                return
+            self._log.complete(thread)
+            if self.release_completed:
+                self.release_thread(thread)
+
+    def release_thread(self, thread):
+        """
+        Drops thread's state. Late replies into released thread are still delivered to subscribers
+        but not to topic caster
+        :param thread: thread ID
+        :return: Nothing
+        """
+        self._threads.pop(thread, None)
+
+    def direct_receiver(self, inst, message):
+        """
+        Returns subscriber that message could be passed to directly, bypassing channel
+        It's possible only if there is exactly one subscriber (besides sender) and it could accept message,
+        so nobody else would observe message on channel
+        :param inst: ref to message's sender
+        :param message: PlatformMessage instance (initial message)
+        :return: ref to subscriber or None if message should be sent via channel
+        """
+        with self._lock:
+            if self._busy or self.print_messages:
+                return None
+            others = [s for s in self._subscribers if s is not inst]
+            if len(others) != 1:
+                return None
+            if [s for s in self._receivers(None, message) if s is not inst] != others:
+                return None
+            return others[0]
+
+    def direct_message(self, context, message, receiver):
         """
-        values = conv[:-2]    # NOTE: 2 last it start/stop time
-        values.append(conv[-1] - conv[-2])
-        self._threads[thread]["conversation"].append("#{}:{} {} {} {} : {} ({})".format(idx, conv[-2], *values))
-        # TODO: format idx as 6-digit number
+        Accounts message that were passed to receiver directly, bypassing channel (see direct_receiver)
+        Delivery is logged if conversation is gathered
+        :param context: messging context
+        :param message: PlatformMessage instance with message content
+        :param receiver: receiver's name
+        :return: None
+        """
+        with self._lock:
+            state = self._threads.get(context.thread, None)
+            if state is None:
+                return
+            if state["topic"] is None:
+                state["topic"] = message
+            if self._taps:
+                self._tap(context, message)
+            if self.gather_conversation:
+                now = time.monotonic_ns()
+                self._log.log(context.thread, next(_mc), message, True, receiver, now, now, message.is_failure)
 
     def send_message(self, context, message):
         """
@@ -488,24 +1263,50 @@ class TalkChannel(object):
         """
         if context.channel == "__void__":
             return
-        if self._busy:
-            self._queue.append((context, message))
-            return
+        with self._lock:
+            if self._busy:
+                self._queue[message.lane].append((context, message))
+                return
+            # NOTE: messages that are sent while message is delivered are queued and delivered by this loop
+            #       one after another, so delivery isn't nested. Queued messages of higher priority go first
+            while True:
+                self._send_message(context, message)
+                for queue in self._queue:
+                    if len(queue) > 0:
+                        context, message = queue.popleft()
+                        break
+                else:
+                    break
+
+    def _send_message(self, context, message):
+        """
+        Delivers message to thread's participants. Should be called with channel's lock acquired
+        and when channel isn't busy with other message
+        :param context: messging context
+        :param message: PlatformMessage instance with message content
+        :return: None
+        """
         thread = context.thread
         _msg = message
         message = message.serialize()
+        assert isinstance(thread, int) and 0 <= thread < self._next_thread, "Thread {} don't exists at channel {}!".\
+            format(thread, self.name)
         self._busy = True
-        if self._topics[thread] is None:
+        state = self._threads.get(thread, None)
+        if state is None:   # Thread were released. Message is delivered only to subscribers and isn't logged
+            state = self._released
+            gather_conversation = False
+        else:
+            gather_conversation = self.gather_conversation
+        if state["topic"] is None:
             assert not _msg.is_reply, "First message shouldn't be reply!\n" \
                                          "  were told to send into {}:{} message {}".format(self.name, thread, message)
-            self._topics[thread] = ' '.join(str(m) for m in message)
+            state["topic"] = _msg
             first_message = True
         else:
             assert _msg.is_reply, "Messages besides first should be replies!\n" \
                                      "  were told to send into {}:{} messaage {}".format(self.name, thread, message)
             first_message = False
-        assert isinstance(thread, int) and 0 <= thread < len(self._threads), "Thread {} don't exists at channel {}!".\
-            format(thread, self.name)
         if self.print_messages:
             if first_message:
                 vprint("{}: Sending message {} to {}::{}".format(time.time() - self._timeref,
@@ -513,25 +1314,35 @@ class TalkChannel(object):
             else:
                 vprint("{}: Sending reply {} to {}::{}({})".format(time.time()  - self._timeref,
                                                                    message, self.name, thread,
-                       self._topics[thread]))
+                       ' '.join(str(m) for m in state["topic"].serialize())))
+        if self._taps:  # NOTE: taps observe message before it's delivered, so request is observed before replies
+            self._tap(context, _msg)
         fail_idx = next(_mc)
         received_by = 0
-        if self.gather_conversation:
-            conv = [_msg.sender, "-->", None, message[2:], 0, 0]
-        if not _msg.is_reply or self._threads[thread]["reply_to_tc"] is not True:
-            for s in self._subscribers:
+        if gather_conversation:
+            failed = _msg.is_failure
+            start = time.monotonic_ns()
+        if not _msg.is_reply or state["reply_to_tc"] is not True:
+            receivers = self._receivers(thread, _msg)
+            if gather_conversation and self.gather_all:
+                # NOTE: walk through all subscribers to log messages that were not routed to subscriber
+                subscribers = self._subscribers
+                routed = set(receivers)
+            else:
+                subscribers = receivers
+            for s in subscribers:
                 if s.name == _msg.sender:    # Don't send message back to it's source
                     continue
-                if s.name == self._threads[thread]["tc"].name \
-                        and self._threads[thread]["reply_to_tc"] is not False:
+                if state["reply_to_tc"] is not False and s.name == state["tc"].name:
                     # If s is topic caster and it would get reply - send it later (to avoid double sends)
                     continue
-                if self.gather_conversation:
-                    conv[-2] = time.time()
+                if gather_conversation:
+                    start = time.monotonic_ns()
                 idx = next(_mc)
-                r = s.receive_message(context, message)
-                if self.gather_conversation:
-                    conv[-1] = time.time()
+                if subscribers is receivers or s in routed:
+                    r = s.receive_message(context, _msg)
+                else:
+                    r = False
                 if r not in (False, True):
                     self._busy = False
                     assert r in (False, True), \
@@ -539,48 +1350,32 @@ class TalkChannel(object):
                             time.time() - self._timeref, s.name, r)
                 if r:
                     received_by += 1
-                if self.gather_conversation and (r or self.gather_all):
-                    if r:
-                        conv[1] = "-->"
-                    else:
-                        conv[1] = "-->x"
-                    conv[2] = s.name
-                    self._log_conv(thread, conv, idx)
+                if gather_conversation and (r or self.gather_all):
+                    self._log.log(thread, idx, _msg, r, s.name, start, time.monotonic_ns(), failed)
 
-        if self._threads[thread]["reply_to_tc"] is not False:
+        if state["reply_to_tc"] is not False:
+            if gather_conversation:
+                start = time.monotonic_ns()
             idx = next(_mc)
-            r = self._threads[thread]["tc"].receive_message(context, message)
-            if self.gather_conversation:
-                conv[-1] = time.time()
+            r = state["tc"].receive_message(context, _msg)
             if r not in (False, True):
                 self._busy = False
                 assert r in (False, True), \
                     "{}: Reply from {} contains no result or value({}) not in (False, True)".format(
-                        time.time() - self._timeref, self._threads[thread]["tc"].name, r)
+                        time.time() - self._timeref, state["tc"].name, r)
             if r:
                 received_by += 1
-            if self.gather_conversation and (r or self.gather_all):
-                if r:
-                    conv[1] = "-->"
-                else:
-                    conv[1] = "-->x"
-                conv[2] = self._threads[thread]["tc"].name
-                self._log_conv(thread, conv, idx)
+            if gather_conversation and (r or self.gather_all):
+                self._log.log(thread, idx, _msg, r, state["tc"].name, start, time.monotonic_ns(), failed)
 
         if received_by < 1:
-            if self.gather_conversation:
-                conv[-1] = time.time()
             if self.print_messages:
                 vprint("{}:  Message {} to {}::{} had no effect".format(time.time()  - self._timeref,
                                                                         message, self.name, thread))
-            if self.gather_conversation:
-                conv[1] = "-->x"
-                conv[2] = None
-                self._log_conv(thread, conv, fail_idx)
+            if gather_conversation:
+                self._log.log(thread, fail_idx, _msg, False, None, start, time.monotonic_ns(),
+                              failed or not _msg.is_reply)
         self._busy = False
-        if len(self._queue) > 0:
-            queued = self._queue.pop(0)
-            self.send_message(*queued)
 
 
 class PlatformInterfaceCore(object):
@@ -647,6 +1442,12 @@ class PlatformInterfaceCore(object):
                 eprint("Interface {} of {} not found implmentation for method {}".format(
                     self.name, self.host.name, m))
 
+    def routes(self):
+        """
+        :return: list of (interface, method) pairs for messages that are supported by interface
+        """
+        return [(self._base_id, m) for m in self._methods if self._map[m] is not None]
+
     def supports(self, message):
         if message.interface == self._base_id \
                 and message.method in self._methods and self._map[message.method] is not None:
@@ -766,17 +1567,66 @@ def fake_op_message(interface, reply, on_channel=None, on_message=None, after=No
     return new_message(interface, "__testing__", "fake_next_op", options)
 
 
-class PlatformProtocolCore(object):
+class _FakeOp(object):
     """
-    An instance that implements interface's methods
-    Used to separate platform from protocols implementation
-    This class is base class and shouldn't be used by itself
+    Fake-op instruction compiled for matching (see PlatformProtocolCore._register_fake_next_op)
+    Message template is compiled into interface and method to check first and the rest of fields to compare,
+    so incoming messages aren't serialized. Fields that are None in template are not compared
+    """
+    __slots__ = ("info", "interface", "method", "fields", "after")
+
+    def __init__(self, info):
+        """
+        :param info: dict with faking information
+        """
+        self.info = info
+        template = info.get("on_message", None)
+        if template is None:
+            self.interface = None
+            self.method = None
+            self.fields = ()
+        else:
+            self.interface = template.interface
+            self.method = template.method
+            self.fields = tuple((n, getattr(template, n)) for n in ("sender", "args", "kwargs")
+                                if getattr(template, n) is not None)
+        self.after = info.get("after", 0)     # Amount of matched messages to skip before faking
+
+    def matches(self, message):
+        """
+        :param message: PlatformMessage instance
+        :return: True if message matches instruction's template
+        """
+        if self.method is not None and self.method != message.method:
+            return False
+        if self.interface is not None and self.interface != message.interface:
+            return False
+        for n, v in self.fields:
+            if getattr(message, n) != v:
+                return False
+        return True
+
+
+class PlatformProtocolCore(object):
+    """
+    An instance that implements interface's methods
+    Used to separate platform from protocols implementation
+    This class is base class and shouldn't be used by itself
     Derive class from this one and set _default_interface to class of Interface that is supported
     """
     _default_interface = None   # Protocol is a worker for that Interface Class (and it supports interface's methods)
     # NOTE: all protocols supports method 'testing'. It's built-in into PlatformProtocolCore
     _protocol_fields = ()    # Set of fields that should be supported by worker (look __init__ for details)
     _protocol_methods = ()   # Set of methods that should be supported by worker (look __init__ for details)
+    _fsm_notify = False      # If True then protocol's notifies are progress of FSM and they are always sent
+
+    notify_modes = ("all", "coalesce", "drop")
+    # Notify modes:
+    # * all - every notify is sent
+    # * coalesce - notify is held until message's processing is done. It's dropped if reply to same context
+    #              is sent by that moment, otherwise only latest notify for a context is sent
+    # * drop - notifies are not sent at all
+    # NOTE: protocols with _fsm_notify set (i.e. platformix start/stop) are sending notifies in any mode
 
     def __init__(self, host, worker, interface=None, name=""):
         """
@@ -813,12 +1663,41 @@ class PlatformProtocolCore(object):
             self._interface = interface
 
         self._context = None    # Context for FSM methods
-        self._fake_ops = {}     # Directions to fake some ops when running
+        self._fake_ops = {}     # Directions to fake some ops when running. Key is channel and value is queue
+                                # of compiled instructions (see _FakeOp). Only head of queue is matched
+        self._notify_mode = None    # Protocol's notify mode. If None then farm's notify mode is used
+        self._pending_notify = {}   # Notifies held in coalesce mode. Key is context and value is notify's content
+        self._notify_stats = {"sent": 0, "dropped": 0, "coalesced": 0}
 
     @property
     def name(self):
         return self._interface.name
 
+    @property
+    def notify_mode(self):
+        """
+        :return: protocol's notify mode (see notify_modes)
+        """
+        if self._notify_mode is not None:
+            return self._notify_mode
+        return getattr(self._host.farm, "notify", "all")
+
+    @notify_mode.setter
+    def notify_mode(self, value):
+        """
+        :param value: notify mode (see notify_modes). Set to None to use farm's notify mode
+        """
+        assert value is None or value in self.notify_modes, "Unknown notify mode '{}'. Expected one of {}".format(
+            value, self.notify_modes)
+        self._notify_mode = value
+
+    @property
+    def notify_stats(self):
+        """
+        :return: dict with amount of sent notifies and notifies that were suppressed (dropped or coalesced)
+        """
+        return dict(self._notify_stats)
+
     @property
     def id(self):
         return self._interface.id
@@ -877,8 +1756,34 @@ class PlatformProtocolCore(object):
             return True
         return self._interface.supports(message)
 
+    def routes(self):
+        """
+        :return: list of (interface, method) pairs for messages that could be processed by protocol
+        """
+        return [(self.name, '__testing__')] + self._interface.routes()
+
     def _notify(self, context, message):
-        self._worker.reply(context, PlatformMessage.notify(message))
+        mode = "all" if self._fsm_notify else self.notify_mode
+        if mode == "all":
+            self._notify_stats["sent"] += 1
+            self._worker.reply(context, PlatformMessage.notify(message))
+        elif mode == "drop":
+            self._notify_stats["dropped"] += 1
+        else:
+            if context in self._pending_notify:
+                self._notify_stats["coalesced"] += 1
+            self._pending_notify[context] = message
+
+    def _flush_notify(self):
+        """
+        Sends notifies that were held in coalesce mode
+        :return: None
+        """
+        pending = self._pending_notify
+        self._pending_notify = {}
+        for context, message in pending.items():
+            self._notify_stats["sent"] += 1
+            self._worker.reply(context, PlatformMessage.notify(message))
 
     def _notify_all(self, contexts, message):
         for c in contexts:
@@ -886,6 +1791,8 @@ class PlatformProtocolCore(object):
 
     def _reply(self, context, result, fake_reply):
         assert isinstance(result, ProtocolReply), "Worker should return result as ProtocolReply instance"
+        if self._pending_notify and self._pending_notify.pop(context, None) is not None:
+            self._notify_stats["coalesced"] += 1    # NOTE: reply tells more than notify, so notify isn't sent
         if fake_reply is not None:
             if result.success and "on_success" in fake_reply:
                 result = fake_reply["on_success"]
@@ -909,26 +1816,6 @@ class PlatformProtocolCore(object):
         else:
             return True
 
-    @staticmethod
-    def _fake_message_compare(m1, m2):
-        """
-        Checks whether or not reply to message m2 should be faked
-        If m1's field is None then m2's field value is not compared at all
-        :param m1: Message template. Expected PlatformMessage instance
-        :param m2: Message to check. Expected PlatformMessage instance
-        :return: True if message are treated as equal otherwise - False
-        """
-        m1 = m1.serialize()
-        m2 = m2.serialize()
-        diff = False
-        for i in range(len(m1)):
-            if m1[i] is None:
-                continue
-            if m1[i] != m2[i]:
-                diff = True
-                break
-        return not diff
-
     def _register_fake_next_op(self, channel, fake_info):
         """
         Registers information for faking replies
@@ -1003,10 +1890,10 @@ class PlatformProtocolCore(object):
             if "on_channel" in f:
                 assert isinstance(f["on_channel"], (str, list, tuple)), \
                     "fake_info option 'on_channel' should be a string or list/tuple of strings"
-            if isinstance(f["on_channel"], (list, tuple)):
-                for c in f["on_channel"]:
-                    assert isinstance(c, str), \
-                        "fake_info option 'on_channel' should be a string or list/tuple of strings"
+                if isinstance(f["on_channel"], (list, tuple)):
+                    for c in f["on_channel"]:
+                        assert isinstance(c, str), \
+                            "fake_info option 'on_channel' should be a string or list/tuple of strings"
             if "after" in f:
                 assert isinstance(f["after"], int), "fake_info option 'after' should be an integer"
             if "on_channel" not in f:
@@ -1016,11 +1903,12 @@ class PlatformProtocolCore(object):
             else:
                 on_channel = f["on_channel"],
 
+            op = _FakeOp(f)
             for c in on_channel:
                 if c not in self._fake_ops:
-                    self._fake_ops[c] = [f]
+                    self._fake_ops[c] = deque([op])
                 else:
-                    self._fake_ops[c].append(f)
+                    self._fake_ops[c].append(op)
 
     def _general_testing(self, context, kind, *args, **kwargs):
         """
@@ -1045,39 +1933,36 @@ class PlatformProtocolCore(object):
         :param message: message content
         :return: True if reply were faked otherwise False
         """
-        if context.channel in self._fake_ops:
-            channel = context.channel
-            if len(self._fake_ops[channel]) > 0:
-                if "on_message" not in self._fake_ops[channel][0] \
-                        or self._fake_message_compare(self._fake_ops[channel][0]["on_message"], message):
-                    if "after" in self._fake_ops[channel][0] and self._fake_ops[channel][0]["after"] > 0:
-                        if dry_run:
-                            return False
-                        self._fake_ops[channel][0]["after"] -= 1
-                        return False
-                    if dry_run:
-                        return True
-                    instruction = self._fake_ops[channel].pop(0)
-                    if len(self._fake_ops[channel]) == 0:
-                        del self._fake_ops[channel]
-                    vprint("{}: faking reply".format(self.name))
-                    reply = instruction["reply"]
-                    if "execute" in instruction and instruction["execute"] == True:
-                        result = {}
-                        if instruction["on_success"]:
-                            result["on_success"] = reply
-                        if instruction["on_failure"]:
-                            result["on_failure"] = reply
-                        return result
-                    if reply.success:
-                        self._worker.reply(context, PlatformMessage.success(reply.retval, reply.retval_name))
-                    else:
-                        self._worker.reply(context, PlatformMessage.failure(reply.state, reply.errcode))
-                    return True
-            else:
-                # TODO: Shouln't be here actually. Raise error!
-                del self._fake_ops[channel]
-        return False
+        ops = self._fake_ops.get(context.channel, None)
+        if ops is None:
+            return False
+        op = ops[0]
+        if not op.matches(message):
+            return False
+        if op.after > 0:
+            if not dry_run:
+                op.after -= 1
+            return False
+        if dry_run:
+            return True
+        ops.popleft()
+        if len(ops) == 0:
+            del self._fake_ops[context.channel]
+        vlog("{}: faking reply", self.name)
+        instruction = op.info
+        reply = instruction["reply"]
+        if "execute" in instruction and instruction["execute"] == True:
+            result = {}
+            if instruction["on_success"]:
+                result["on_success"] = reply
+            if instruction["on_failure"]:
+                result["on_failure"] = reply
+            return result
+        if reply.success:
+            self._worker.reply(context, PlatformMessage.success(reply.retval, reply.retval_name))
+        else:
+            self._worker.reply(context, PlatformMessage.failure(reply.state, reply.errcode))
+        return True
 
     def _process_message_general(self, context, message):
         """
@@ -1086,7 +1971,7 @@ class PlatformProtocolCore(object):
         :param message: message content
         :return: True if message were processed otherwise False
         """
-        f = self._fake_next_op(context, message)
+        f = self._fake_next_op(context, message) if self._fake_ops else False
 
         if f is True:
             return True
@@ -1114,6 +1999,8 @@ class PlatformProtocolCore(object):
             self._interface.incoming(context, message, r)
         else:
             self._interface.incoming(context, message, None)
+        if self._pending_notify:
+            self._flush_notify()
 
     def _validate_context(self, content):
         """
@@ -1138,6 +2025,69 @@ class _ExposedFarmData(object):
         self.channels = channels
 
 
+class WallClock(object):
+    """
+    Clock that is used by farm and platforms for timeouts. Tells real time
+    """
+    virtual = False
+
+    def now(self):
+        """
+        :return: current time in seconds. Only differences between values are meaningful
+        """
+        return time.monotonic()
+
+    def sleep(self, delay):
+        """
+        Suspends caller for a delay
+        :param delay: delay in seconds
+        :return: Nothing
+        """
+        time.sleep(delay)
+
+    def waited(self, delay):
+        """
+        Tells clock that caller have been blocked for a delay (i.e. blocking I/O call has timed out)
+        Real time have passed already so nothing is done
+        :param delay: delay in seconds
+        :return: Nothing
+        """
+        pass
+
+
+class VirtualClock(WallClock):
+    """
+    Clock for deterministic timeouts. Time is moved by farm only, when farm is idle while replies are awaited,
+    straight to the nearest timeout. Sleeps and blocking I/O timeouts are moving time too, but no real time is spent
+    on sleeps. Time that were spent on processing isn't taken into account, so timeouts are reproducible
+    """
+    virtual = True
+
+    def __init__(self):
+        self._now = 0.0
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def sleep(self, delay):
+        self.waited(delay)
+
+    def waited(self, delay):
+        with self._lock:
+            self._now += max(delay, 0.0)
+
+    def advance_to(self, when):
+        """
+        Moves time forward up to specified moment. Nothing is done if it's in the past
+        :param when: moment as returned by now()
+        :return: Nothing
+        """
+        with self._lock:
+            if when > self._now:
+                self._now = when
+
+
 class PlatformsFarm(object):
     """
     Class that hosts platforms instances
@@ -1146,6 +2096,8 @@ class PlatformsFarm(object):
     * talk channels to allow communications between platforms
     """
 
+    awaitable = False   # True if farm is driven by event loop, so requests are processed while they are awaited
+
     def __init__(self, env, verbose=False):
         self._timeref = time.time()
         self._env = env         # Reference to environment object
@@ -1157,6 +2109,47 @@ class PlatformsFarm(object):
         self._send_message_level = 0  # current nesting level of send message method
         # Since every message can invoke other message sending, send_message would be called multiple times
         # _send_message_level helps to track send_message nesting
+        self._ready = deque()   # Platforms that have received messages, in order they've became ready
+        self._queued = {}       # Platforms with messages queued for processing (dict is used as ordered set)
+
+        # Multithreading mode. Platforms are processed by pool of worker threads.
+        # Each platform is processed by at most one worker at a time so protocols are kept single-threaded
+        self._threaded = pref.multithreading
+        self._lock = threading.Lock()   # Protects workers data below and _replies
+        self._work_cv = threading.Condition(self._lock)  # Signals workers that there is a platform to process
+        self._idle_cv = threading.Condition(self._lock)  # Signals waiters that all platforms are processed
+        self._work = deque()        # Platforms to be processed by workers
+        self._scheduled = set()     # Platforms that are in _work or are processed by workers right now
+        self._workers = []          # Worker threads. Started on demand and stopped by stop_workers
+        self._worker_errors = []    # Exceptions raised by platforms in worker threads
+        self._nested = set()        # Platforms which workers are waiting for replies on requests (see _wait_nested)
+        self._released = 0          # Amount of platforms processings that were done. Waiters are checking it
+                                    # before going to sleep so they won't miss progress that were made meanwhile
+        self._sleepers = 0          # Amount of threads that are waiting for progress (see _sleep)
+        self._sleeping = set()      # Platforms which workers are sleeping while waiting for replies
+        self._idle_workers = 0      # Amount of workers that are waiting for work
+        self._tls = threading.local()   # Used to distinguish worker threads and to get platform they're processing
+
+        # Platforms hosted by child processes (see core.platformix_process). They process messages concurrently
+        # so farm waits until they are done before messaging is treated as settled down
+        self._processes = []
+        self._processes_event = threading.Event()   # Set when platform hosted by child process becomes ready
+        # Bridges to remote farms (see core.platformix_bridge). Farm waits until remote farms are done with messages
+        # that were sent to them too
+        self._bridges = []
+
+        # Timers for reply waits timeouts. Heap of [deadline, sequence number, callback, args] entries.
+        # Cancelled timers are left in heap with callback set to None and are dropped when their deadline has come
+        self._timers = []
+        self._timers_seq = itertools.count()
+        # Clock for timeouts. Platforms are using farm's clock too
+        self._clock = VirtualClock() if pref.virtual_clock else WallClock()
+        self._notify = pref.notify  # Notify mode for platforms protocols (see PlatformProtocolCore.notify_modes)
+        # Direct calls (see direct_call). In multithreading mode platforms are processed by workers only,
+        # so requests are always sent via channels
+        self._direct_calls = pref.direct_calls and not self._threaded
+        self._direct = {}           # Direct calls in progress. Key is context and value is requester
+        self._taps = []             # Passive observers of channels (see Tap). Drained when transaction is ended
 
         self._replies = {}      # nested dict structure:
         # level_1     - keys are channels
@@ -1170,6 +2163,39 @@ class PlatformsFarm(object):
         """
         return _ExposedFarmData(self._platforms, self._awaiting, self._channels)
 
+    @property
+    def clock(self):
+        """
+        :return: farm's clock (see WallClock and VirtualClock)
+        """
+        return self._clock
+
+    @property
+    def notify(self):
+        """
+        :return: notify mode for platforms protocols (see PlatformProtocolCore.notify_modes)
+        """
+        return self._notify
+
+    @notify.setter
+    def notify(self, value):
+        assert value in PlatformProtocolCore.notify_modes, "Unknown notify mode '{}'. Expected one of {}".format(
+            value, PlatformProtocolCore.notify_modes)
+        self._notify = value
+
+    def notify_stats(self):
+        """
+        Sums notifies statistics of platforms protocols
+        NOTE: platforms hosted by child processes are not counted
+        :return: dict with amount of sent notifies and notifies that were suppressed (dropped or coalesced)
+        """
+        result = {"sent": 0, "dropped": 0, "coalesced": 0}
+        for p in self._platforms.values():
+            for protocol in getattr(p, "_protocols", {}).values():
+                for k, v in protocol.notify_stats.items():
+                    result[k] += v
+        return result
+
     def is_running(self, platform):
         """
         Returns running state for specified platform
@@ -1373,7 +2399,10 @@ class PlatformsFarm(object):
         :return: Nothing
         """
         if channel not in self._channels:
-            self._channels[channel] = TalkChannel(channel, print_messages=self.verbose, timeref=self._timeref)
+            self._channels[channel] = TalkChannel(channel, print_messages=self.verbose, timeref=self._timeref,
+                                                  retention=pref.conversation_retention,
+                                                  ring_size=pref.conversation_ring_size,
+                                                  release_completed=pref.release_completed_threads)
         self._channels[channel].subscribe(inst)
 
     def unsubscribe(self, inst, channel):
@@ -1391,6 +2420,514 @@ class PlatformsFarm(object):
         # if len(self._channels[channel].subscribers) == 0:
         #     del self._channels[channel]
 
+    def add_tap(self, tap, channel):
+        """
+        Adds passive observer onto channel. Channel is created if it doesn't exist yet
+        :param tap: Tap instance
+        :param channel: channel's name
+        :return: Nothing
+        """
+        if channel not in self._channels:
+            self._channels[channel] = TalkChannel(channel, print_messages=self.verbose, timeref=self._timeref,
+                                                  retention=pref.conversation_retention,
+                                                  ring_size=pref.conversation_ring_size,
+                                                  release_completed=pref.release_completed_threads)
+        self._channels[channel].add_tap(tap)
+        if tap not in self._taps:
+            self._taps.append(tap)
+
+    def remove_tap(self, tap, channel):
+        """
+        Removes passive observer from channel. Buffered records are delivered
+        :param tap: Tap instance
+        :param channel: channel's name
+        :return: Nothing
+        """
+        if channel in self._channels:
+            self._channels[channel].remove_tap(tap)
+        tap.drain()
+        if not any(tap in c._taps for c in self._channels.values()) and tap in self._taps:
+            self._taps.remove(tap)
+
+    def drain_taps(self):
+        """
+        Delivers records buffered by taps to observers. Called when transaction is ended
+        :return: Nothing
+        """
+        for tap in list(self._taps):
+            tap.drain()
+
+    def reroute(self, inst):
+        """
+        Updates routing tables of channels that specified platform is subscribed to
+        Should be called when platform changes set of messages it accepts
+        :param inst: platform instance
+        :return: Nothing
+        """
+        for c in self._channels.values():
+            if inst in c._subscribed:
+                c.reroute()
+
+    def mark_ready(self, inst):
+        """
+        Enlists platform into ready queue. Should be called by platform when it's received messages queue
+        becomes non-empty so only platforms with pending work are visited on messages processing
+        In multithreading mode platform is passed to worker threads unless it's already scheduled
+        :param inst: platform instance
+        :return: Nothing
+        """
+        if not self._threaded:
+            self._ready.append(inst)
+            return
+        with self._lock:
+            if inst in self._scheduled:
+                if inst in self._nested:    # Wake up worker that waits for replies on behalf of platform
+                    self._idle_cv.notify_all()
+                return
+            self._scheduled.add(inst)
+            self._work.append(inst)
+            if len(self._workers) == 0:
+                self._add_workers(pref.worker_threads)
+            self._work_cv.notify()
+
+    def mark_ready_threadsafe(self, inst):
+        """
+        Thread-safe counterpart of mark_ready. Used by platforms that receive messages in other threads
+        (like platforms hosted by child processes)
+        :param inst: platform instance
+        :return: Nothing
+        """
+        self.mark_ready(inst)   # NOTE: ready queue is a deque and multithreading mode is locked so it's thread-safe
+        self._processes_event.set()
+
+    def add_process(self, inst):
+        """
+        Enlists platform hosted by child process
+        :param inst: PlatformProcess instance
+        :return: Nothing
+        """
+        self._processes.append(inst)
+
+    def add_bridge(self, bridge):
+        """
+        Enlists bridge to remote farm
+        :param bridge: FarmBridge instance
+        :return: Nothing
+        """
+        self._bridges.append(bridge)
+
+    @property
+    def processes_busy(self):
+        """
+        :return: True if any platform hosted by child process is processing messages
+                 or if any remote farm is processing messages that were sent to it
+        """
+        return self._processes_busy()
+
+    def _processes_busy(self, local=False):
+        """
+        :param local: If True then remote farms are not taken into account
+        :return: True if any platform hosted by child process (or remote farm) is processing messages
+        """
+        return any(p.busy for p in self._processes) or (not local and any(b.busy for b in self._bridges))
+
+    def _wait_processes(self, local=False):
+        """
+        Waits until any platform hosted by child process becomes ready if there are busy ones
+        :param local: If True then remote farms are not waited
+        :return: True if there were busy platforms, otherwise False
+        """
+        if not self._processes_busy(local):
+            return False
+        self._processes_event.wait(0.1)
+        self._processes_event.clear()
+        return True
+
+    def wait_marked_ready(self, timeout=None):
+        """
+        Waits until platform is marked ready by other thread (see mark_ready_threadsafe)
+        :param timeout: timeout in seconds. If None then waits forever
+        :return: True if platform were marked ready, False on timeout
+        """
+        r = self._processes_event.wait(timeout)
+        self._processes_event.clear()
+        return r
+
+    def settle(self):
+        """
+        Processes messages until there is nothing to process within the farm. Platforms hosted by child processes
+        are waited too, but remote farms are not. Platforms that are waiting for replies within workers
+        (see _wait_nested) are treated as settled down
+        Should be called by non-worker thread
+        :return: Nothing
+        """
+        if self._threaded:
+            with self._lock:
+                while not self._quiescent(local=True) and len(self._worker_errors) == 0:
+                    self._sleep(0.01)
+            return
+        while True:
+            if len(self._ready) > 0:
+                self.process_messages()
+            elif not self._fire_timers() and not self._wait_processes(local=True):
+                return
+
+    def close_processes(self):
+        """
+        Stops child processes which are hosting platforms
+        :return: Nothing
+        """
+        for p in self._processes:
+            p.close()
+
+    def stop_workers(self):
+        """
+        Stops worker threads. Each worker gets stop sentinel from work queue and workers are joined
+        Should be called by non-worker thread when messaging is settled down. Workers are started again on demand
+        :return: Nothing
+        """
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+            self._work.extend([None] * len(workers))
+            self._work_cv.notify_all()
+        for t in workers:
+            t.join(pref.platform_stop_timeout)
+            if t.is_alive():
+                eprint("Farm's worker {} haven't stopped within {}s".format(t.name, pref.platform_stop_timeout))
+        with self._lock:
+            self._work = deque(p for p in self._work if p is not None)
+
+    def _add_workers(self, count):
+        """
+        Starts worker threads. Should be called with farm's lock acquired
+        :param count: amount of workers to start
+        :return: Nothing
+        """
+        for n in range(0, count):
+            t = threading.Thread(target=self._worker, name="farm-worker-{}".format(len(self._workers)), daemon=True)
+            self._workers.append(t)
+            t.start()
+
+    @property
+    def in_worker(self):
+        """
+        :return: True if called from farm's worker thread
+        """
+        return getattr(self._tls, "worker", False)
+
+    def _worker(self):
+        """
+        Worker thread's loop. Takes platforms from work queue and processes their messages
+        Worker exits when it takes stop sentinel (None) from the queue (see stop_workers)
+        :return: Nothing
+        """
+        self._tls.worker = True
+        self._tls.platforms = []
+        while True:
+            with self._lock:
+                self._idle_workers += 1
+                while len(self._work) == 0:
+                    self._work_cv.wait()
+                self._idle_workers -= 1
+                p = self._work.popleft()
+            if p is None:
+                return
+            self._process(p)
+
+    def _process(self, inst):
+        """
+        Processes messages of platform that were taken from work queue and returns it
+        Platforms that are processed by worker are stacked since worker could take other platform from work queue
+        while it waits for replies (see _wait_nested)
+        :param inst: platform instance
+        :return: Nothing
+        """
+        platforms = self._tls.platforms
+        platforms.append(inst)
+        try:
+            inst.queue_received_messages()
+            inst.process_queued_messages()
+        except Exception as e:
+            with self._lock:
+                self._worker_errors.append(e)
+        platforms.pop()
+        self._release(inst)
+
+    def _release(self, inst):
+        """
+        Returns platform taken for processing. If it has received messages meanwhile then it's scheduled again
+        :param inst: platform instance
+        :return: Nothing
+        """
+        with self._lock:
+            self._released += 1
+            if inst.received_messages > 0:
+                self._work.append(inst)
+                self._work_cv.notify()
+            else:
+                self._scheduled.discard(inst)
+                if len(self._scheduled) == 0 or self._sleepers > 0:
+                    self._idle_cv.notify_all()
+
+    def _quiescent(self, local=False, owned=()):
+        """
+        Checks if there is nothing to process besides platforms that are waiting for replies within workers
+        and which workers are sleeping (i.e. they are not processing messages within the wait right now)
+        Should be called with farm's lock acquired
+        :param local: If True then remote farms are not taken into account
+        :param owned: platforms of worker that is checking, they are treated as sleeping ones
+        :return: True if no one could progress
+        """
+        return len(self._work) == 0 and all((p in owned or p in self._sleeping) and p.received_messages == 0
+                                            for p in self._scheduled) and not self._processes_busy(local)
+
+    def _wait_nested(self, inst, context, replies, registered):
+        """
+        Waits for replies on request that were sent by platform while it's processed by worker
+        It's multithreaded counterpart of nested messages processing - platform's own messages are processed
+        by the same worker meanwhile (so platform stays single-threaded) and other platforms are processed by
+        other workers. To keep workers pool from being exhausted by waiters extra worker is started if necessary,
+        up to pref.max_worker_threads workers. When there are that many workers already and all of them are busy,
+        waiting worker processes other platform from work queue itself, just like nested processing does.
+        Messages of all platforms that are processed by worker are processed within the wait, so platform
+        that were taken by worker could rely on platforms that are waiting below it in worker's stack
+        Worker sleeps until platform receives messages or other platform is processed (see mark_ready and _release)
+        or until request's timeout
+        :param inst: platform that is processed by current worker
+        :param context: messaging context of request
+        :param replies: dict with replies that are collected for context's thread
+        :param registered: True if platform has registered reply handler for context
+        :return: Nothing
+        """
+        with self._lock:
+            outer = inst not in self._nested   # NOTE: wait could be nested into processing within other wait
+            self._nested.add(inst)
+            if len(self._workers) - len(self._nested) < pref.worker_threads \
+                    and len(self._workers) < max(pref.max_worker_threads, pref.worker_threads):
+                self._add_workers(1)
+        owned = self._tls.platforms
+        try:
+            while True:
+                released = self._released
+                inst.queue_received_messages()
+                inst.process_queued_messages()
+                for p in owned:
+                    if p is not inst and p.received_messages > 0:
+                        p.queue_received_messages()
+                        p.process_queued_messages()
+                if registered:
+                    if not inst.waiting_reply_on(context, None):
+                        return
+                elif len(replies) > 0 and all(m.is_failure or m.is_success for m in list(replies.values())):
+                    return
+                other = None
+                with self._lock:
+                    if self._quiescent(owned=owned):
+                        deadline = inst.reply_deadline if registered and self._clock.virtual else None
+                        if deadline is None:
+                            return
+                        self._clock.advance_to(deadline)    # Virtual time is moved to the request's timeout
+                    elif self._released != released or any(p.received_messages > 0 for p in owned):
+                        pass
+                    elif len(self._work) > 0 and self._work[0] is not None and self._idle_workers == 0 and \
+                            len(self._workers) >= max(pref.max_worker_threads, pref.worker_threads):
+                        other = self._work.popleft()
+                    else:
+                        self._sleeping.update(owned)
+                        try:
+                            self._sleep(self._poll_timeout(*owned))
+                        finally:
+                            self._sleeping.difference_update(owned)
+                if other is not None:
+                    self._process(other)
+        finally:
+            if outer:
+                with self._lock:
+                    self._nested.discard(inst)
+
+    def _sleep(self, timeout):
+        """
+        Waits until any platform is processed or until timeout. Should be called with farm's lock acquired
+        :param timeout: timeout in seconds or None
+        :return: Nothing
+        """
+        self._sleepers += 1
+        try:
+            self._idle_cv.wait(timeout)
+        finally:
+            self._sleepers -= 1
+
+    def _poll_timeout(self, *platforms):
+        """
+        In multithreading mode reply waits timeouts are polled (see call_later). Returns time to sleep
+        until nearest timeout of specified platforms
+        :return: time in seconds or None if there are no timeouts. With child processes or bridges time is limited
+                 since they are checked for being busy rather than signaling it
+        """
+        timeout = None
+        now = self._clock.now()
+        for p in platforms:
+            d = getattr(p, "reply_deadline", None)
+            if d is not None and (timeout is None or d - now < timeout):
+                timeout = max(d - now, 0)
+        if len(self._processes) > 0 or len(self._bridges) > 0:
+            timeout = 0.1 if timeout is None else min(timeout, 0.1)
+        return timeout
+
+    @staticmethod
+    def _final(replies):
+        """
+        :param replies: dict with replies that are collected for a thread
+        :return: True if all participants have replied with final replies
+        """
+        return all(m.is_failure or m.is_success for m in list(replies.values()))
+
+    def _wait_settled(self, *replies):
+        """
+        Waits until worker threads have processed all messages and until all final replies are received
+        or no one is waiting for replies anymore
+        Should be called by non-worker thread
+        :param replies: dicts with replies that are collected for threads
+        :return: Nothing
+        """
+        while True:
+            with self._lock:
+                while (len(self._scheduled) > 0 or self.processes_busy) and len(self._worker_errors) == 0:
+                    self._idle_cv.wait(0.1 if len(self._scheduled) == 0 else None)
+                if len(self._worker_errors) > 0:
+                    e = self._worker_errors[0]
+                    self._worker_errors = []
+                    raise e
+                if all(self._final(r) for r in replies):
+                    return
+                # Take all platforms to check waits timeouts without interference with workers
+                platforms = [p for p in self._platforms.values()]
+                self._scheduled.update(platforms)
+                released = self._released + len(platforms)
+            try:
+                waiting = False
+                deadline = None
+                for p in platforms:
+                    if p.waiting_reply:
+                        waiting = True
+                        d = getattr(p, "reply_deadline", None)
+                        if d is not None and (deadline is None or d < deadline):
+                            deadline = d
+            finally:
+                for p in platforms:
+                    self._release(p)
+            if not waiting:
+                return
+            if deadline is not None and self._clock.virtual:
+                self._clock.advance_to(deadline)    # Farm is idle. Virtual time is moved to the nearest timeout
+                continue
+            with self._lock:
+                if len(self._scheduled) == 0 and self._released == released:
+                    self._sleep(self._poll_timeout(*platforms))
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedules callback's call after a delay. Used for reply waits timeouts
+        Expired timers are fired by messages processing loops, so callbacks are called by the same thread
+        that processes platforms. In multithreading mode platforms are processed by workers,
+        so there is no timers and timeouts are polled by platforms (see PlatformBase.waiting_reply_on)
+        :param delay: delay in seconds
+        :param callback: function to call
+        :param args: args for callback
+        :return: timer's handle (see cancel_timer) or None if farm couldn't schedule a call
+        """
+        if self._threaded:
+            return None
+        timer = [self._clock.now() + delay, next(self._timers_seq), callback, args]
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def cancel_timer(self, timer):
+        """
+        Cancels call that were scheduled with call_later
+        :param timer: timer's handle
+        :return: Nothing
+        """
+        timer[2] = None
+        timer[3] = None
+
+    def _fire_timers(self):
+        """
+        Calls callbacks of expired timers
+        :return: True if any callback were called, otherwise False
+        """
+        timers = self._timers
+        if len(timers) == 0:
+            return False
+        now = self._clock.now()
+        fired = False
+        while len(timers) > 0 and timers[0][0] <= now:
+            timer = heapq.heappop(timers)
+            if timer[2] is not None:
+                timer[2](*timer[3])
+                fired = True
+        return fired
+
+    def _awaited(self, context, message, replies):
+        """
+        :param context: messaging context of initial message
+        :param message: initial message
+        :param replies: dict with replies that are collected for context's thread
+        :return: True if not all participants have replied with final replies or if message's sender is waiting
+                 for replies
+        """
+        if not self._final(replies):
+            return True
+        sender = self._platforms.get(message.sender, None)
+        return sender is not None and sender.waiting_reply_on(context, None)
+
+    def _advance_clock(self):
+        """
+        Moves virtual clock to the nearest timer's deadline and fires expired timers
+        Called when farm is idle while replies are awaited so timeouts are reached instantly.
+        Nothing is done if farm's clock is a wall clock
+        :return: True if any callback were called, otherwise False
+        """
+        if not self._clock.virtual:
+            return False
+        timers = self._timers
+        while len(timers) > 0 and timers[0][2] is None:
+            heapq.heappop(timers)
+        if len(timers) == 0:
+            return False
+        self._clock.advance_to(timers[0][0])
+        return self._fire_timers()
+
+    def create_future(self):
+        """
+        Creates future for awaitable requests. Farm isn't driven by event loop so request is completed
+        synchronously (see PlatformBase.request_async) and future is resolved by the time it's returned
+        :return: concurrent.futures.Future. Use asyncio.wrap_future to await it
+        """
+        return concurrent.futures.Future()
+
+    def register_reply_handler(self, inst, context, senders=None):
+        """
+        Tells channel that specified platform is waiting for replies within context's thread
+        :param inst: platform instance
+        :param context: messaging context
+        :param senders: list with names of platforms which replies are awaited. If None then any sender
+        :return: Nothing
+        """
+        if context.channel in self._channels:
+            self._channels[context.channel].register_reply_handler(inst, context.thread, context.interface, senders)
+
+    def unregister_reply_handler(self, inst, context):
+        """
+        Tells channel that specified platform is not waiting for replies within context's thread anymore
+        :param inst: platform instance
+        :param context: messaging context
+        :return: Nothing
+        """
+        if context.channel in self._channels:
+            self._channels[context.channel].unregister_reply_handler(inst, context.thread, context.interface)
+
     def start_thread(self, topic_caster, channel, interface, reply_to_tc=None):
         """
         Starts new thread on specified channel
@@ -1407,6 +2944,17 @@ class PlatformsFarm(object):
             raise ValueError("Channel {} not exists!".format(channel))
         return TalkContext(channel, self._channels[channel].start_thread(topic_caster, reply_to_tc), interface)
 
+    def complete_thread(self, topic_caster, context):
+        """
+        Tells channel that conversation in context's thread is completed
+        Has effect only if called by thread's topic caster
+        :param topic_caster: ref to platform that started thread
+        :param context: messaging context
+        :return: Nothing
+        """
+        if context.channel in self._channels:
+            self._channels[context.channel].complete_thread(context.thread, topic_caster)
+
     @property
     def send_message_in_progress(self):
         return self._send_message_level > 0
@@ -1434,13 +2982,38 @@ class PlatformsFarm(object):
         if processing == 2 and message.is_reply:
             raise ValueError("Processing level 2 can be set only for initial (non-reply) messages")
 
+        if self._direct and message.is_reply:
+            requester = self._direct.get(context, None)
+            if requester is not None:   # NOTE: reply within direct call is passed straight to requester
+                self._channels[context.channel].direct_message(context, message, requester.name)
+                requester.receive_direct_reply(context, message)
+                return None
+
         if context.channel not in self._channels:
             raise ValueError("Channel {} not exists!".format(context.channel))
 
+        nested = None
+        if self._threaded and processing > 0 and self.in_worker:
+            # NOTE: worker doesn't process messages of other platforms - it's done by other workers.
+            #       But if platform that is processed by worker sends a request then worker waits for replies.
+            #       Sender could be any of platforms that are stacked within worker (see _wait_nested)
+            if processing == 2:
+                nested = next((p for p in reversed(self._tls.platforms) if p.name == message.sender), None)
+            if nested is None:
+                processing = 0
+
         print_level_change = pref.send_message_print_level_change
 
         if processing == 2:
-            self._send_message_level += 1   # Increase level if processing == 2
+            with self._lock:
+                self._send_message_level += 1   # Increase level if processing == 2
+                # Register replies collection before sending since replies could come from workers right away
+                if context.channel not in self._replies:
+                    self._replies[context.channel] = {}
+                assert context.thread not in self._replies[context.channel], \
+                    "PlatformsFarm:send_message Unexpectedly received second initial (non-reply) message " \
+                    "for {}:{}".format(context.channel, context.thread)
+                replies = self._replies[context.channel][context.thread] = {}
             if print_level_change:
                 vprint("send message level changed to: {}".format(self._send_message_level))
 
@@ -1449,17 +3022,15 @@ class PlatformsFarm(object):
             self._channels[context.channel].send_message(context, message)
             # Register replies
             if message.is_reply:
-                self._replies[context.channel][context.thread][message.sender] = message
-            else:
-                if context.channel not in self._replies:
-                    self._replies[context.channel] = {}
-                assert context.thread not in self._replies[context.channel], \
-                    "PlatformsFarm:send_message Unexpectedly received second initial (non-reply) message " \
-                    "for {}:{}".format(context.channel, context.thread)
-                self._replies[context.channel][context.thread] = {}
+                with self._lock:
+                    collected = self._replies.get(context.channel, {}).get(context.thread, None)
+                    if collected is not None:
+                        collected[message.sender] = message
         except Exception as e:
             if processing == 2:
-                self._send_message_level -= 1
+                with self._lock:
+                    self._send_message_level -= 1
+                    self._replies[context.channel].pop(context.thread, None)
                 if print_level_change:
                     vprint("send message level changed to: {}".format(self._send_message_level))
             raise e
@@ -1468,44 +3039,424 @@ class PlatformsFarm(object):
         if processing == 0:
             return None
 
+        if self._threaded:
+            if processing == 2:
+                try:
+                    if nested is None:
+                        self._wait_settled(replies)
+                    else:
+                        self._wait_nested(nested, context, replies, nested.waiting_reply_on(context, None))
+                finally:
+                    with self._lock:
+                        self._send_message_level -= 1
+                        self._replies[context.channel].pop(context.thread)
+                        ended = self._send_message_level == 0
+                if print_level_change:
+                    vprint("send message level changed to: {}".format(self._send_message_level))
+                if ended and self._taps:
+                    self.drain_taps()
+                return replies
+            return None
+
         stay_in_loop = True
         while stay_in_loop:
             stay_in_loop = False
             # Process messages if any platform received messages
-            if any(p.received_messages > 0 for p in self._platforms.values()):
+            if len(self._ready) > 0:
                 self.process_messages()
                 if processing == 2:       # If processing is 2, then stay in loop as there could be responses
                     stay_in_loop = True
-            if processing == 2 and not stay_in_loop:    # If no more processing expected
-                # But it's multithreadning case and not all final replies were received yet
-                if pref.multithreading and not all(m.is_failure or m.is_success
-                                                   for m in self._replies[context.channel][context.thread].values()):
-                    # And some platforms are still waiting for reply - just wait a bit
-                    if any(p.waiting_reply for p in self._platforms.values()):
-                        time.sleep(0.001)
-                        stay_in_loop = True
+            elif self._fire_timers():
+                stay_in_loop = True     # Timeouts handlers could send messages
+            elif processing == 2 and self._wait_processes():
+                stay_in_loop = True     # Platforms hosted by child processes are still processing messages
+            elif processing == 2 and self._awaited(context, message, replies) and self._advance_clock():
+                stay_in_loop = True     # Farm is idle while replies are awaited. Virtual time is moved to timeout
 
         if processing == 2:
             self._send_message_level -= 1
             if print_level_change:
                 vprint("send message level changed to: {}".format(self._send_message_level))
             result = self._replies[context.channel].pop(context.thread)
+            if self._send_message_level == 0 and self._taps:
+                self.drain_taps()
             return result
         else:
             return None
 
+    def subscribers_names(self, channel):
+        """
+        :param channel: channel's name
+        :return: set with names of channel's subscribers. Empty set if there is no such channel
+        """
+        if channel not in self._channels:
+            return set()
+        return set(getattr(s, "name", None) for s in self._channels[channel].subscribers)
+
+    def direct_receiver(self, inst, channel, message):
+        """
+        Returns platform that request could be passed to directly, bypassing channel (see direct_call)
+        :param inst: requester platform instance
+        :param channel: channel's name
+        :param message: request message
+        :return: platform instance or None if request should be sent via channel
+        """
+        if not self._direct_calls or channel not in self._channels:
+            return None
+        return self._channels[channel].direct_receiver(inst, message)
+
+    def direct_call(self, inst, target, context, message):
+        """
+        Passes request straight to the only platform that would receive it on channel (see direct_receiver)
+        Request is processed by target right away, without queueing. Replies that are sent by target while
+        request is processed are passed straight to requester. Later replies are sent via channel
+        (see wait_reply). Request and replies are logged into channel's conversation as usual deliveries
+        :param inst: requester platform instance. Reply handler should be registered already
+        :param target: platform instance that processes request
+        :param context: messaging context
+        :param message: request message
+        :return: Nothing
+        """
+        self._channels[context.channel].direct_message(context, message, target.name)
+        self._direct[context] = inst
+        try:
+            target.receive_direct_message(context, message)
+        finally:
+            self._direct.pop(context, None)
+
+    def wait_reply(self, inst, context):
+        """
+        Keeps processing messages while platform is waiting for replies within context, the same way
+        as send_message does for initial message. Used when direct call isn't completed right away
+        :param inst: platform instance
+        :param context: messaging context
+        :return: Nothing
+        """
+        while inst.waiting_reply_on(context, None):
+            if len(self._ready) > 0:
+                self.process_messages()
+            elif not self._fire_timers() and not self._wait_processes() and not self._advance_clock():
+                break
+
+    def congested(self, channel, message):
+        """
+        Backpressure signal for stimulus generators
+        :param channel: channel's name
+        :param message: initial (non-reply) message
+        :return: True if any platform that would receive message on channel has full mailbox
+        """
+        return channel in self._channels and self._channels[channel].congested(message)
+
+    def relieve(self, channel, message):
+        """
+        Keeps processing messages while platforms that would receive message on channel have full mailboxes.
+        Returns anyway if messaging is settled down (i.e. mailbox can't be relieved by processing)
+        :param channel: channel's name
+        :param message: initial (non-reply) message
+        :return: Nothing
+        """
+        while True:
+            released = self._released
+            if not self.congested(channel, message):
+                return
+            if self._threaded:
+                with self._lock:
+                    if self._quiescent():
+                        return
+                    if self._released == released:
+                        self._sleep(self._poll_timeout(*self._scheduled))
+            elif len(self._ready) > 0:
+                self.process_messages()
+            elif not self._fire_timers() and not self._wait_processes() and not self._advance_clock():
+                return
+
+    def send_messages(self, contexts, messages, in_flight=None):
+        """
+        Sends batch of initial messages, each into it's own thread, and keeps processing messages queues until
+        every participant get answer or timeout (like send_message with processing 2 does for single message)
+        Up to in_flight messages are in progress at once. Next message is sent as soon as all participants of
+        a message in progress have replied with final replies. In multithreading mode messages are sent by groups
+        of in_flight messages and next group is sent after previous is settled down
+        Next message is held while any of it's receivers has full mailbox (see congested)
+        :param contexts: list with messaging contexts (with distinct threads)
+        :param messages: list with PlatformMessage instances (initial messages)
+        :param in_flight: amount of messages that could be in progress at once. If None then all messages are sent
+                          at once
+        :return: list with replies to each of contexts
+        """
+        assert len(contexts) == len(messages), "Expecting a context for each message"
+        if in_flight is None:
+            in_flight = max(len(messages), 1)
+        assert in_flight > 0, "Amount of messages in progress should be positive"
+        for context, message in zip(contexts, messages):
+            if message.is_reply:
+                raise ValueError("Only initial (non-reply) messages could be sent by batch")
+            if context.channel not in self._channels:
+                raise ValueError("Channel {} not exists!".format(context.channel))
+
+        replies = []
+        with self._lock:
+            self._send_message_level += 1
+            for context in contexts:
+                collected = self._replies.setdefault(context.channel, {})
+                assert context.thread not in collected, \
+                    "PlatformsFarm:send_messages Unexpectedly received second initial (non-reply) message " \
+                    "for {}:{}".format(context.channel, context.thread)
+                replies.append(collected.setdefault(context.thread, {}))
+        try:
+            if self._threaded:
+                for i in range(0, len(messages), in_flight):
+                    for j in range(i, min(i + in_flight, len(messages))):
+                        self.relieve(contexts[j].channel, messages[j])
+                        self.send_message(contexts[j], messages[j], 0)
+                    self._wait_settled(*replies[i:i + in_flight])
+                return replies
+
+            sent = 0
+            active = []     # Replies of messages in progress
+            while True:
+                while sent < len(messages) and len(active) < in_flight:
+                    if len(self._ready) > 0 and self.congested(contexts[sent].channel, messages[sent]):
+                        break   # NOTE: received messages are processed to relieve mailboxes before next is sent
+                    self.send_message(contexts[sent], messages[sent], 0)
+                    active.append(replies[sent])
+                    sent += 1
+                if len(self._ready) > 0:
+                    self.process_messages()
+                elif not self._fire_timers() and not self._wait_processes() and \
+                        not (any(not self._final(r) for r in active) and self._advance_clock()):
+                    if sent == len(messages):
+                        break
+                    active = []     # Messaging is settled down
+                    continue
+                active = [r for r in active if len(r) == 0 or not self._final(r)]
+            return replies
+        finally:
+            with self._lock:
+                self._send_message_level -= 1
+                for context in contexts:
+                    self._replies[context.channel].pop(context.thread, None)
+                ended = self._send_message_level == 0
+            if ended and self._taps:
+                self.drain_taps()
+
     def process_messages(self):
         """
         Invokes received messages processing by platforms
         Usualy is called automatically from send_message method
         :return:
         """
-        for p in self._platforms.values():
-            if p.received_messages > 0:
-                p.queue_received_messages()
-        for p in self._platforms.values():
-            if p.queued_messages > 0:
-                p.process_queued_messages()
+        if len(self._timers) > 0:
+            self._fire_timers()
+        ready = self._ready
+        while len(ready) > 0:
+            p = ready.popleft()
+            p.queue_received_messages()
+            self._queued[p] = True
+        queued = self._queued
+        while len(queued) > 0:
+            # NOTE: platform is removed from queue only after processing since processing could be nested
+            #       (i.e. process_messages could be called while processing) and nested call should proceed
+            #       with same platform's queue
+            p = next(iter(queued))
+            p.process_queued_messages()
+            queued.pop(p, None)
+
+
+class AsyncPlatformsFarm(PlatformsFarm):
+    """
+    Platforms farm driven by asyncio event loop
+    Received messages are processed by loop's callbacks, one round of ready platforms per callback,
+    so other loop's tasks (like non-blocking I/O) are interleaved with messages processing.
+    Initial messages could be awaited (see send_message_async, TestEnv.transaction_async,
+    PlatformBase.request_async) and any number of them could be in progress at once.
+    Reply waits timeouts are loop's timers instead of polled deadlines
+    Synchronous API is kept as is, so platforms that rely on nested processing are working unchanged
+    """
+
+    awaitable = True
+
+    def __init__(self, env, verbose=False):
+        super(AsyncPlatformsFarm, self).__init__(env, verbose)
+        self._threaded = False      # NOTE: asyncio farm is single-threaded by design
+        self._loop = None           # Event loop farm is bound to. Bound on first awaitable call
+        self._drain_scheduled = False   # True if messages processing callback is scheduled
+        self._waiters = []          # List of pairs - replies dict and future to resolve when replies are settled
+        self._idle_scheduled = False    # True if virtual time advance is scheduled (see _idle)
+
+    def _bind_loop(self):
+        """
+        Binds farm to running event loop
+        :return: event loop
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._drain_scheduled = False
+            self._idle_scheduled = False
+            # Timers that were scheduled before are passed to loop
+            if not self._clock.virtual:
+                now = self._clock.now()
+                for timer in self._timers:
+                    if timer[2] is not None:
+                        loop.call_later(max(timer[0] - now, 0), self._farm_timer, timer)
+                self._timers = []
+        return loop
+
+    def create_future(self):
+        """
+        Creates future for awaitable requests
+        :return: asyncio future
+        """
+        return self._bind_loop().create_future()
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedules callback's call after a delay with loop's timer
+        Messages that are sent by callback are processed by loop afterwards
+        :param delay: delay in seconds
+        :param callback: function to call
+        :param args: args for callback
+        :return: timer's handle (see cancel_timer). Farm's own timer is used if farm isn't bound to a loop yet
+                 or if farm's clock is virtual
+        """
+        if self._loop is None or self._loop.is_closed() or self._clock.virtual:
+            timer = super(AsyncPlatformsFarm, self).call_later(delay, callback, *args)
+            self._schedule_idle()
+            return timer
+        return self._loop.call_later(delay, self._timer, callback, args)
+
+    def cancel_timer(self, timer):
+        if isinstance(timer, asyncio.TimerHandle):
+            timer.cancel()
+        else:
+            super(AsyncPlatformsFarm, self).cancel_timer(timer)
+
+    def _timer(self, callback, args):
+        callback(*args)
+        self._schedule_drain()
+
+    def _farm_timer(self, timer):
+        if timer[2] is not None:
+            self._timer(timer[2], timer[3])
+
+    def mark_ready(self, inst):
+        """
+        Enlists platform into ready queue and schedules messages processing by event loop
+        :param inst: platform instance
+        :return: Nothing
+        """
+        self._ready.append(inst)
+        self._schedule_drain()
+
+    def mark_ready_threadsafe(self, inst):
+        """
+        Thread-safe counterpart of mark_ready. Platform is enlisted by event loop's thread
+        :param inst: platform instance
+        :return: Nothing
+        """
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.mark_ready, inst)
+        else:
+            super(AsyncPlatformsFarm, self).mark_ready_threadsafe(inst)
+
+    def _schedule_drain(self):
+        if self._loop is not None and not self._drain_scheduled and not self._loop.is_closed():
+            self._drain_scheduled = True
+            self._loop.call_soon(self._drain)
+
+    def _drain(self):
+        """
+        Processes single round of ready platforms. Schedules next round if there is more messages to process,
+        otherwise checks whether awaited messages are settled down
+        :return: Nothing
+        """
+        self._drain_scheduled = False
+        try:
+            self.process_messages()
+        except Exception as e:
+            for replies, future in self._waiters:
+                if not future.done():
+                    future.set_exception(e)
+            self._waiters = []
+            return
+        if len(self._ready) > 0:
+            self._schedule_drain()
+        else:
+            self._check_waiters()
+            self._schedule_idle()
+
+    def _schedule_idle(self):
+        if self._clock.virtual and len(self._timers) > 0 and not self._idle_scheduled and \
+                self._loop is not None and not self._loop.is_closed():
+            self._idle_scheduled = True
+            self._loop.call_soon(self._idle)
+
+    def _idle(self):
+        """
+        Moves virtual time to the nearest timeout if farm is still idle after loop's callbacks that were ready
+        by then (i.e. tasks that were awaiting messaging) are done
+        :return: Nothing
+        """
+        self._idle_scheduled = False
+        if len(self._ready) == 0 and not self._drain_scheduled and not self.processes_busy and self._advance_clock():
+            self._schedule_drain()
+
+    def _check_waiters(self):
+        """
+        Resolves futures of awaited messages if all participants have replied with final replies
+        or no one is waiting for replies anymore
+        :return: Nothing
+        """
+        if self.processes_busy:   # Waiters are checked again as soon as platforms in child processes are done
+            return
+        waiting = None
+        for w in list(self._waiters):
+            replies, future = w
+            if not future.done():
+                if not all(m.is_failure or m.is_success for m in replies.values()):
+                    if waiting is None:
+                        # NOTE: expired waits are released here too, in case if their timers weren't set
+                        waiting = any([p.waiting_reply for p in self._platforms.values()])
+                        if len(self._ready) > 0:    # Released waits have produced messages. Check later
+                            return
+                    if waiting:
+                        continue
+                future.set_result(None)
+            self._waiters.remove(w)
+
+    async def send_message_async(self, context, message):
+        """
+        Sends initial message and waits until messaging is settled down - all participants have replied with final
+        replies or no one is waiting for replies anymore
+        :param context: messaging context
+        :param message: PlatformMessage instance with message's content
+        :return: replies to specified messaging context
+        """
+        if message.is_reply:
+            raise ValueError("Only initial (non-reply) messages could be awaited")
+        if context.channel not in self._channels:
+            raise ValueError("Channel {} not exists!".format(context.channel))
+        loop = self._bind_loop()
+        if context.channel not in self._replies:
+            self._replies[context.channel] = {}
+        assert context.thread not in self._replies[context.channel], \
+            "AsyncPlatformsFarm:send_message_async Unexpectedly received second initial (non-reply) message " \
+            "for {}:{}".format(context.channel, context.thread)
+        replies = self._replies[context.channel][context.thread] = {}
+        future = loop.create_future()
+        self._waiters.append((replies, future))
+        self._send_message_level += 1
+        try:
+            self.send_message(context, message, processing=0)
+            self._schedule_drain()
+            await future
+        finally:
+            self._send_message_level -= 1
+            self._replies[context.channel].pop(context.thread, None)
+        if self._send_message_level == 0 and self._taps:
+            self.drain_taps()
+        return replies
 
 
 class PlatformFactory(object):
@@ -1524,6 +3475,7 @@ class PlatformFactory(object):
         self._farm = farm
         self._args = copy.deepcopy(dict(kwargs))
         self.name = self._args.get("name", None)
+        self._process = self._args.pop("process", False)    # If True then platform is hosted by child process
 
         wait = self._args.get("wait", [])
         assert (isinstance(wait, (list, tuple, str))), "Wait should be a list, tuple or string"
@@ -1551,25 +3503,40 @@ class PlatformFactory(object):
         Creates Platform's instance
         Should be called when conditions for creation this very instance are met - platforms that this instance
         depends on should be already registered
+        If platform is marked to be hosted by child process then PlatformProcess instance is created instead
+        :return: ref to actual Platform Instance
+        """
+        if self._process:
+            from core.platformix_process import PlatformProcess
+            return PlatformProcess(self._farm, self.name, self._args)
+        return self.instantiate(self._farm, self.name, self._args)
+
+    @staticmethod
+    def instantiate(farm, name, args):
+        """
+        Creates Platform's instance
+        :param farm: farm (or it's counterpart) to bind platform with
+        :param name: platform's name
+        :param args: platform's args
         :return: ref to actual Platform Instance
         """
-        base_platform = self._args.get("base_platform", None)
+        base_platform = args.get("base_platform", None)
         lcls = {}
         try:
             exec("from platforms.{}.main import RootClass as rc; cl = rc".format(base_platform), globals(), lcls)
         except ModuleNotFoundError as e:
             eprint("Package 'platforms.{}' or module 'main' wasn't found for creating platform instance '{}'!".format(
-                base_platform, self.name))
+                base_platform, name))
             raise e
-        lcls["name"] = self.name
-        lcls["farm"] = self._farm
-        lcls["args"] = self._args
+        lcls["name"] = name
+        lcls["farm"] = farm
+        lcls["args"] = args
         try:
             exec("inst = cl(name=name, farm=farm, **args)", globals(), lcls)
             inst = lcls["inst"]
         except Exception as e:
             eprint("Exception occurred when creating platform {} of {} kind!\nException: {}".format(
-                self.name, base_platform, e))
+                name, base_platform, e))
             raise e
             # inst = PlatformBase(name=self.name, farm=self._farm, **self._args)  # TODO: raise exception
         return inst
@@ -1619,14 +3586,14 @@ class ScoreboardRulesBase(object):
 
     def _accept_cmd(self, context, message):
         self._host.commands += 1    # TODO: call host's method instead
-        assert context.str not in self._host.expected, "{}: Context {} already in results".format(
+        assert context not in self._host.expected, "{}: Context {} already in results".format(
             self._host.name, context.str)
         return True
 
     def _accept_response(self, context, message):
         self._host.responses += 1   # TODO: call host's method instead
 
-        if context.str not in self._host.expected:
+        if context not in self._host.expected:
             self._error(context, message, "Response wasn't expected")
             return False
         return True
@@ -1641,26 +3608,26 @@ class ScoreboardRulesBase(object):
         :return:
         """
         self._host.unhandled.append((context.str, message.serialize(), reason))
-        self._host.expected[context.str] = None
+        self._host.expected[context] = None
         eprint("{}: Command {} can't be handled due to {}".format(self._host.name, message.serialize(), reason))
 
     def _handle(self, context, message, expected):
         # TODO: call host's method instead
-        self._host.expected[context.str] = expected
+        self._host.expected[context] = expected
 
     def _success(self, context, message):
         # TODO: call host's method instead
         self._host.success += 1
-        vprint("{}: Response is OK".format(self._host.name))
+        vlog("{}: Response is OK", self._host.name)
         if self._host.clean_completed:
-            del self._host.expected[context.str]
+            del self._host.expected[context]
 
     def _error(self, context, message, reason):
         # TODO: call host's method instead
         self._host.errors.append((context.str, message.serialize(), reason))
         eprint("{}: Wrong response: {}".format(self._host.name, reason))
         if self._host.clean_completed:
-            del self._host.expected[context.str]
+            del self._host.expected[context]
 
 
 class CoverageRulesBase(object):
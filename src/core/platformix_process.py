@@ -0,0 +1,536 @@
+from core.platformix_core import PlatformFactory, PlatformMessage as PM, TalkContext, WallClock
+from collections import deque
+import concurrent.futures
+import multiprocessing
+import queue
+import threading
+import traceback
+
+# Platforms that are marked in test environment's description with 'process: True' are hosted by child processes
+# so CPU bound platforms (like scoreboards with heavy reference models) are run on other cores.
+# Farm holds PlatformProcess instance in place of such platform. It forwards received messages to child process
+# and performs child's farm calls (messages sending, subscriptions, reply handlers registration etc.) in parent.
+#
+# Parent and child are connected with a pipe. Everything passed through it is a tuple with operation's name
+# as 1st item. Messaging contexts and messages are passed in serialized form (see TalkContext.serialize and
+# PlatformMessage.serialize)
+#
+# Parent -> child:
+#   ("receive", context, message) - pass message to platform. Answered with ("answer", True, accepted)
+#   ("routes", channel)           - get platform's routes. Answered with ("answer", True, routes)
+#   ("stop", )                    - stop platform emergently. Answered with ("answer", True, ProtocolReply)
+#   ("topology", parent, subplatforms, depended) - names of related platforms
+#   ("result", value) / ("error", text) - result of child's call (like start_thread)
+#   ("exit", )                    - stop child process
+# Child -> parent:
+#   ("answer", success, value)    - answer to parent's call. If success is False then value is traceback text
+#   ("send", context, message), ("subscribe", channel), ("unsubscribe", channel), ("reroute", ),
+#   ("register_reply_handler", context, senders), ("unregister_reply_handler", context),
+#   ("complete_thread", context), ("start_thread", channel, interface, reply_to_tc),
+#   ("platform_state", name)      - farm calls
+#   ("state", processed, nested, running, starting, stopping, waiting) - platform's state after messages processing
+#   ("ready", ) / ("error", text) - platform's instantiation result or exception in child
+
+
+def _mp_context():
+    """
+    Child processes are forked where possible so they inherit interpreter's state - preferences, logging setup and
+    loaded modules. Otherwise default start method is used
+    :return: multiprocessing context
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+class _Peer(object):
+    """
+    Stands in for platforms of parent process within child process
+    Only name and state are available. State is requested from parent
+    """
+    __slots__ = ("name", "_farm")
+
+    def __init__(self, name, farm):
+        self.name = name
+        self._farm = farm
+
+    @property
+    def running(self):
+        return self._farm.platform_state(self.name)[0]
+
+    @property
+    def starting(self):
+        return self._farm.platform_state(self.name)[1]
+
+    @property
+    def stopping(self):
+        return self._farm.platform_state(self.name)[2]
+
+    def __repr__(self):
+        return "<{}>".format(self.name)
+
+
+class PlatformProcess(object):
+    """
+    Stands in for platform that is hosted by child process
+    Messages are passed to child synchronously (to get whether they are accepted or not) but are processed by child
+    concurrently. Child's farm calls are queued as received messages and performed by farm in parent,
+    so parent's farm stays the only one that manages channels
+    Platform is treated as busy while child hasn't processed accepted messages yet. Farm keeps processing
+    while there are busy platforms (see PlatformsFarm.processes_busy)
+    """
+
+    def __init__(self, farm, name, args):
+        """
+        Starts child process and instantiates platform within it
+        :param farm: platforms farm
+        :param name: platform's name
+        :param args: platform's args (the same as for PlatformFactory.instantiate)
+        """
+        self._farm = farm
+        self._name = name
+        self._base_platform = args.get("base_platform", None)
+        self._wait = tuple(args.get("wait", [])) + tuple(
+            [args["platform"]] if args.get("platform", None) is not None else [])
+        self.parent = None  # NOTE: parent instance is set by Farm due to late bindings
+        self.subplatforms = []
+        self.depended = []
+
+        # Platform's state as reported by child
+        self._running = False
+        self._starting = False
+        self._stopping = False
+        self._waiting = False       # True if platform is waiting for replies
+        self._nested = False        # True if platform is waiting for replies while processing a message
+        self._accepted = 0          # Amount of messages accepted by child
+        self._processed = 0         # Amount of accepted messages that child has processed
+
+        self._routes = {}           # Routes cache. Key is channel's name, value is routes as reported by child
+        self._topology = None       # Names of parent, subplatforms and depended platforms as they were sent to child
+        self._actions = deque()     # Child's farm calls are received into this queue
+        self._actions_lock = threading.Lock()
+        self._queue = deque()       # Received farm calls are transferred into this queue before processing
+        self._answers = queue.Queue()   # Answers on parent's calls
+        self._call_lock = threading.Lock()  # Single call is in progress at a time
+        self._send_lock = threading.Lock()
+
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = _mp_context().Process(target=_serve, args=(child_conn, name, args, farm.notify),
+                                              name="platform-{}".format(name), daemon=True)
+        self._process.start()
+        child_conn.close()
+
+        # Child's farm calls during instantiation (i.e. subscriptions) are performed right away
+        # so platform is complete by the moment it's registered in farm
+        while True:
+            try:
+                a = self._conn.recv()
+            except EOFError:
+                raise RuntimeError("Child process of platform {} has exited on instantiation".format(name))
+            if a[0] == "ready":
+                break
+            if a[0] == "error":
+                self._process.join()
+                raise RuntimeError("Failed to create platform {} in child process:\n{}".format(name, a[1]))
+            self._perform(a)
+
+        self._reader = threading.Thread(target=self._read, name="platform-{}-reader".format(name), daemon=True)
+        self._reader.start()
+        self._farm.add_process(self)
+
+    def __repr__(self):
+        return "<PlatformProcess {}>".format(self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def base_platform(self):
+        return self._base_platform
+
+    @property
+    def wait(self):
+        return self._wait
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def starting(self):
+        return self._starting
+
+    @property
+    def stopping(self):
+        return self._stopping
+
+    @property
+    def busy(self):
+        """
+        :return: True if child is processing messages or there are child's farm calls to perform
+        """
+        return self._nested or self._accepted > self._processed or len(self._actions) > 0 or len(self._queue) > 0
+
+    @property
+    def received_messages(self):
+        return len(self._actions)
+
+    @property
+    def queued_messages(self):
+        return len(self._queue)
+
+    @property
+    def waiting_reply(self):
+        return self._waiting
+
+    def waiting_reply_on(self, context, interface):
+        """
+        NOTE: child reports only whether platform waits for any replies, so context and interface are not taken into
+        account
+        """
+        return self._waiting
+
+    def _send(self, *request):
+        with self._send_lock:
+            self._conn.send(request)
+
+    def _call(self, *request):
+        """
+        Calls child and waits for an answer
+        :return: answer's value
+        """
+        with self._call_lock:
+            self._send(*request)
+            success, value = self._answers.get()
+            if not success:
+                raise RuntimeError("Platform {} has failed in child process:\n{}".format(self._name, value))
+            if request[0] == "receive" and value:
+                self._accepted += 1
+            return value
+
+    def routes(self, channel):
+        if channel not in self._routes:
+            self._routes[channel] = self._call("routes", channel)
+        return self._routes[channel]
+
+    def receive_message(self, context, message):
+        message = PM.parse(message)
+        if message.sender == self._name:
+            return False
+        topology = (None if self.parent is None else self.parent.name,
+                    [p.name for p in self.subplatforms], [p.name for p in self.depended])
+        if topology != self._topology:
+            self._topology = topology
+            self._send("topology", *topology)
+        return self._call("receive", context.serialize(), message.serialize())
+
+    def queue_received_messages(self):
+        with self._actions_lock:
+            self._queue += self._actions
+            self._actions = deque()
+
+    def process_queued_messages(self):
+        while len(self._queue) > 0:
+            self._perform(self._queue.popleft())
+
+    def _stop(self, reply_contexts):
+        return self._call("stop")
+
+    def close(self):
+        """
+        Stops child process
+        :return: None
+        """
+        if self._process.is_alive():
+            try:
+                self._send("exit")
+            except OSError:
+                pass
+            self._process.join(1.0)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._conn.close()
+
+    def _read(self):
+        """
+        Reader thread's loop. Passes answers to caller and queues child's farm calls
+        :return: Nothing
+        """
+        try:
+            while True:
+                a = self._conn.recv()
+                if a[0] == "answer":
+                    self._answers.put(a[1:])
+                    continue
+                with self._actions_lock:
+                    self._actions.append(a)
+                    ready = len(self._actions) == 1
+                if ready:
+                    self._farm.mark_ready_threadsafe(self)
+        except (EOFError, OSError):
+            pass
+        self._answers.put((False, "child process has exited"))
+        with self._actions_lock:
+            self._actions.append(("exited", ))
+        self._farm.mark_ready_threadsafe(self)
+
+    def _perform(self, action):
+        """
+        Performs child's farm call
+        :param action: tuple with call's name and args
+        :return: Nothing
+        """
+        op = action[0]
+        farm = self._farm
+        if op == "send":
+            farm.send_message(TalkContext.deserialize(action[1]), PM.parse(action[2]), 0)
+        elif op == "state":
+            self._processed, self._nested, self._running, self._starting, self._stopping, self._waiting = action[1:]
+        elif op == "register_reply_handler":
+            farm.register_reply_handler(self, TalkContext.deserialize(action[1]), action[2])
+        elif op == "unregister_reply_handler":
+            farm.unregister_reply_handler(self, TalkContext.deserialize(action[1]))
+        elif op == "complete_thread":
+            farm.complete_thread(self, TalkContext.deserialize(action[1]))
+        elif op in ("start_thread", "platform_state"):
+            try:
+                if op == "start_thread":
+                    r = ("result", farm.start_thread(self, *action[1:]).serialize())
+                else:
+                    p = farm.expose_data().platforms[action[1]]
+                    r = ("result", (p.running, p.starting, p.stopping))
+            except Exception as e:
+                r = ("error", "{}: {}".format(type(e).__name__, e))
+            self._send(*r)
+        elif op == "subscribe":
+            farm.subscribe(self, action[1])
+        elif op == "unsubscribe":
+            farm.unsubscribe(self, action[1])
+        elif op == "reroute":
+            self._routes = {}
+            farm.reroute(self)
+        elif op == "error":
+            raise RuntimeError("Platform {} has failed in child process:\n{}".format(self._name, action[1]))
+        elif op == "exited":
+            self._nested = False
+            self._processed = self._accepted
+            if self._process.exitcode not in (None, 0):
+                raise RuntimeError("Child process of platform {} has exited with code {}".format(
+                    self._name, self._process.exitcode))
+        else:
+            raise ValueError("Unexpected request {} from child process of platform {}".format(op, self._name))
+
+
+class _ChildFarm(object):
+    """
+    Farm's counterpart within child process. Hosts single platform and forwards it's farm calls to parent
+    Received messages are processed by process's main thread. Messages are received by reader thread
+    the same way as they are received from other threads in multithreading mode
+    """
+
+    awaitable = False   # NOTE: requests are completed synchronously (see PlatformsFarm.create_future)
+
+    def __init__(self, conn, notify="all"):
+        self.inst = None
+        self._conn = conn
+        self.notify = notify    # Notify mode of parent's farm
+        self._send_lock = threading.Lock()
+        self._cv = threading.Condition()
+        self._ready = False         # True if platform has received messages
+        self._exit = False          # True if process should exit
+        self._accepted = 0          # Amount of accepted messages
+        self._depth = 0             # Nesting level of messages processing
+        self._state = None          # Last reported state
+        self._results = queue.Queue()   # Results of parent's calls
+        # NOTE: virtual time isn't shared with parent so wall clock is used within child process
+        self.clock = WallClock()
+
+    def _send(self, *request):
+        with self._send_lock:
+            self._conn.send(request)
+
+    def _call(self, *request):
+        self._send(*request)
+        r = self._results.get()
+        if r[0] == "error":
+            raise ValueError(r[1])
+        return r[1]
+
+    def subscribe(self, inst, channel):
+        self._send("subscribe", channel)
+
+    def unsubscribe(self, inst, channel):
+        self._send("unsubscribe", channel)
+
+    def reroute(self, inst):
+        self._send("reroute")
+
+    def unregister_platform(self, name, recursive=False):
+        pass    # NOTE: platform is unregistered in parent
+
+    def mark_ready(self, inst):
+        with self._cv:
+            self._ready = True
+            self._cv.notify()
+
+    def call_later(self, delay, callback, *args):
+        return None     # NOTE: reply waits timeouts are polled by main loop
+
+    def create_future(self):
+        return concurrent.futures.Future()
+
+    def register_reply_handler(self, inst, context, senders=None):
+        self._send("register_reply_handler", context.serialize(), None if senders is None else list(senders))
+
+    def unregister_reply_handler(self, inst, context):
+        self._send("unregister_reply_handler", context.serialize())
+
+    def start_thread(self, topic_caster, channel, interface, reply_to_tc=None):
+        return TalkContext.deserialize(self._call("start_thread", channel, interface, reply_to_tc))
+
+    def complete_thread(self, topic_caster, context):
+        self._send("complete_thread", context.serialize())
+
+    def platform_state(self, name):
+        """
+        :param name: platform's name
+        :return: tuple with running, starting and stopping values of platform
+        """
+        return self._call("platform_state", name)
+
+    def is_running(self, platform):
+        return self.platform_state(platform)[0]
+
+    def send_message(self, context, message, processing=None):
+        """
+        Passes message to parent. If platform sends initial message and waits for replies
+        then platform's own messages are processed until wait is over, just like nested processing does
+        NOTE: replies are not collected, reply handlers should be used instead
+        :return: None
+        """
+        # NOTE: platform's state is reported before message is sent since receivers could check it right away
+        #       (i.e. whether platform is running when it replies on start)
+        if self._state is not None:
+            self._report(self._state[0], self._state[-1])
+        self._send("send", context.serialize(), message.serialize())
+        if processing is None:
+            processing = 0 if message.is_reply else 2
+        if processing == 2 and message.sender == self.inst.name:
+            while self.inst.waiting_reply_on(context, None):
+                self._step(0.01)
+        return None
+
+    def _read(self):
+        """
+        Reader thread's loop. Passes messages to platform and answers parent's calls
+        :return: Nothing
+        """
+        try:
+            while True:
+                a = self._conn.recv()
+                op = a[0]
+                if op in ("result", "error"):
+                    self._results.put(a)
+                    continue
+                if op == "exit":
+                    break
+                if op == "topology":
+                    self.inst.parent = None if a[1] is None else _Peer(a[1], self)
+                    self.inst.subplatforms = [_Peer(n, self) for n in a[2]]
+                    self.inst.depended = [_Peer(n, self) for n in a[3]]
+                    continue
+                try:
+                    if op == "receive":
+                        r = self.inst.receive_message(TalkContext.deserialize(a[1]), PM.parse(a[2]))
+                        if r:
+                            with self._cv:
+                                self._accepted += 1
+                                self._ready = True  # NOTE: main thread could take message before it's counted
+                                self._cv.notify()   # so it's woken up once more to report it as processed
+                    elif op == "routes":
+                        r = self.inst.routes(a[1])
+                    elif op == "stop":
+                        r = self.inst._stop([])
+                    else:
+                        raise ValueError("Unexpected request {}".format(op))
+                    self._send("answer", True, r)
+                except Exception:
+                    self._send("answer", False, traceback.format_exc())
+        except (EOFError, OSError):
+            pass
+        with self._cv:
+            self._exit = True
+            self._cv.notify()
+
+    def _step(self, timeout):
+        """
+        Waits for received messages up to timeout, processes them and reports platform's state to parent
+        :param timeout: max time to wait in seconds. If None then waits until messages are received
+        :return: Nothing
+        """
+        with self._cv:
+            if not self._ready and not self._exit:
+                self._cv.wait(timeout)
+            self._ready = False
+            accepted = self._accepted
+        inst = self.inst
+        inst.queue_received_messages()
+        self._depth += 1
+        try:
+            inst.process_queued_messages()
+            waiting = inst.waiting_reply    # NOTE: it also releases timeouted waits
+        finally:
+            self._depth -= 1
+        self._report(accepted, waiting)
+
+    def _report(self, processed, waiting):
+        """
+        Reports platform's state to parent if it's changed
+        :param processed: amount of accepted messages that are processed
+        :param waiting: True if platform is waiting for replies
+        :return: Nothing
+        """
+        inst = self.inst
+        if self._state is not None:     # NOTE: nested steps could have reported more messages than outer one took
+            processed = max(processed, self._state[0])
+        state = (processed, self._depth > 0, inst.running, inst.starting, inst.stopping, waiting)
+        if state != self._state:
+            self._state = state
+            self._send("state", *state)
+
+    def serve(self):
+        """
+        Main loop. Processes received messages until parent tells to exit
+        :return: Nothing
+        """
+        while not self._exit:
+            try:
+                self._step(0.01 if self._state is not None and self._state[-1] else None)
+            except Exception:
+                self._send("error", traceback.format_exc())
+                with self._cv:
+                    self._ready = True  # NOTE: messages that are left in queue are processed on next step
+                self._report(self._state[0] if self._state is not None else 0, False)
+
+
+def _serve(conn, name, args, notify):
+    """
+    Child process's entry point
+    :param conn: pipe's end to communicate with parent
+    :param name: platform's name
+    :param args: platform's args
+    :param notify: notify mode of parent's farm
+    :return: Nothing
+    """
+    farm = _ChildFarm(conn, notify)
+    reader = threading.Thread(target=farm._read, name="platform-{}-reader".format(name), daemon=True)
+    reader.start()
+    try:
+        farm.inst = PlatformFactory.instantiate(farm, name, args)
+    except Exception:
+        farm._send("error", traceback.format_exc())
+        return
+    farm._report(0, False)
+    farm._send("ready")
+    farm.serve()
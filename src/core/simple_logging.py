@@ -1,5 +1,8 @@
+import atexit
 import sys
+import threading
 import traceback
+from collections import deque
 
 
 def _default_vprint_worker(*args, **kwargs):
@@ -23,6 +26,15 @@ def _default_eprint_worker(*args, **kwargs):
     print(*args, **kwargs)
 
 
+def no_print(*args, **kwargs):
+    """
+    Worker function that turns output off. Lazy printing functions (vlog, tlog) are checking worker against it
+    and don't format messages at all if output is off
+    :return: None
+    """
+    pass    # NOTE: this method just does nothing as intended
+
+
 vprint_worker = _default_vprint_worker
 eprint_worker = _default_eprint_worker
 tprint_worker = _default_vprint_worker
@@ -58,5 +70,90 @@ def tprint(*args, **kwargs):
     tprint_worker(*args, **kwargs)
 
 
+def vlog(message, *args, **kwargs):
+    """
+    Lazy counterpart of vprint. Use on hot paths
+    Message is formatted with args (as message.format(*args, **kwargs)) only if verbose output is on
+    :param message: message's format string
+    :param args: args to format message with
+    :param kwargs: keyworded args to format message with
+    :return: None
+    """
+    if vprint_worker is not no_print:
+        vprint_worker(message.format(*args, **kwargs))
+
+
+def tlog(message, *args, **kwargs):
+    """
+    Lazy counterpart of tprint. Use on hot paths
+    Message is formatted with args (as message.format(*args, **kwargs)) only if timing output is on
+    :param message: message's format string
+    :param args: args to format message with
+    :param kwargs: keyworded args to format message with
+    :return: None
+    """
+    if tprint_worker is not no_print:
+        tprint_worker(message.format(*args, **kwargs))
+
+
 def exprint():
     traceback.print_exc()
+
+
+class BufferedSink(object):
+    """
+    File-like object that collects written text in memory and writes it into file by background thread,
+    so printing into it doesn't hold caller on file I/O. Order of writes is kept
+    Use as file argument of print. Remaining text is written on close or on interpreter's exit
+    """
+
+    def __init__(self, path, interval=0.1):
+        """
+        :param path: path of file to write into. File is overwritten
+        :param interval: max time in seconds that written text is kept in memory before it's written into file
+        """
+        self._file = open(path, "w", buffering=1 << 16)
+        self._chunks = deque()      # Written text. NOTE: deque's append and popleft are thread-safe
+        self._interval = interval
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="BufferedSink {}".format(path), daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, text):
+        self._chunks.append(text)
+        return len(text)
+
+    def flush(self):
+        """
+        Asks writer thread to write collected text without waiting for interval
+        :return: None
+        """
+        self._wake.set()
+
+    def _drain(self):
+        chunks = self._chunks
+        n = len(chunks)
+        if n > 0:
+            self._file.write("".join([chunks.popleft() for i in range(n)]))
+
+    def _writer(self):
+        while not self._closed:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self._drain()
+
+    def close(self):
+        """
+        Writes remaining text, stops writer thread and closes file
+        :return: None
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self._file.close()
+        atexit.unregister(self.close)
@@ -1,4 +1,5 @@
-from core.platformix_core import PlatformFactory, PlatformsFarm, PlatformMessage, new_message
+from core.platformix_core import PlatformFactory, PlatformsFarm, AsyncPlatformsFarm, PlatformMessage, new_message
+from core.platformix_core import pref
 from core.simple_logging import vprint, eprint, exprint
 from core.scheme import Scheme
 
@@ -128,7 +129,10 @@ class TestEnv(object):
 
     def __init__(self, description, generics=None, verbose=False):
         self.name = "__root__"
-        self.farm = PlatformsFarm(self, verbose=verbose)  # Farm which manages all platform's instances and their interaction
+        if pref.asyncio:
+            self.farm = AsyncPlatformsFarm(self, verbose=verbose)
+        else:
+            self.farm = PlatformsFarm(self, verbose=verbose)  # Farm which manages all platform's instances and their interaction
         self._tc = None              # Topic Caster reference
         self._extrapolation_counter = 0
         self._extrapolation_chain = []
@@ -194,12 +198,94 @@ class TestEnv(object):
                           otherwise - True if transaction were successful, False if not
         :return: True/False or dict depending on more_info
         """
+        context, message, expected, ignore = self._begin_transaction(channel, message, expected, ignore)
+
+        # NOTE: If previous transaction were interrupted due to exception (and messaging session were broken)
+        # then can't proceed further
+        assert self.farm.send_message_in_progress is False, "Can't start transaction" \
+                                                            " if there is other messaging session is going"
+        replies = self.farm.send_message(context, message)
+        # NOTE: it may take some time to accomplish request (async usage for example)
+
+        # No matter if multithreading is supported or not
+        # but in the end everything should be settled down at this point
+
+        return self._end_transaction(context, message, expected, ignore, more_info, replies)
+
+    async def transaction_async(self, channel, message, expected=None, ignore=None, more_info=False):
+        """
+        Awaitable counterpart of transaction method. Requires asyncio farm (see PlatformixPreferecenes.asyncio)
+        Unlike transaction any number of transactions could be in progress at once
+        Arguments and result are the same as for transaction method
+        """
+        context, message, expected, ignore = self._begin_transaction(channel, message, expected, ignore)
+        replies = await self.farm.send_message_async(context, message)
+        return self._end_transaction(context, message, expected, ignore, more_info, replies)
+
+    def transactions(self, channel, messages, expected=None, ignore=None, in_flight=64, more_info=False):
+        """
+        Conducts batch of transactions on specified channel. Each message is sent into it's own thread
+        and up to in_flight transactions are in progress at once (see PlatformsFarm.send_messages)
+        Replies of all transactions are checked against the same expected value
+        Transactions that are completed with expected 'all' result are checked at once, without diagnostics.
+        Other transactions are checked the same way as with transaction method
+        :param channel: string, messaging channel's name
+        :param messages: list of PlatformMessage instances to initiate transactions with
+        :param expected: list with expected results (see transaction method)
+        :param ignore: list, names of platforms that should be excluded from participants list
+        :param in_flight: amount of transactions that could be in progress at once. If None then all messages are
+                          sent at once
+        :param more_info: If True then replies of each transaction are returned too
+        :return: dict with following items:
+                 * result - True if all transactions were successful, False if not
+                 * results - list with result of each transaction
+                 * replies - list with replies of each transaction (if more_info is True)
+        """
+        expected, ignore = self._transaction_args(channel, expected, ignore)
+        assert self.farm.send_message_in_progress is False, "Can't start transactions" \
+                                                            " if there is other messaging session is going"
+        started = [self._start_transaction(channel, m) for m in messages]
+        contexts = [c for c, m in started]
+        messages = [m for c, m in started]
+        replies = self.farm.send_messages(contexts, messages, in_flight)
+
+        ignored = set([self.name] + ignore)
+        expect_all = None   # True if all participants should succeed, False if all should fail
+        if len(expected) == 1 and len(expected[0]) == 2 and expected[0][0] == "all" and not self.verbose:
+            expect_all = {"s": True, "success": True, "f": False, "fail": False}.get(expected[0][1], None)
+        results = []
+        for i, context in enumerate(contexts):
+            participants = {p: m for p, m in replies[i].items() if p not in ignored}
+            if expect_all is not None and len(participants) > 0 \
+                    and all(m.is_success if expect_all else m.is_failure for m in participants.values()):
+                results.append(True)
+            else:
+                conv_analyzer = ConversationAnalyzer(replies=participants)
+                results.append(self._check_responses(conv_analyzer, channel, messages[i], expected, self.verbose))
+            replies[i] = participants
+            self.farm.complete_thread(self, context)
+        result = {"result": all(results), "results": results}
+        if more_info:
+            result["replies"] = replies
+        return result
+
+    def _begin_transaction(self, channel, message, expected, ignore):
+        """
+        Validates transaction's arguments and starts new thread for transaction
+        :return: tuple with messaging context, message, expected and ignore values to proceed with
+        """
+        expected, ignore = self._transaction_args(channel, expected, ignore)
+        context, message = self._start_transaction(channel, message)
+        return context, message, expected, ignore
+
+    def _transaction_args(self, channel, expected, ignore):
+        """
+        Validates transaction's arguments
+        :return: tuple with expected and ignore values to proceed with
+        """
         # TODO: Expected participants list
         if not isinstance(channel, str):
             raise ValueError("channel should be a string! got {} with value {}".format(type(channel), channel))
-        if not isinstance(message, PlatformMessage):
-            raise ValueError("message should be a PlatformMessage! got {} with value {}".format(type(message), message))
-        message.sender = self.name
 
         if expected is None:
             expected = er.all_success
@@ -217,127 +303,142 @@ class TestEnv(object):
 
         if ignore is None:
             ignore = []  # TODO: ignore is not used yet
+        return expected, ignore
+
+    def _start_transaction(self, channel, message):
+        """
+        Validates transaction's message and starts new thread for transaction
+        :return: tuple with messaging context and message to send
+        """
+        if not isinstance(message, PlatformMessage):
+            raise ValueError("message should be a PlatformMessage! got {} with value {}".format(type(message), message))
+        message = message.replace(sender=self.name)
         if self.verbose:
             vprint("Starting transaction {}::{}".format(channel, message.serialize()))
         context = self.farm.start_thread(self, channel, message.interface)
+        return context, message
 
-        # NOTE: If previous transaction were interrupted due to exception (and messaging session were broken)
-        # then can't proceed further
-        assert self.farm.send_message_in_progress is False, "Can't start transaction" \
-                                                            " if there is other messaging session is going"
-        replies = self.farm.send_message(context, message)
-        # NOTE: it may take some time to accomplish request (async usage for example)
-
-        # No matter if multithreading is supported or not
-        # but in the end everything should be settled down at this point
-
+    def _end_transaction(self, context, message, expected, ignore, more_info, replies):
+        """
+        Checks transaction's replies against expected values and completes transaction's thread
+        :return: True/False or dict depending on more_info (see transaction method)
+        """
         conv_analyzer = ConversationAnalyzer(replies=replies, ignore=[self.name]+ignore)
+        result = self._check_responses(conv_analyzer, context.channel, message, expected, self.verbose)
+        self.farm.complete_thread(self, context)
+        if more_info:
+            result = {"result": result,
+                      "replies": conv_analyzer.replies}
+        return result
 
-        def check_responses(verbose=False):
-            if len(conv_analyzer.in_progress) > 0:
-                eprint("Some platforms ({}) are not completed transaction {}::{}!".format(
-                    conv_analyzer.in_progress, channel, message.serialize()))
-                return False
-            elif len(conv_analyzer.participants) == 0:
-                eprint("No one acknowledged transaction {}::{}!".format(channel, message.serialize()))
-                return False
-            elif not isinstance(expected, (list, tuple)):
-                raise ValueError("'expected' argument should be a list or tuple of lists or tuples!")
-            elif len(expected) == 0:
-                eprint("Warning! Transaction {}::{} is without expected result! Completed but no checks made".format(
-                    channel, message.serialize()))
-                return True
-            else:
-                participants = conv_analyzer.participants
-                others = conv_analyzer.participants
-                total = len(others)
-                result = [False]*len(expected)
-                idx = 0
-
-                for e in expected:
-                    if not isinstance(e, (list, tuple)) or len(e) < 2:
-                        raise ValueError("'expected' items should be list or tuple with length 2 or more")
-                    negative = False
-                    if len(e) >= 3:
-                        negative = e[2]
-                    matched = sorted(conv_analyzer.partipiciants_by_result(e[1], negative))
-                    if e[0] == "all":
-                        others = []
-                        if len(matched) == total:
-                            result[idx] = True
-                        else:
-                            unmatched = [p for p in participants if p not in matched]  # participants - matched
-                            eprint("Platforms {} are failed to check against '{}{}' for 'all' "
-                                   "on transaction {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
-                                                                  message.serialize()))
-                            for p in unmatched:
-                                eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
-                    elif e[0] == "any":
+    def _check_responses(self, conv_analyzer, channel, message, expected, verbose=False):
+        """
+        Checks transaction's replies against expected values
+        :param conv_analyzer: ConversationAnalyzer instance with transaction's replies
+        :param channel: transaction's channel name
+        :param message: transaction's message
+        :param expected: list with expected results (see transaction method)
+        :param verbose: If True then transaction's result is printed
+        :return: True if transaction were successful, otherwise False
+        """
+        if len(conv_analyzer.in_progress) > 0:
+            eprint("Some platforms ({}) are not completed transaction {}::{}!".format(
+                conv_analyzer.in_progress, channel, message.serialize()))
+            return False
+        elif len(conv_analyzer.participants) == 0:
+            eprint("No one acknowledged transaction {}::{}!".format(channel, message.serialize()))
+            return False
+        elif not isinstance(expected, (list, tuple)):
+            raise ValueError("'expected' argument should be a list or tuple of lists or tuples!")
+        elif len(expected) == 0:
+            eprint("Warning! Transaction {}::{} is without expected result! Completed but no checks made".format(
+                channel, message.serialize()))
+            return True
+        else:
+            participants = conv_analyzer.participants
+            others = conv_analyzer.participants
+            total = len(others)
+            result = [False]*len(expected)
+            idx = 0
+
+            for e in expected:
+                if not isinstance(e, (list, tuple)) or len(e) < 2:
+                    raise ValueError("'expected' items should be list or tuple with length 2 or more")
+                negative = False
+                if len(e) >= 3:
+                    negative = e[2]
+                matched = sorted(conv_analyzer.partipiciants_by_result(e[1], negative))
+                if e[0] == "all":
+                    others = []
+                    if len(matched) == total:
+                        result[idx] = True
+                    else:
+                        unmatched = [p for p in participants if p not in matched]  # participants - matched
+                        eprint("Platforms {} are failed to check against '{}{}' for 'all' "
+                               "on transaction {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
+                                                              message.serialize()))
+                        for p in unmatched:
+                            eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
+                elif e[0] == "any":
+                    others = []
+                    if len(matched) > 0:
+                        result[idx] = True
+                    else:
+                        unmatched = participants
+                        eprint("None of platforms {} succeeded check against '{}{}' for 'any' on transaction "
+                               "{}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
+                                               message.serialize()))
+                        for p in unmatched:
+                            eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
+                elif e[0] == "others":
+                    if len(others) == 0:
+                        eprint("No other platforms left to check against '{}{}' on transaction {}::{}".format(
+                            ["", "not "][negative], e[1], channel, message.serialize()
+                        ))
+                        result[idx] = True
+                    else:
+                        unmatched = [p for p in others if p not in matched]  # others - matched
                         others = []
-                        if len(matched) > 0:
-                            result[idx] = True
-                        else:
-                            unmatched = participants
-                            eprint("None of platforms {} succeeded check against '{}{}' for 'any' on transaction "
-                                   "{}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
-                                                   message.serialize()))
+                        if len(unmatched) > 0:
+                            eprint("Platforms {} are failed to check against '{}{}' for 'others' on transaction"
+                                   " {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
+                                                    message.serialize()))
                             for p in unmatched:
                                 eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
-                    elif e[0] == "others":
-                        if len(others) == 0:
-                            eprint("No other platforms left to check against '{}{}' on transaction {}::{}".format(
-                                ["", "not "][negative], e[1], channel, message.serialize()
-                            ))
-                            result[idx] = True
                         else:
-                            unmatched = [p for p in others if p not in matched]  # others - matched
-                            others = []
-                            if len(unmatched) > 0:
-                                eprint("Platforms {} are failed to check against '{}{}' for 'others' on transaction"
-                                       " {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
-                                                        message.serialize()))
-                                for p in unmatched:
-                                    eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
-                            else:
-                                result[idx] = True
-                    elif e[0] == "none":
-                        if len(matched) == 0:
                             result[idx] = True
-                        else:
-                            unmatched = matched
-                            eprint("Platforms {} are failed to check against '{}{}' for 'none' "
-                                   "on transaction {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
-                                                                  message.serialize()))
-                            for p in unmatched:
-                                eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
+                elif e[0] == "none":
+                    if len(matched) == 0:
+                        result[idx] = True
                     else:
-                        if not isinstance(e[0], (list, tuple)):
-                            el = [e[0]]
-                        else:
-                            el = e[0]
-                        others = [p for p in others if p not in el]  # others - el
-                        unmatched = [p for p in el if p not in matched]  # el - matched
-                        if len(unmatched) == 0:
-                            result[idx] = True
-                        else:
-                            eprint("Platforms {} are failed to check against '{}{}' on transaction {}::{}".format(
-                                unmatched, ["", "not "][negative], e[1], channel, message.serialize()))
-                            for p in unmatched:
-                                eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
-                    idx += 1
-            result = all(r is True for r in result)
-            if result:
-                if verbose:
-                    vprint("Success! Transaction {}::{} completed successfully".format(channel, message.serialize()))
-            else:
-                if verbose:
-                    eprint("Error! Transaction {}::{} failed on checks".format(channel, message.serialize()))
-            return result
-
-        result = check_responses(self.verbose)
-        if more_info:
-            result = {"result": result,
-                      "replies": conv_analyzer.replies}
+                        unmatched = matched
+                        eprint("Platforms {} are failed to check against '{}{}' for 'none' "
+                               "on transaction {}::{}".format(unmatched, ["", "not "][negative], e[1], channel,
+                                                              message.serialize()))
+                        for p in unmatched:
+                            eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
+                else:
+                    if not isinstance(e[0], (list, tuple)):
+                        el = [e[0]]
+                    else:
+                        el = e[0]
+                    others = [p for p in others if p not in el]  # others - el
+                    unmatched = [p for p in el if p not in matched]  # el - matched
+                    if len(unmatched) == 0:
+                        result[idx] = True
+                    else:
+                        eprint("Platforms {} are failed to check against '{}{}' on transaction {}::{}".format(
+                            unmatched, ["", "not "][negative], e[1], channel, message.serialize()))
+                        for p in unmatched:
+                            eprint("  {}: {}".format(p, conv_analyzer.replies[p].serialize()))
+                idx += 1
+        result = all(r is True for r in result)
+        if result:
+            if verbose:
+                vprint("Success! Transaction {}::{} completed successfully".format(channel, message.serialize()))
+        else:
+            if verbose:
+                eprint("Error! Transaction {}::{} failed on checks".format(channel, message.serialize()))
         return result
 
     def start_platforms(self):
@@ -347,10 +448,13 @@ class TestEnv(object):
         assert self.farm.all_is_running, "Failed to start platforms (not all have been reacted on transaction)"
 
     def stop_platforms(self):
-        """ Stops all platforms """
-        assert self.transaction("#platforms", PlatformMessage(self.name, "platformix", "stop")) is True, \
-            "Failed to stop platforms (transaction fail)"
-        assert self.farm.all_is_stopped, "Failed to stop platforms (not all have been reacted on transaction)"
+        """ Stops all platforms. Farm's worker threads are stopped too (they are started again on demand) """
+        try:
+            assert self.transaction("#platforms", PlatformMessage(self.name, "platformix", "stop")) is True, \
+                "Failed to stop platforms (transaction fail)"
+            assert self.farm.all_is_stopped, "Failed to stop platforms (not all have been reacted on transaction)"
+        finally:
+            self.farm.stop_workers()
 
     def emergency_stop(self):
         return self.farm.emergency_stop()
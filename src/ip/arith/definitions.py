@@ -1,16 +1,23 @@
 from core.helpers import Wrapper
 from core.platformix_core import PlatformProtocolCore, PlatformInterfaceCore, PlatformMessage as PM
+import operator
 
 
 class ArithInterface(PlatformInterfaceCore):
     _base_id = "arith"
-    _methods = ("sum", "sub", "mult", "div", "power")
+    _methods = ("sum", "sub", "mult", "div", "power",
+                "sum_batch", "sub_batch", "mult_batch", "div_batch", "power_batch", "eval_batch")
     # Methods:
     # * sum - returns A + B, args: A, B
     # * sub - returns A - B, args: A, B
     # * mult - returns A * B, args: A, B
     # * div - returns A / B, args: A, B
     # * power - returns A**M, args: A, M
+    # * sum_batch, sub_batch, mult_batch, div_batch, power_batch - returns list with results of operation
+    #   for each pair of operands, args: A, B - vectors of operands (list, tuple, array.array, NumPy array etc.)
+    # * eval_batch - returns list with results of operations, args: OPS, A, B
+    #   OPS - vector with operation's name (sum, sub, mult, div or power) for each pair of operands
+    # Batch fails with errcode -2 if vectors are of different length or if there is non-number operand
     # TODO: methods signature
 
 
@@ -20,7 +27,9 @@ class ArithProtocol(PlatformProtocolCore):
     """
     _default_interface = ArithInterface
     _protocol_fields = ("running", )
-    _protocol_methods = ("sum", "sub", "mult", "div", "power", "reply", "reply_all")
+    _protocol_methods = ("sum", "sub", "mult", "div", "power",
+                         "sum_batch", "sub_batch", "mult_batch", "div_batch", "power_batch", "eval_batch",
+                         "reply", "reply_all")
 
     def _arith_sum(self, context, fake_reply, a, b):
         if not self._ensure_running(context, fake_reply):
@@ -62,6 +71,54 @@ class ArithProtocol(PlatformProtocolCore):
         self._notify(context, "Calling power...")
         self._reply(context, self._worker.power(context, a, m), fake_reply)
 
+    def _arith_sum_batch(self, context, fake_reply, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling sum_batch...")
+        self._reply(context, self._worker.sum_batch(context, a, b), fake_reply)
+
+    def _arith_sub_batch(self, context, fake_reply, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling sub_batch...")
+        self._reply(context, self._worker.sub_batch(context, a, b), fake_reply)
+
+    def _arith_mult_batch(self, context, fake_reply, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling mult_batch...")
+        self._reply(context, self._worker.mult_batch(context, a, b), fake_reply)
+
+    def _arith_div_batch(self, context, fake_reply, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling div_batch...")
+        self._reply(context, self._worker.div_batch(context, a, b), fake_reply)
+
+    def _arith_power_batch(self, context, fake_reply, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling power_batch...")
+        self._reply(context, self._worker.power_batch(context, a, b), fake_reply)
+
+    def _arith_eval_batch(self, context, fake_reply, ops, a, b):
+        if not self._ensure_running(context, fake_reply):
+            if fake_reply is not None:
+                self._reply(context, fake_reply, None)
+            return
+        self._notify(context, "Calling eval_batch...")
+        self._reply(context, self._worker.eval_batch(context, ops, a, b), fake_reply)
+
 
 class ArithWrapper(Wrapper):
     """
@@ -69,3 +126,65 @@ class ArithWrapper(Wrapper):
     """
     _methods = ArithProtocol._protocol_methods
     _fields = ArithProtocol._protocol_fields
+
+
+def _div(a, b):
+    return a / b if b != 0 else None
+
+
+def _power(a, m):
+    # NOTE: same as evaluation of expression by Calc, i.e. complex for negative base with fractional exponent
+    try:
+        return a ** m
+    except ZeroDivisionError:
+        return None
+
+
+arith_operations = {"sum": operator.add, "sub": operator.sub, "mult": operator.mul, "div": _div, "power": _power}
+# Arith operations by names. Result of operations that are not defined (division by zero etc.) is None
+
+
+def batch_args(ops, a, b):
+    """
+    Checks batch operations args and converts operands vectors into lists of numbers
+    :param ops: operation's name for whole batch or vector with operation's name for each pair of operands
+    :param a: vector with first operands. Could be list, tuple, array.array, NumPy array etc.
+    :param b: vector with second operands
+    :return: tuple with ops, a, b. Vectors are lists
+    :raises ValueError: if vectors are of different length, operation is unknown or operand isn't a number
+    """
+    # NOTE: array.array and NumPy arrays are converted with tolist() at once, so operands are python numbers
+    try:
+        a, b = [v.tolist() if hasattr(v, "tolist") else list(v) for v in (a, b)]
+    except TypeError:
+        raise ValueError("Operands should be vectors")
+    if len(a) != len(b):
+        raise ValueError("Operands vectors are of different length")
+    if isinstance(ops, str):
+        if ops not in arith_operations:
+            raise ValueError("Unknown operation {}".format(ops))
+    else:
+        try:
+            ops = ops.tolist() if hasattr(ops, "tolist") else list(ops)
+        except TypeError:
+            raise ValueError("Operations should be a name or vector of names")
+        if len(ops) != len(a):
+            raise ValueError("Operations and operands vectors are of different length")
+        if any(o not in arith_operations for o in ops):
+            raise ValueError("Unknown operation in {}".format(ops))
+    if any(not isinstance(v, (int, float)) for v in a) or any(not isinstance(v, (int, float)) for v in b):
+        raise ValueError("Operands should be numbers")
+    return ops, a, b
+
+
+def arith_batch(ops, a, b):
+    """
+    Calculates batch of arith operations
+    :param ops: operation's name for whole batch or list with operation's name for each pair of operands
+    :param a: list with first operands
+    :param b: list with second operands
+    :return: list with results
+    """
+    if isinstance(ops, str):
+        return list(map(arith_operations[ops], a, b))
+    return [arith_operations[o](x, y) for o, x, y in zip(ops, a, b)]
@@ -1,5 +1,6 @@
 from core.platformix_core import ScoreboardRulesBase, PlatformMessage as PM
 from core.simple_logging import eprint, exprint
+from ip.arith.definitions import batch_args, arith_batch
 
 
 class ScoreboardArithAll(ScoreboardRulesBase):
@@ -13,6 +14,9 @@ class ScoreboardArithAll(ScoreboardRulesBase):
         if not self._accept_cmd(context, message):
             return True
 
+        if message.method in ("sum_batch", "sub_batch", "mult_batch", "div_batch", "power_batch", "eval_batch"):
+            return self._batch(context, message)
+
         if message.method not in ("sum", "sub", "mult", "div", "power"):
             self._unhandled(context, message, "unsupported method! Check scoreboard against interface")
             return True
@@ -49,6 +53,33 @@ class ScoreboardArithAll(ScoreboardRulesBase):
             self._unhandled(context, message, "exception occurred: {}!".format(e))
         return True
 
+    def _batch(self, context, message):
+        """
+        Expected result for whole batch is calculated at once
+        """
+        if message.method == "eval_batch":
+            args = message.args
+        else:
+            args = (message.method[:-len("_batch")],) + tuple(message.args)
+        if len(args) != 3:
+            self._unhandled(context, message, "wrong format (expected {} args)".format(
+                3 if message.method == "eval_batch" else 2))
+            return True
+
+        try:
+            ops, a, b = batch_args(*args)
+        except ValueError:
+            self._handle(context, message, PM.failure("", -2))
+            return True
+
+        try:
+            self._handle(context, message, PM.success(arith_batch(ops, a, b)))
+        except Exception as e:
+            eprint("ScoreboardArithAll {}: exception occurred: {}!".format(self._host.name, e))
+            exprint()
+            self._unhandled(context, message, "exception occurred: {}!".format(e))
+        return True
+
     def _response_cmp(self, resa, resb):
         if resa.is_success:
             return resa.kwargs == resb.kwargs
@@ -63,11 +94,19 @@ class ScoreboardArithAll(ScoreboardRulesBase):
         if not self._accept_response(context, message):
             return True
 
-        if self._response_cmp(self._host.expected[context.str], message):
+        expected = self._host.expected[context]
+        if self._response_cmp(expected, message):
             self._success(context, message)
+        elif expected.is_success and message.is_success and isinstance(expected.kwargs.get("value"), list) \
+                and isinstance(message.kwargs.get("value"), list) \
+                and len(expected.kwargs["value"]) == len(message.kwargs["value"]):
+            # NOTE: for batches only mismatched results are reported, as batch could be really long
+            self._error(context, message, "Wrong batch results! Mismatches (index, expected, got): {}".format(
+                [(i, e, r) for i, (e, r) in enumerate(zip(expected.kwargs["value"], message.kwargs["value"]))
+                 if e != r]))
         else:
             self._error(context, message, "Wrong result! Expected: {}, got: {}".format(
-                self._host.expected[context.str].serialize(), message.serialize()))
+                expected.serialize(), message.serialize()))
         return True
 
 
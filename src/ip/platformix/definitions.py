@@ -34,6 +34,7 @@ class PlatformixProtocol(PlatformProtocolCore):
                         "start_max_wait", "stop_max_wait", "farm", "wait")
     _protocol_methods = ("start", "stop",
                          "reply_all", "reply", "register_reply_handler", "unregister_reply_handler")
+    _fsm_notify = True      # NOTE: start/stop progress is always notified
     # TODO: methods signature specification
 
     def __init__(self, host, interface=None, name=""):
@@ -177,10 +178,16 @@ class PlatformixProtocol(PlatformProtocolCore):
         if self.waiting_count > 0 and new_thread:
             self._worker.register_reply_handler(context,
                                                 self._platformix_start_reply_handler, [], {},
-                                                timeout=self._worker.start_max_wait, force=True)
+                                                timeout=self._worker.start_max_wait, force=True,
+                                                senders=self._worker.wait)
             self._notify(context, "waiting")
+            # NOTE: platforms that are processed concurrently (in multithreading mode or in child processes)
+            # could have been started before reply handler were registered. Their replies are missed,
+            # so waiting list is updated once again
+            self._context["waiting_for"] = [w for w in self._context["waiting_for"]
+                                            if self._worker.farm.is_running(w) is False]
         # If no one left to wait for - do stop at last
-        elif not self._worker.start_in_progress and self.waiting_count == 0:
+        if not self._worker.start_in_progress and self.waiting_count == 0:
             for c in self._context["reply_to"]:
                 try:
                     self._worker.unregister_reply_handler(c, True, {}, dont_check=True)
@@ -256,10 +263,16 @@ class PlatformixProtocol(PlatformProtocolCore):
         if self.waiting_count > 0 and new_thread:
             self._worker.register_reply_handler(context,
                                                 self._platformix_stop_reply_handler, [], {},
-                                                timeout=self._worker.stop_max_wait, force=True)
+                                                timeout=self._worker.stop_max_wait, force=True,
+                                                senders=[w.name for w in self.host.subplatforms + self.host.depended])
             self._notify_all(self._context["reply_to"], "waiting")
+            # NOTE: the same as for start - platforms that are processed concurrently could have been stopped
+            # before reply handler were registered
+            self._context["waiting_for"] = [w.name for w in self.host.subplatforms + self.host.depended
+                                            if w.name in self._context["waiting_for"]
+                                            and (w.running is True or w.stopping is True)]
         # If no one left to wait for - do stop at last
-        elif not self._worker.stop_in_progress and self.waiting_count == 0:
+        if not self._worker.stop_in_progress and self.waiting_count == 0:
             for c in self._context["reply_to"]:
                 self._worker.unregister_reply_handler(c, True, {}, dont_check=True)
             self._worker.running = False
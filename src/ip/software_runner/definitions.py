@@ -4,12 +4,14 @@ from core.platformix_core import PlatformProtocolCore, PlatformInterfaceCore, Pl
 
 class SoftwareRunnerInterface(PlatformInterfaceCore):
     _base_id = "softwarerunner"
-    _methods = ("send", "receive", "log")
+    _methods = ("send", "receive", "transact", "log")
     # Methods:
     # * send - sends data to software instance via stdin
     #   * args: data - string/bytearray or list of strings/bytearrays
     # * receive - receives data from software instance via stdin
     #   * args: count - amount of lines to receive
+    # * transact - sends data to software instance and receives response at once
+    #   * args: data, count, timeout - same as for send and receive
     # * log - reads instance run log including stderr output
     #   * no args required
     # TODO: methods signature
@@ -21,7 +23,7 @@ class SoftwareRunnerProtocol(PlatformProtocolCore):
     """
     _default_interface = SoftwareRunnerInterface
     _protocol_fields = ("running", "connection")
-    _protocol_methods = ("send", "receive", "log", "reply", "reply_all")
+    _protocol_methods = ("send", "receive", "transact", "log", "reply", "reply_all")
 
     def _ensure_connected(self, context, fake_reply):
         if self._worker.connection is None or self._worker.connection is False:
@@ -42,6 +44,12 @@ class SoftwareRunnerProtocol(PlatformProtocolCore):
         self._notify(context, "Calling receive...")
         self._reply(context, self._worker.receive(context, count), fake_reply)
 
+    def _softwarerunner_transact(self, context, fake_reply, data, count=1, timeout=1.0):
+        if not self._ensure_running(context, fake_reply) or not self._ensure_connected(context, fake_reply):
+            return
+        self._notify(context, "Calling transact...")
+        self._reply(context, self._worker.transact(context, data, count, timeout), fake_reply)
+
     def _softwarerunner_log(self, context, fake_reply):
         if not self._ensure_running(context, fake_reply) or not self._ensure_connected(context, fake_reply):
             return
@@ -4,12 +4,15 @@ from core.platformix_core import PlatformProtocolCore, PlatformInterfaceCore, Pl
 
 class StreamIOInterface(PlatformInterfaceCore):
     _base_id = "stream_io"
-    _methods = ("send", "receive")
+    _methods = ("send", "receive", "transact")
     # Methods:
     # * send - send data
-    #   * args: data - string/bytearray or list of strings/bytearrays
+    #   * args: data - string/bytes/bytearray or list of strings/bytes/bytearrays
     # * receive - receives data
     #   * args: count - amount of lines to receive
+    #           decode - decoder for received data. If None then binary data are received
+    # * transact - sends data and receives response at once
+    #   * args: data, count, timeout, decode - same as for send and receive
     # TODO: methods signature
 
 
@@ -19,7 +22,7 @@ class StreamIOProtocol(PlatformProtocolCore):
     """
     _default_interface = StreamIOInterface
     _protocol_fields = ("running", )
-    _protocol_methods = ("send", "receive", "reply", "reply_all")
+    _protocol_methods = ("send", "receive", "transact", "reply", "reply_all")
 
     def _stream_io_send(self, context, fake_reply, data):
         if not self._ensure_running(context, fake_reply):
@@ -33,6 +36,12 @@ class StreamIOProtocol(PlatformProtocolCore):
         self._notify(context, "Calling receive...")
         self._reply(context, self._worker.receive(context, count, timeout, decode), fake_reply)
 
+    def _stream_io_transact(self, context, fake_reply, data, count=0, timeout=None, decode='UTF-8'):
+        if not self._ensure_running(context, fake_reply):
+            return
+        self._notify(context, "Calling transact...")
+        self._reply(context, self._worker.transact(context, data, count, timeout, decode), fake_reply)
+
 
 class StreamIOWrapper(Wrapper):
     """
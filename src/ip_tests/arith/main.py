@@ -1,4 +1,5 @@
 import inspect
+from array import array
 from core.simple_logging import eprint, exprint
 from core.platformix_core import new_message
 
@@ -27,10 +28,21 @@ class ArithTest(object):
                 {"name": "test_div", "f": self.test_arith,
                  "args": [["div", 5, 3]], "kwargs": {"expected": 5/3}},
                 {"name": "test_power", "f": self.test_arith, "args": [["power", 2, 9]], "kwargs": {"expected": 512}},
+                {"name": "test_power_complex", "f": self.test_arith,
+                 "args": [["power", -8, 0.5]], "kwargs": {"expected": (-8) ** 0.5}},
 
                 {"name": "test_div0", "f": self.test_arith, "args": [["div", 5, 0]], "kwargs": {"expected": None}},
                 # NOTE: This should provoke exception in tested app
 
+                {"name": "test_sum_batch", "f": self.test_arith,
+                 "args": [["sum_batch", array("i", [1, 2, 3]), array("i", [4, 5, 6])]],
+                 "kwargs": {"expected": [5, 7, 9]}},
+                {"name": "test_power_batch", "f": self.test_arith,
+                 "args": [["power_batch", [2, -8], [9, 0.5]]], "kwargs": {"expected": [512, (-8) ** 0.5]}},
+                {"name": "test_eval_batch", "f": self.test_arith,
+                 "args": [["eval_batch", ["sum", "sub", "mult", "div", "power"], [1, 5, 2, 5, 2], [1, 2, 2, 0, 9]]],
+                 "kwargs": {"expected": [1 + 1, 5 - 2, 2 * 2, None, 512]}},
+
                 {"name": "should_fail", "f": self.test_arith, "args": [["sum", 2, 3]],
                  "kwargs": {"expected": 2 + 3 + 1}},
                 # NOTE: A special test to check that fail checking is work
@@ -1,7 +1,7 @@
 from core.platformix_core import new_message, proto_success, proto_failure, PlatformMessage as PM
 from core.platformix import PlatformBase
-from core.simple_logging import tprint, exprint
-from ip.arith.definitions import ArithWrapper, ArithProtocol
+from core.simple_logging import tlog, exprint
+from ip.arith.definitions import ArithWrapper, ArithProtocol, batch_args, arith_batch
 from core.eval_sandbox import evaluate
 import time
 
@@ -16,6 +16,7 @@ class Calc(PlatformBase):
         super(Calc, self).__init__(**kwargs)
         self._mock = bool(mock)     # If True then requests are executed right on this platform w/o sending to real app
         self._io_interface = io_interface   # Defines parents interface that would be used for i/o
+        self._io_transact = False   # True if parent supports transact, so request and response are made at once
 
         # Register ArithRunner protocol support
         self._support_protocol(ArithProtocol(self, ArithWrapper.get_wrapper(self, "_")))
@@ -29,6 +30,7 @@ class Calc(PlatformBase):
         # NOTE: Or you could wait in a loop for a specific message depending on app used
 
         if not self._mock:
+            self._io_transact = self._parent_supports(self._io_interface, "transact")
             c = self.request(new_message(self._io_interface, "receive", -1), None, [], {}, timeout=2.0)
             # TODO: cleaning required for softwarerunner only
             # TODO: reduce receive timeout instead of increasing request timeout
@@ -37,6 +39,16 @@ class Calc(PlatformBase):
                 return proto_failure("Failed to flush i/o on start")
         return super(Calc, self)._start(reply_contexts)
 
+    def _parent_supports(self, interface, method):
+        """
+        Checks whether parent platform accepts specified method on it's personal channel
+        :return: True if method is accepted, False if it's not or if it couldn't be checked
+        """
+        if not hasattr(self.parent, "routes"):  # NOTE: platforms of parent process are not inspected by child process
+            return False
+        routes = self.parent.routes("@{}".format(self.parent.name))
+        return routes is not None and ((interface, method) in routes or (interface, None) in routes)
+
     def _sum(self, context, a, b):
         return self.calculate("{}+{}".format(a, b))
 
@@ -52,6 +64,81 @@ class Calc(PlatformBase):
     def _power(self, context, a, m):
         return self.calculate("({})**({})".format(a, m))
 
+    def _sum_batch(self, context, a, b):
+        return self.calculate_batch("sum", a, b)
+
+    def _sub_batch(self, context, a, b):
+        return self.calculate_batch("sub", a, b)
+
+    def _mult_batch(self, context, a, b):
+        return self.calculate_batch("mult", a, b)
+
+    def _div_batch(self, context, a, b):
+        return self.calculate_batch("div", a, b)
+
+    def _power_batch(self, context, a, b):
+        return self.calculate_batch("power", a, b)
+
+    def _eval_batch(self, context, ops, a, b):
+        return self.calculate_batch(ops, a, b)
+
+    _expressions = {"sum": "{}+{}", "sub": "{}-{}", "mult": "{}*{}", "div": "{}/{}", "power": "({})**({})"}
+    _batch_timeout = 2.0        # Timeout of batch transact is base time plus time for each item of batch
+    _batch_item_timeout = 0.01
+
+    def calculate_batch(self, ops, a, b):
+        """
+        :param ops: operation's name for whole batch or vector with operation's name for each pair of operands
+        :param a: vector with first operands
+        :param b: vector with second operands
+        :return: ProtocolReply. Data is list with results
+        """
+        start_time = time.time()
+        try:
+            ops, a, b = batch_args(ops, a, b)
+        except ValueError as e:
+            return proto_failure("Platform {}: wrong batch: {}".format(self.name, e), -2)
+        if self._mock:
+            try:
+                result = arith_batch(ops, a, b)
+            except Exception as e:
+                exprint()
+                tlog("calculate_batch (with fail) elapsed {}", time.time() - start_time)
+                return proto_failure("Platform {}: exception occurred on calculate_batch: {}".format(self.name, e), -2)
+            tlog("calculate_batch elapsed {}", time.time() - start_time)
+            return proto_success(result)
+
+        # NOTE: mock code just ended here. To avoid nesting there is no else, just flat code
+
+        if not self._io_transact:
+            return proto_failure("Batches require parent that supports transact")
+        if isinstance(ops, str):
+            ops = [ops] * len(a)
+        expressions = [self._expressions[o].format(x, y) for o, x, y in zip(ops, a, b)]
+        if len(expressions) == 0:
+            return proto_success([])
+        # NOTE: whole batch is sent with single transact request. Softwarerunner sends each item as a line
+        #       and receives count lines while stream_io sends lines (as frames in framed mode) at once
+        #       and receives all results (calc app ignores empty lines)
+        if self._io_interface == "softwarerunner":
+            message = new_message(self._io_interface, "transact", expressions, len(expressions))
+        else:
+            message = new_message(self._io_interface, "transact", [e + "\n" for e in expressions])
+        c = self.request(message, None, [], {},
+                         timeout=self._batch_timeout + self._batch_item_timeout * len(expressions))
+        c_state = self._pop_request_state(c)
+        if not self._request_state_is_success(c_state):
+            tlog("calculate_batch (with fail result) elapsed {}", time.time() - start_time)
+            return proto_failure("IO failed to transact data")
+        response = PM.parse(c_state["__message__"]).reply_data["value"]
+        if not isinstance(response, (list, tuple)):
+            response = response,
+        response = [line for r in response for line in r.split("\n") if line.strip() != ""]
+        tlog("calculate_batch elapsed {}", time.time() - start_time)
+        if len(response) != len(expressions):
+            return proto_failure("Expected {} results, got {}".format(len(expressions), len(response)))
+        return proto_success([self._parse_result(r) for r in response])
+
     def calculate(self, expression):
         """
         :param expression: string with expression to send to Calc App
@@ -66,40 +153,59 @@ class Calc(PlatformBase):
             except Exception as e:
                 result = "Platform {}: exception occurred on calculate: {}".format(self.name, e)
                 exprint()
-                tprint("calculate (with fail) elapsed {}".format(time.time() - start_time))
+                tlog("calculate (with fail) elapsed {}", time.time() - start_time)
                 return proto_failure(result, -2)
-            tprint("calculate elapsed {}".format(time.time() - start_time))
+            tlog("calculate elapsed {}", time.time() - start_time)
             return proto_success(result)
 
         # NOTE: mock code just ended here. To avoid nesting there is no else, just flat code
 
-        # TODO: optimize code - now it's way to hard (just send/receive and so much code!!!)
-        c = self.request(new_message(self._io_interface, "send", expression),
-                         None, [], {}, timeout=2.0)  # TODO: decrease timeout
-        c_state = self._pop_request_state(c)
-        if not self._request_state_is_success(c_state):
-            tprint("calculate (with fail result) elapsed {}".format(time.time() - start_time))
-            return proto_failure("IO failed to send data")
+        if self._io_transact:
+            c = self.request(new_message(self._io_interface, "transact", expression),
+                             None, [], {}, timeout=2.0)  # TODO: decrease timeout
+            c_state = self._pop_request_state(c)
+            if not self._request_state_is_success(c_state):
+                tlog("calculate (with fail result) elapsed {}", time.time() - start_time)
+                return proto_failure("IO failed to transact data")
+        else:
+            # TODO: optimize code - now it's way to hard (just send/receive and so much code!!!)
+            c = self.request(new_message(self._io_interface, "send", expression),
+                             None, [], {}, timeout=2.0)  # TODO: decrease timeout
+            c_state = self._pop_request_state(c)
+            if not self._request_state_is_success(c_state):
+                tlog("calculate (with fail result) elapsed {}", time.time() - start_time)
+                return proto_failure("IO failed to send data")
 
-        c = self.request(new_message(self._io_interface, "receive"),
-                         None, [], {}, timeout=2.0)  # TODO: decrease timeout
-        c_state = self._pop_request_state(c)
-        if not self._request_state_is_success(c_state):
-            tprint("calculate (with fail result) elapsed {}".format(time.time() - start_time))
-            return proto_failure("IO failed to receive response")
+            c = self.request(new_message(self._io_interface, "receive"),
+                             None, [], {}, timeout=2.0)  # TODO: decrease timeout
+            c_state = self._pop_request_state(c)
+            if not self._request_state_is_success(c_state):
+                tlog("calculate (with fail result) elapsed {}", time.time() - start_time)
+                return proto_failure("IO failed to receive response")
         # TODO: convert from string to number
-        tprint("calculate elapsed {}".format(time.time() - start_time))
+        tlog("calculate elapsed {}", time.time() - start_time)
         result = PM.parse(c_state["__message__"]).reply_data["value"]
         if isinstance(result, (list, tuple)):   # NOTE: softwarerunner returns list but stream_io returns single item
             result = result[0]
+        return proto_success(self._parse_result(result))
+
+    @staticmethod
+    def _parse_result(result):
+        """
+        Converts result that is received from Calc App into number
+        :param result: string with result
+        :return: int, float, complex or None
+        """
         if result.strip() == 'None':
-            result = None
-        else:
-            try:
-                result = int(result)
-            except ValueError:
-                result = float(result)
-        return proto_success(result)
+            return None
+        try:
+            return int(result)
+        except ValueError:
+            pass
+        try:
+            return float(result)
+        except ValueError:
+            return complex(result.strip())   # NOTE: i.e. power of negative number with fractional exponent
 
 
 class RootClass(Calc):
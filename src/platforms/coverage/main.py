@@ -1,4 +1,5 @@
 from core.platformix import PlatformBase
+from core.platformix_core import Tap
 from core.simple_logging import eprint
 
 
@@ -7,30 +8,53 @@ class Coverage(PlatformBase):
     Class for functional coverage gathering
     Implements core of coverage class and provides strictly defined interface
     All specifics are covered with worker instance (created on core start)
+    Messages are observed with a tap (see Tap), so coverage is gathered aside of stimulus
     """
 
-    def __init__(self, channel, interface, rules, rules_kwargs=None, **kwargs):
+    def __init__(self, channel, interface, rules, rules_kwargs=None, tap_capacity=1000, **kwargs):
+        """
+        :param channel: channel to gather coverage on
+        :param interface: interface to gather coverage on
+        :param rules: string with path to python's module with Coverage class which would actually gather coverage
+        :param rules_kwargs: dict with keyworded args for rules instantiation
+        :param tap_capacity: max amount of observed messages that are buffered before sampling
+        :param kwargs: kwargs to PlatformBase
+        """
         super(Coverage, self).__init__(**kwargs)
 
         self._channel = channel
         self._interface = interface
+        self._tap = None    # Tap that observes messages
         if rules_kwargs is None:
             rules_kwargs = {}
 
         lcls = {}
         try:
-            exec("from {} import Scoreboard as sb; cl = sb".format(rules), globals(), lcls)
+            exec("from {} import Coverage as cv; cl = cv".format(rules), globals(), lcls)
         except ModuleNotFoundError as e:
-            eprint("Rules module '{}' wasn't found for scoreboard {}!".format(rules, self.name))
+            eprint("Rules module '{}' wasn't found for coverage {}!".format(rules, self.name))
             raise e
         except ImportError as e:
-            eprint("Scoreboard unit wasn't found in rules module '{}' for scoreboard {}!".format(rules, self.name))
+            eprint("Coverage unit wasn't found in rules module '{}' for coverage {}!".format(rules, self.name))
             raise e
 
         self._rules = lcls["cl"](host=self, **rules_kwargs)
 
         self.subscribe("#coverage")
-        self.subscribe(self._channel)
+        if hasattr(self.farm, "add_tap"):
+            self._tap = Tap(self.name, self._observe, [(self._interface, None)], tap_capacity)
+            self.farm.add_tap(self._tap, self._channel)
+        else:
+            # NOTE: taps are not available within child process. Messages are observed as subscriber
+            self.subscribe(self._channel)
+
+    def flush(self):
+        """
+        Samples observed messages that are not sampled yet
+        :return: Nothing
+        """
+        if self._tap is not None:
+            self._tap.drain()
 
     @property
     def coverage(self):
@@ -39,7 +63,8 @@ class Coverage(PlatformBase):
         May be used to determine coverage percentage
         :return: tuple
         """
-        return self._rules.coverage()
+        self.flush()
+        return self._rules.coverage
 
     @property
     def coverage_data(self):
@@ -47,14 +72,33 @@ class Coverage(PlatformBase):
         Full coverage information
         :return: dict
         """
-        return self._rules.coverage_data()
+        self.flush()
+        return self._rules.details
+
+    def routes(self, channel):
+        routes = super(Coverage, self).routes(channel)
+        if self._tap is None and channel == self._channel:
+            routes.append((self._interface, None))
+        return routes
+
+    def _observe(self, records):
+        """
+        Tap's handler. Samples batch of observed messages
+        :param records: list of TapRecord
+        :return: Nothing
+        """
+        for context, message in records:
+            if context.channel == self._channel and context.interface == self._interface:
+                self._rules.receive_message(context, message)
 
     def receive_message(self, context, message):
         if not super(Coverage, self).receive_message(context, message):
             if context.channel == self._channel and context.interface == self._interface:
-                return self._rules.receive_message(context, message)
+                return self._rules.receive_message(context, message) is not False
             else:
                 return False
+        else:
+            return True
 
     # TODO: method to store/load statistics
 
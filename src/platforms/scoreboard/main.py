@@ -1,5 +1,5 @@
 from core.platformix import PlatformBase
-from core.platformix_core import PlatformMessage as PM
+from core.platformix_core import PlatformMessage as PM, Tap
 from core.simple_logging import eprint
 import copy
 
@@ -8,15 +8,18 @@ class Scoreboard(PlatformBase):
     """
     Implements core of scoreboard and provides strictly defined interface
     All specifics are covered with worker instance (specified as rules and created on core start)
+    Commands and responses are observed with a tap (see Tap), so they are checked aside of stimulus,
+    when transaction is ended or when tap's buffer is full
     """
 
-    def __init__(self, cmd, res, rules, rules_kwargs=None, clean_completed=False, **kwargs):
+    def __init__(self, cmd, res, rules, rules_kwargs=None, clean_completed=False, tap_capacity=1000, **kwargs):
         """
         :param cmd: dict with 'channel' and 'interface' to specify where commands are coming from
         :param res: dict with 'channel' and 'interface' to specify where responses are coming from
         :param rules: string with path to python's class which would actually handle cmmands and responses
         :param rules_kwargs: dict with keyworded args for rules instantiation
         :param clean_completed: cleanup completed commands data to free up memory
+        :param tap_capacity: max amount of observed messages that are buffered before check
         :param kwargs: kwargs to PlatformBase
         """
         super(Scoreboard, self).__init__(**kwargs)
@@ -27,6 +30,7 @@ class Scoreboard(PlatformBase):
         self._clean_completed = clean_completed
         self._cmd = cmd
         self._res = res
+        self._tap = None    # Tap that observes commands and responses
         if rules_kwargs is None:
             rules_kwargs = {}
 
@@ -51,20 +55,39 @@ class Scoreboard(PlatformBase):
         self._rules = lcls["cl"](host=self, **rules_kwargs)
 
         self.subscribe("#scoreboard")
-        self.subscribe(self._cmd["channel"])
+        channels = [self._cmd["channel"]]
         if self._cmd["channel"] != self._res["channel"]:
-            self.subscribe(self._res["channel"])
+            channels.append(self._res["channel"])
+        if hasattr(self.farm, "add_tap"):
+            # NOTE: single tap is used for both channels so responses are checked after their commands
+            self._tap = Tap(self.name, self._observe, [(self._cmd["interface"], None),
+                                                       (self._res["interface"], "__reply__")], tap_capacity)
+            for channel in channels:
+                self.farm.add_tap(self._tap, channel)
+        else:
+            # NOTE: taps are not available within child process. Messages are observed as subscriber
+            for channel in channels:
+                self.subscribe(channel)
 
     @property
     def clean_completed(self):
         return self._clean_completed
 
+    def flush(self):
+        """
+        Checks observed messages that are not checked yet
+        :return: Nothing
+        """
+        if self._tap is not None:
+            self._tap.drain()
+
     @property
     def scoreboard(self):
         """
         Scoreboard accumulated (summary) statistics including rules's specific data (rules_stats)
         :return: dict
         """
+        self.flush()
         stats = {
             "requests": self.commands,
             "responses": self.responses,
@@ -97,10 +120,11 @@ class Scoreboard(PlatformBase):
         Like: which commands were observed / not observed, on which there were errors, which are still in progress
         :return: dict
         """
+        self.flush()
         data = {
             "errors": copy.deepcopy(self.errors),
             "unhandled": copy.deepcopy(self.unhandled),
-            "queued_requests": copy.deepcopy(self.expected)
+            "queued_requests": copy.deepcopy({c.str: e for c, e in self.expected.items()})
         }
         if hasattr(self._rules, "details"):
             details = self._rules.details
@@ -108,17 +132,43 @@ class Scoreboard(PlatformBase):
                 data[record] = details[record]
         return data
 
+    def routes(self, channel):
+        routes = super(Scoreboard, self).routes(channel)
+        if self._tap is None:
+            if channel == self._cmd["channel"]:
+                routes.append((self._cmd["interface"], None))
+            if channel == self._res["channel"]:
+                routes.append((self._res["interface"], "__reply__"))
+        return routes
+
+    def _check(self, context, message):
+        """
+        Passes observed message to rules
+        :param context: messaging context
+        :param message: PlatformMessage instance
+        :return: True if message were accepted by rules, otherwise False
+        """
+        if context.channel == self._cmd["channel"] and context.interface == self._cmd["interface"]\
+                and not message.is_reply:
+            return self._rules.cmd(context, message)
+        elif context.channel == self._res["channel"] and context.interface == self._res["interface"]\
+                and message.is_reply:
+            return self._rules.response(context, message)
+        else:
+            return False
+
+    def _observe(self, records):
+        """
+        Tap's handler. Checks batch of observed messages
+        :param records: list of TapRecord
+        :return: Nothing
+        """
+        for context, message in records:
+            self._check(context, message)
+
     def receive_message(self, context, message):
         if not super(Scoreboard, self).receive_message(context, message):
-            message = PM.parse(message)
-            if context.channel == self._cmd["channel"] and context.interface == self._cmd["interface"]\
-                    and not message.is_reply:
-                return self._rules.cmd(context, message)
-            elif context.channel == self._res["channel"] and context.interface == self._res["interface"]\
-                    and message.is_reply:
-                return self._rules.response(context, message)
-            else:
-                return False
+            return self._check(context, PM.parse(message))
         else:
             return True
 
@@ -4,7 +4,7 @@ from core.platformix_core import PlatformMessage as PM
 from ip.sequencer.definitions import SequencerProtocol, SequencerWrapper
 from core.eval_sandbox import evaluate
 from .generators import *
-from core.simple_logging import tprint
+from core.simple_logging import tlog
 import time
 
 
@@ -96,15 +96,27 @@ class Sequencer(PlatformBase):
                                           "3 if there is no channel specification and " \
                                           "4 if there is channel specification"
             request_message = new_message(*expr_result)
+            self._relieve(channel, request_message)
             c = self.request(request_message,
                              None, [], {}, channel=channel, store_state=False)
             # NOTE: used default request handler (which just waits for success or failure reply)
-            tprint("sequencer {} request elapsed {}".format(self.name, time.time()-start_time))
+            tlog("sequencer {} request elapsed {}", self.name, time.time()-start_time)
             # TODO: option to treat request completed when specific message is passed by over special interface
             self._complete += 1
             self._remaining -= 1
         return proto_success({"breaked": runs != self._complete, "runs_completed": self._complete}, None)
 
+    def _relieve(self, channel, message):
+        """
+        Respects backpressure - holds next request while platforms that would receive it have full mailboxes
+        :param channel: channel's name. If None then parent's channel
+        :param message: request message
+        :return: Nothing
+        """
+        relieve = getattr(self._farm, "relieve", None)   # NOTE: farm within child process has none
+        if relieve is not None:
+            relieve(channel if channel is not None else "@{}".format(self.parent.name), message)
+
     def _do_break(self, context):
         # NOTE: make's sense only in threaded run or if among reactions to sequencer request would be sequencer break
         # NOTE: just for LOL - try to use sequencer to test sequencer
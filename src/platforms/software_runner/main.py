@@ -3,7 +3,7 @@ from core.platformix import PlatformBase
 from core.platformix_core import new_message, proto_success, proto_failure
 from ip.software_runner.definitions import SoftwareRunnerProtocol, SoftwareRunnerWrapper
 from core.eval_sandbox import evaluate
-from core.simple_logging import vprint, eprint, tprint, exprint
+from core.simple_logging import vprint, eprint, tlog, exprint
 
 import rpyc
 import time
@@ -114,22 +114,25 @@ class SoftwareRunner(PlatformBase):
         stop_failed = None
         try:
             if self._connection is not None:    # Check before proceeding as it can be emergency stop
+                # NOTE: app is external to the farm so it's waited on wall time, even if farm's clock is virtual
                 if self._exit_sequence is not None and len(self._exit_sequence) > 0:
                     self.rpyc_send(self._exit_sequence)
-                    exit_time = time.time() + self._stop_timeout
+                    exit_time = time.monotonic() + self._stop_timeout
                     forced_stop = False
                 else:
                     self._connection.root.stop("Stopped by intent of SoftwareRunner (_stop)", force=True)
-                    exit_time = time.time() + self._stop_timeout
+                    exit_time = time.monotonic() + self._stop_timeout
                     forced_stop = True
-                while self._connection.root.running and (not forced_stop or time.time() < exit_time):
+                while self._connection.root.running and (not forced_stop or time.monotonic() < exit_time):
                     if not self._connection.root.running:
                         break
-                    if time.time() >= exit_time and (not forced_stop):
+                    if time.monotonic() >= exit_time and (not forced_stop):
                         self._connection.root.stop("Forced to stop by intent of SoftwareRunner (_stop)", force=True)
-                        exit_time = time.time() + self._stop_timeout
+                        exit_time = time.monotonic() + self._stop_timeout
                         forced_stop = True
                         stop_failed = "Not stopped by stop sequence"
+                    time.sleep(0.01)
+                    self._farm.clock.waited(0.01)
                 if self._connection.root.running:
                     if stop_failed is not None:
                         stop_failed += ", "
@@ -193,7 +196,7 @@ class SoftwareRunner(PlatformBase):
             eprint("Platform {}: exception occurred during send: {}".format(self.name, e))
             exprint()
             return proto_failure("Failed to send due to exception {}".format(e), -2)
-        tprint("rpyc_send elapsed {}".format(time.time() - start_time))
+        tlog("rpyc_send elapsed {}", time.time() - start_time)
         return proto_success(None)
 
     def rpyc_receive(self, count=1, timeout=1.0):
@@ -229,7 +232,7 @@ class SoftwareRunner(PlatformBase):
             eprint("Platform {}: exception occurred during receive: {}".format(self.name, e))
             exprint()
             return proto_failure("Failed to receive due to exception {}".format(e), -2)
-        tprint("rpyc_receive elapsed {}".format(time.time() - start_time))
+        tlog("rpyc_receive elapsed {}", time.time() - start_time)
         if 0 < count != len(data):
             return proto_failure("Not all requested data were received")
             # TODO: need a way to return partially received data
@@ -238,6 +241,20 @@ class SoftwareRunner(PlatformBase):
         else:
             return proto_success(data)
 
+    def rpyc_transact(self, data, count=1, timeout=1.0):
+        """
+        Sends data to app via stdin and gets response that were sent by app via stdout
+        :param data: Data to send over stdin (see rpyc_send)
+        :param count: Amount of lines to receive (see rpyc_receive)
+        :param timeout: Time in seconds to wait for data
+        :return: True if data were sent and response were received successfully, otherwise - False.
+                 Response itself is contained in a reply to channel and it's list of strings
+        """
+        r = self.rpyc_send(data)
+        if not r.success:
+            return r
+        return self.rpyc_receive(count, timeout)
+
     def rpyc_log(self):
         if self._connection is None:
             return proto_failure("No connection. Ensure start is complete")
@@ -255,6 +272,9 @@ class SoftwareRunner(PlatformBase):
     def _receive(self, context, *args, **kwargs):
         return self.rpyc_receive(*args, **kwargs)
 
+    def _transact(self, context, *args, **kwargs):
+        return self.rpyc_transact(*args, **kwargs)
+
     def _log(self, context):
         return self.rpyc_log()
 
@@ -2,7 +2,7 @@ from core.platformix_core import PlatformMessage as PM
 from core.platformix import PlatformBase
 from core.platformix_core import new_message, proto_success, proto_failure
 from ip.stream_io.definitions import StreamIOProtocol, StreamIOWrapper
-from core.simple_logging import vprint, eprint, tprint, exprint
+from core.simple_logging import vprint, eprint, tlog, exprint
 from core.eval_sandbox import evaluate
 import time
 import socket
@@ -12,9 +12,10 @@ class TcpIO(PlatformBase):
     """
     Platform for interaction via TCP with anything you want
     """
+    framings = (None, "line", "length")
 
     def __init__(self, host=None, port=None, timeout=0.1, connect_timeout=10.0, mock=False, mock_eval=False,
-                 send_on_stop=None, **kwargs):
+                 send_on_stop=None, receive_buffer=65536, framing=None, **kwargs):
         """
         :param host: host to connect to. If None(default) then used host of parent's platform
         :param port: host's port to connect to
@@ -25,6 +26,15 @@ class TcpIO(PlatformBase):
         :param mock_eval: If True then Send data would be evaluated as expression and would be used
                           for reply on Receive request.
                           Otherwise Send data itself would be used for reply on Receive request
+        :param receive_buffer: initial size of receive buffer in bytes. Buffer is allocated once and is reused
+                               by receives. It's grown if more data are requested
+        :param framing: If None(default) then data are sent and received as a stream.
+                        Otherwise data are sent and received by frames, which are:
+                        * "line" - frames are delimited by new line ('\n')
+                        * "length" - frames are prefixed by their length (4 bytes, big endian)
+                        In framed mode each sent item is a frame, received data are lists of frames and
+                        receives are ended as soon as requested amount of frames is received, without waiting
+                        for socket timeout. Use tcp_transact to send multiple requests back to back
         :param kwargs: other params supported by PlatformBase
         """
         super(TcpIO, self).__init__(**kwargs)
@@ -35,6 +45,13 @@ class TcpIO(PlatformBase):
         self._timeout = timeout
         self._connect_timeout = connect_timeout
         self._close_sequence = send_on_stop
+        assert isinstance(receive_buffer, int) and receive_buffer > 0, "receive_buffer should be positive integer"
+        self._receive_buffer = bytearray(receive_buffer)
+        assert framing in self.framings, "Unknown framing '{}'. Expected one of {}".format(framing, self.framings)
+        self._framing = framing
+        self._received_start = 0    # Received data that aren't cut into frames yet are kept in receive buffer
+        self._received_end = 0      # between start and end
+        self._stale_frames = 0      # Amount of responses to timeouted transactions that should be dropped
 
         if mock:
             self._mock = []  # Set to empty list to mock conversation (use to eval system performance w/o external io)
@@ -70,17 +87,23 @@ class TcpIO(PlatformBase):
             eprint("Platform {} failed to start - can't get host".format(self.name))
             return proto_failure("Failed to start - can't get host")
         try:
-            timeout = time.time() + self._connect_timeout
+            # NOTE: app is external to the farm so waits for it are on wall time, even if farm's clock is virtual.
+            #       Farm's clock is told that time is passed
+            clock = self._farm.clock
+            timeout = time.monotonic() + self._connect_timeout
             while True:
                 try:
                     if self._mock is None:
                         self._sock = sock = socket.socket()
                         sock.connect((self._host, self._port))
                         sock.settimeout(self._timeout)
-                        break
+                        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Don't delay small requests
+                    break
                 except ConnectionRefusedError as e:
-                    if time.time() > timeout:
+                    if time.monotonic() > timeout:
                         raise e
+                    time.sleep(self._timeout)
+                    clock.waited(self._timeout)
         except Exception as e:
             self._sock = None
             eprint("Platform {} failed to start due to exception {}".format(self.name, e))
@@ -100,6 +123,7 @@ class TcpIO(PlatformBase):
                 if self._close_sequence is not None:
                     self.tcp_send(self._close_sequence)
                     time.sleep(self._timeout)
+                    self._farm.clock.waited(self._timeout)
                 self._sock.close()
         except Exception as e:
             eprint("Platform {} experienced exception on stop: {}".format(self.name, e))
@@ -111,7 +135,9 @@ class TcpIO(PlatformBase):
     def tcp_send(self, data):
         """
         Sends data to app via stdin
-        :param data: Data to send over stdin. Could be an item like str, bytearray or list/tuple of items
+        :param data: Data to send over stdin. Could be an item like str, bytes, bytearray, memoryview
+                     or list/tuple of items. Strings are encoded with UTF-8, binary items are sent as is.
+                     All items are sent at once with scatter-gather send
         :return: True if data were sent successfully, otherwise - False
         """
         start_time = time.time()
@@ -120,16 +146,22 @@ class TcpIO(PlatformBase):
         try:
             if not isinstance(data, (list, tuple)):
                 data = data,
-            for m in data:
-                if self._mock is None:
-                    if not isinstance(m, bytearray):
-                        if isinstance(m, str):
-                            m = m.encode('UTF-8')
-                        else:
-                            return proto_failure("Send data is expected to be a string, bytearray or "
-                                                 "list/tuple of strings and bytearrays")
-                    self._sock.sendall(m)
-                else:
+            if self._mock is None:
+                buffers = []
+                for m in data:
+                    if isinstance(m, str):
+                        m = m.encode('UTF-8')
+                    elif not isinstance(m, (bytes, bytearray, memoryview)):
+                        return proto_failure("Send data is expected to be a string, bytes, bytearray, memoryview "
+                                             "or list/tuple of them")
+                    if self._framing == "length":
+                        buffers.append(memoryview(m).nbytes.to_bytes(4, "big"))
+                    buffers.append(m)
+                    if self._framing == "line":
+                        buffers.append(b"\n")
+                self._send_buffers(buffers)
+            else:
+                for m in data:
                     try:
                         if self._mock_eval and isinstance(m, str):
                             r = evaluate(m)
@@ -142,17 +174,41 @@ class TcpIO(PlatformBase):
             eprint("Platform {} failed to send due to exception {}".format(self.name, e))
             exprint()
             return proto_failure("Failed to send due to exception {}".format(e), -2)
-        tprint("tcp_send elapsed {}".format(time.time() - start_time))
+        tlog("tcp_send elapsed {}", time.time() - start_time)
         return proto_success(None)
 
+    def _send_buffers(self, buffers):
+        """
+        Sends buffers with scatter-gather sendmsg calls, so buffers are neither copied nor joined
+        Falls back to sendall per buffer if sendmsg isn't available (i.e. on Windows)
+        :param buffers: list of bytes-like objects
+        :return: None
+        """
+        if not hasattr(self._sock, "sendmsg"):
+            for b in buffers:
+                self._sock.sendall(b)
+            return
+        buffers = [memoryview(b).cast('B') for b in buffers]
+        first = 0
+        while first < len(buffers):
+            # NOTE: amount of buffers per call is limited by system (IOV_MAX, usually 1024)
+            sent = self._sock.sendmsg(buffers[first:first + 1024])
+            while first < len(buffers) and sent >= len(buffers[first]):
+                sent -= len(buffers[first])
+                first += 1
+            if sent > 0:
+                buffers[first] = buffers[first][sent:]  # Partially sent buffer
+
     def tcp_receive(self, count=0, timeout=None, decode='UTF-8'):
         """
         Get's data that were sent by app via stdout
-        :param count: Amount of bytes to receive.
+        :param count: Amount of bytes to receive (amount of frames in framed mode).
                 set count to 0 to receive as much as possible, at least something
                 set count to -1 to receive as much as possible, but nothing is acceptable too
-        :param timeout: Time in seconds to wait for data. If None then TCP socket timeout is used
+        :param timeout: Time in seconds to wait for data. If None then TCP socket timeout is used.
+                In framed mode if None then waits until requested frames are received
         :param deoode: If not None then received data is decoded into string using specified decoder. Default: 'UTF-8'
+                       If None then binary data are returned as bytes
         :return: True if successfully received Data, otherwise - False. Data itself is contained in a reply to channel
                  and Data is list of strings
         """
@@ -163,45 +219,55 @@ class TcpIO(PlatformBase):
             return proto_failure("No connection. Ensure start is complete")
         try:
             if self._mock is not None:
-                data = self._mock.pop(0)
-            else:
-                data = bytearray()
-                if count < 1:
-                    recv_size = 1024
+                if len(self._mock) == 0 and count == -1:
+                    data = ""   # NOTE: nothing is acceptable, same as for real connection
                 else:
-                    recv_size = count
+                    data = self._mock.pop(0)
+            elif self._framing is not None:
+                data = self._receive_frames(count, timeout, decode)
+            else:
+                # NOTE: data are received straight into reusable buffer, without intermediate chunks
+                buffer = self._receive_buffer
+                if count > len(buffer):
+                    buffer = self._receive_buffer = bytearray(count)
+                view = memoryview(buffer)
+                size = 0
+                clock = self._farm.clock
                 if timeout is not None:
-                    timeout = time.time() + timeout
-                while len(data) < count or count == 0 or count == -1:
+                    timeout = time.monotonic() + timeout
+                while size < count or count == 0 or count == -1:
+                    if size == len(buffer):     # Receive as much as possible - grow buffer
+                        buffer = self._receive_buffer = buffer + bytearray(len(buffer))
+                        view = memoryview(buffer)
                     try:
-                        received = self._sock.recv(recv_size)
+                        received = self._sock.recv_into(view[size:count if count > 0 else len(buffer)])
                     except TimeoutError:
                         received = None
                     except socket.timeout:
                         received = None
 
                     if received is None:
+                        clock.waited(self._timeout)     # Socket's timeout is passed
                         if count < 0:
                             break
-                        if count == 0 and len(data) > 0:
+                        if count == 0 and size > 0:
                             break
                     else:
-                        data += received
+                        size += received
 
-                    if timeout is not None and time.time() > timeout:
+                    if timeout is not None and time.monotonic() > timeout:
                         break
 
-                    if count > 0:
-                        recv_size = count - len(data)
-
                 if decode is not None:
-                    data = data.decode(decode)
+                    data = str(view[:size], decode)
+                else:
+                    data = bytes(view[:size])
 
         except Exception as e:
             eprint("Platform {} failed to receive due to exception {}".format(self.name, e))
             exprint()
             return proto_failure("Failed to receive due to exception {}".format(e), -2)
-        tprint("rpyc_receive elapsed {}".format(time.time() - start_time))
+        tlog("rpyc_receive elapsed {}", time.time() - start_time)
         if 0 < count != len(data):
             return proto_failure("Not all requested data were received")
             # TODO: need a way to return partially received data
@@ -210,12 +276,135 @@ class TcpIO(PlatformBase):
         else:
             return proto_success(data)
 
+    def tcp_transact(self, data, timeout=None, decode='UTF-8'):
+        """
+        Sends requests back to back and receives a response for each of them. Requires framed mode
+        Responses are matched with requests by frames, so there is no waiting for socket timeout
+        :param data: Request or list/tuple of requests (see tcp_send). Each request is sent as a frame
+        :param timeout: Time in seconds to wait for responses. If None then waits until all responses are received
+        :param decode: If not None then responses are decoded into strings using specified decoder. Default: 'UTF-8'
+        :return: True if responses for all requests were received, otherwise - False.
+                 Data itself is list with a response for each request
+        """
+        start_time = time.time()
+        if self._framing is None and self._mock is None:
+            return proto_failure("Transactions require framed mode (see framing)")
+        if not isinstance(data, (list, tuple)):
+            data = data,
+        r = self.tcp_send(data)
+        if not r.success:
+            return r
+        if self._mock is not None:
+            return proto_success([self._mock.pop(0) for i in range(len(data))])
+        try:
+            responses = self._receive_frames(len(data), timeout, decode)
+        except Exception as e:
+            eprint("Platform {} failed to receive due to exception {}".format(self.name, e))
+            exprint()
+            return proto_failure("Failed to receive due to exception {}".format(e), -2)
+        tlog("tcp_transact elapsed {}", time.time() - start_time)
+        if len(responses) != len(data):
+            # NOTE: responses that would come later are dropped, so they won't be taken for responses to next requests
+            self._stale_frames += len(data) - len(responses)
+            return proto_failure("Not all responses were received")
+        return proto_success(responses)
+
+    def _receive_frames(self, count, timeout, decode):
+        """
+        Receives frames. Data that follow received frames are kept for next receives
+        :param count: Amount of frames to receive. If 0 then at least one frame is received.
+                      If -1 then frames that are available right away are received
+        :param timeout: Time in seconds to wait for frames. If None then waits until frames are received
+        :param decode: If not None then frames are decoded into strings using specified decoder
+        :return: list with received frames
+        """
+        frames = []
+        clock = self._farm.clock
+        if timeout is not None:
+            timeout = time.monotonic() + timeout
+        while True:
+            while count <= 0 or len(frames) < count:
+                frame = self._cut_frame(decode)
+                if frame is None:
+                    break
+                if self._stale_frames > 0:
+                    self._stale_frames -= 1
+                else:
+                    frames.append(frame)
+            if count > 0 and len(frames) == count or count == 0 and len(frames) > 0:
+                return frames
+            if not self._receive_more():
+                clock.waited(self._timeout)     # Socket's timeout is passed
+                if count < 0:
+                    return frames
+            if timeout is not None and time.monotonic() > timeout:
+                return frames
+
+    def _cut_frame(self, decode):
+        """
+        Cuts complete frame out of received data
+        :param decode: If not None then frame is decoded into string using specified decoder
+        :return: frame or None if there is no complete frame in received data
+        """
+        buffer = self._receive_buffer
+        start = self._received_start
+        end = self._received_end
+        if self._framing == "line":
+            last = buffer.find(b"\n", start, end)
+            if last < 0:
+                return None
+            self._received_start = last + 1
+        else:
+            if end - start < 4:
+                return None
+            last = start + 4 + int.from_bytes(buffer[start:start + 4], "big")
+            if last > end:
+                return None
+            start += 4
+            self._received_start = last
+        frame = memoryview(buffer)[start:last]
+        return str(frame, decode) if decode is not None else bytes(frame)
+
+    def _receive_more(self):
+        """
+        Receives available data into receive buffer, after data that were received already
+        :return: True if any data were received, False if socket timeout is passed
+        """
+        buffer = self._receive_buffer
+        start = self._received_start
+        end = self._received_end
+        if start > 0:   # Move data that aren't cut into frames yet to buffer's beginning
+            buffer[:end - start] = buffer[start:end]
+            end -= start
+            self._received_start = 0
+            self._received_end = end
+        if end == len(buffer):
+            buffer = self._receive_buffer = buffer + bytearray(len(buffer))
+        try:
+            received = self._sock.recv_into(memoryview(buffer)[end:])
+        except TimeoutError:
+            return False
+        except socket.timeout:
+            return False
+        if received == 0:
+            raise ConnectionError("Connection is closed by peer")
+        self._received_end += received
+        return True
+
     def _send(self, context, data):
         return self.tcp_send(data)
 
     def _receive(self, context, *args, **kwargs):
         return self.tcp_receive(*args, **kwargs)
 
+    def _transact(self, context, data, count=0, timeout=None, decode='UTF-8'):
+        if self._framing is not None and count == 0:
+            return self.tcp_transact(data, timeout, decode)
+        r = self.tcp_send(data)
+        if not r.success:
+            return r
+        return self.tcp_receive(count, timeout, decode)
+
 
 class RootClass(TcpIO):
     pass
@@ -41,6 +41,35 @@ Test options:
                   Argument value could be a string or quoted string. 
                   See NOTE below about values types conversion
 
+  -mt=<workers> - process platforms messages by pool of worker threads so
+                  platforms that are blocked on I/O won't hold others.
+                  Value is amount of worker threads. Optional, default is 4.
+
+  -aio  -  use asyncio driven platforms farm. Timeouts are event loop's timers
+           and transactions could be awaited (see TestEnv.transaction_async)
+
+  -vc   -  use virtual clock for timeouts. When platforms are idle while
+           replies are awaited time jumps straight to the nearest timeout,
+           so timeouts are reached instantly and reproducibly
+
+  -nf=<mode> - how protocols are sending intermediate notifies ("Calling ..."
+           before reply). "all" - every notify is sent (default), "coalesce"
+           - notifies that are followed by reply are dropped, "drop" - none
+           is sent. Platforms start/stop progress is always notified
+
+  -nd   -  don't pass requests directly to the platform that is the only
+           receiver on a channel (see PlatformsFarm.direct_call), send them
+           via channels instead
+
+  -mc=<capacity> - max amount of messages queued by each platform.
+           Unbounded by default
+
+  -mo=<policy> - what is done with request when platform's queue is full.
+           "block" - request is queued but sequencers and batches of
+           transactions are holding next requests (default), "reject" -
+           request is replied with failure, "drop_oldest" - oldest request
+           that isn't taken for processing yet is dropped
+
 Result output options:
 
   -re   -  report elapsed time in tests results.
@@ -60,6 +89,10 @@ Verbose output options:
            Could be specified with value False or 0 to turn off.
   -vt   -  turn on timestamps on verbose output
            Could be specified with value False or 0 to turn off.
+  -vb   -  buffer verbose output that is directed into file and write it
+           by background thread (see simple_logging.BufferedSink), so
+           platforms aren't held on file I/O.
+           Could be specified with value False or 0 to turn off.
   
 NOTE: Values conversion. 
 
@@ -82,6 +115,7 @@ if __name__ == '__main__':
     from core.simple_logging import vprint, eprint, exprint
     from core.testenv import TestEnv
     from core.testrunner import TestRunner
+    from core.platformix_core import pref
     import core.simple_logging as simple_logging
     import re
 
@@ -103,6 +137,7 @@ if __name__ == '__main__':
         'v': False,
         've': False,
         'vt': False,
+        'vb': False,
         're': False,
     }
     test_args = []                      # Test's positional args
@@ -210,9 +245,25 @@ if __name__ == '__main__':
                 if oval is None:
                     oval = ".log"
                 if oval != "":
-                    vf = ".log"
+                    vf = oval
                 else:
                     vf = sys.stdout
+            elif option == "mt":
+                pref.multithreading = True
+                if oval is not None:
+                    pref.worker_threads = int(oval)
+            elif option == "aio":
+                pref.asyncio = True
+            elif option == "vc":
+                pref.virtual_clock = True
+            elif option == "nf":
+                pref.notify = oval
+            elif option == "nd":
+                pref.direct_calls = False
+            elif option == "mc":
+                pref.mailbox_capacity = int(oval)
+            elif option == "mo":
+                pref.mailbox_overflow = oval
             elif option == "a":
                 val = try_parse(oval)
                 test_args.append(val)
@@ -229,12 +280,15 @@ if __name__ == '__main__':
                 print_help()
                 exit(0)
 
-    if isinstance(vf, str):
-        vf = open(vf, "w")
     start_stop = options['st']
     verbose = options['v']
     ve = options['ve']
     vt = options['vt']
+    if isinstance(vf, str):
+        if options['vb'] and verbose:
+            vf = simple_logging.BufferedSink(vf)
+        else:
+            vf = open(vf, "w")
     rel = options['re']
 
     if description is None:
@@ -259,14 +313,11 @@ if __name__ == '__main__':
         else:
             print(*args, **kwargs)
 
-    def my_vprint_no_verbose(*args, **kwargs):
-        pass    # NOTE: this method just does nothing as intended
-
     if not verbose:
         if vf != sys.stdout:
             vf.close()
         vf = None
-        simple_logging.vprint_worker = my_vprint_no_verbose
+        simple_logging.vprint_worker = simple_logging.no_print
     else:
         simple_logging.vprint_worker = my_vprint
         if ve:
@@ -293,7 +344,7 @@ if __name__ == '__main__':
                     farm_data.awaiting[i]["parent"], i))
             else:
                 eprint("{} is waiting someone: {}!".format(i, farm_data.awaiting[i]['wait']))
-        exit(-1)
+        do_exit(-1)
 
     # Build device tree:
     if verbose:
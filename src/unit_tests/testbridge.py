@@ -0,0 +1,144 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+
+import core.simple_logging as simple_logging
+from core.platformix_bridge import FarmBridge, _header
+from core.platformix_core import new_message
+from core.testenv import TestEnv
+
+
+calc_env = 'test_env:\n  - name: "bridged calc"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+front_env = 'test_env:\n  - name: "bridge front"\n    scoreboard:\n      - name: "calc_sb"\n' \
+            '        rules: "ip.arith.scoreboard_arith_all"\n' \
+            '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+            '        res:\n          channel: "@calc_if"\n          interface: "arith"\n'
+
+forbidden_calls = []
+
+
+def forbidden():
+    forbidden_calls.append(True)
+
+
+class Forbidden(object):
+    """
+    Refers to a function on unpickling
+    """
+
+    def __reduce__(self):
+        return forbidden, ()
+
+
+def make_env(description):
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=description)
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_calc(port, authkey):
+    """
+    Hosts mocked calc and serves it over bridge until connection is closed
+    """
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.eprint_worker = simple_logging.no_print
+    env = make_env(calc_env)
+    FarmBridge.listen(env.farm, port, ["@calc_if"], authkey, node=0).serve()
+
+
+def run_round_trip(operations):
+    """
+    Issues arith transactions to calc that is hosted by remote farm. Connection with wrong key is tried first
+    :return: tuple with True if wrong key were refused, results of operations and scoreboard's success count
+    """
+    authkey = os.urandom(16)
+    port = free_port()
+    server = multiprocessing.get_context("fork").Process(target=serve_calc, args=(port, authkey), daemon=True)
+    server.start()
+    env = make_env(front_env)
+    try:
+        FarmBridge.connect(env.farm, port, ["@calc_if"], os.urandom(16), node=1)
+        refused = False
+    except RuntimeError:
+        refused = True
+    bridge = FarmBridge.connect(env.farm, port, ["@calc_if"], authkey, node=1)
+    results = []
+    for i in range(operations):
+        r = env.transaction("@calc_if", new_message("arith", "sum", i, 1), more_info=True)
+        results.append(r["result"] is True and r["replies"]["calc_if"].reply_data["value"] == i + 1)
+    r = env.transaction("#scoreboard", new_message("platformix", "get", "scoreboard"), more_info=True)
+    checked = r["replies"]["calc_sb"].kwargs["scoreboard"]["success"]
+    env.stop_platforms()
+    bridge.close()
+    server.join(5.0)
+    return refused, results, checked
+
+
+def run_forbidden_frame():
+    """
+    Remote side sends frame that refers to a function after handshake
+    :return: tuple with True if connection were dropped and True if function were called
+    """
+    env = make_env(calc_env)
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        remote = socket.create_connection(server.getsockname())
+        local = server.accept()[0]
+    bridges = []
+    t = threading.Thread(target=lambda: bridges.append(FarmBridge(env.farm, local, ["@calc_if"], 0, 2)))
+    t.start()
+
+    def recv_frame():
+        size = _header.unpack(remote.recv(_header.size, socket.MSG_WAITALL))[0]
+        return pickle.loads(remote.recv(size, socket.MSG_WAITALL))
+
+    def send_frame(records):
+        data = pickle.dumps(records)
+        remote.sendall(_header.pack(len(data)) + data)
+
+    hello = recv_frame()[0]
+    send_frame([(hello[0], 1) + hello[2:]])
+    t.join(5.0)
+    bridge = bridges[0]
+    with contextlib.redirect_stderr(io.StringIO()):
+        send_frame([Forbidden()])
+        timeout = time.monotonic() + 5.0
+        while not bridge._closed and time.monotonic() < timeout:
+            time.sleep(0.01)
+    dropped = bridge._closed
+    bridge.close()
+    remote.close()
+    env.stop_platforms()
+    return dropped, len(forbidden_calls) > 0
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    refused, results, checked = run_round_trip(10)
+    print("round trip: wrong key refused {}, {} operations, {} checked by scoreboard".format(
+        refused, sum(results), checked))
+    assert refused, "Connection with wrong key should be refused"
+    assert len(results) == 10 and all(results), "All operations should succeed"
+    assert checked == 10, "Scoreboard should check all operations"
+
+    dropped, called = run_forbidden_frame()
+    print("forbidden frame: connection dropped {}, function called {}".format(dropped, called))
+    assert not called, "Frame shouldn't call anything"
+    assert dropped, "Connection should be dropped on malformed frame"
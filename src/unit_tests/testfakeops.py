@@ -0,0 +1,73 @@
+import contextlib
+import io
+
+import core.simple_logging as simple_logging
+from core.platformix_core import new_message, fake_op_message, proto_failure, PlatformMessage as PM
+from core.testenv import TestEnv
+
+
+calc_env = 'test_env:\n  - name: "fake ops"\n    calc:\n      - name: "calc_if"\n        mock: 1\n'
+
+
+def make_env():
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=calc_env)
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def run_operations(fake, operations):
+    """
+    Registers fake-op instruction on calc and issues arith operations
+    :param fake: fake-op instruction message (see fake_op_message)
+    :param operations: list of (channel, message) pairs
+    :return: list with True for each operation that were succeed and False for faked ones
+    """
+    env = make_env()
+    assert env.transaction("@calc_if", fake) is True, "Fake-op instruction wasn't registered"
+    results = [env.transaction(channel, message) for channel, message in operations]
+    env.stop_platforms()
+    return results
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+    simple_logging.eprint_worker = simple_logging.no_print
+
+    # NOTE: calc is subscribed to '#platforms' too, so it receives arith messages on both channels.
+    #       fake_op_message accepts single channel so instruction for multiple channels is made by hand
+    results = run_operations(
+        new_message("arith", "__testing__", "fake_next_op", {
+            "reply": proto_failure("Faked sum"), "on_channel": ["@calc_if", "#platforms"],
+            "on_message": new_message("arith", "sum", 1, 2), "after": 2}),
+        [("@calc_if", new_message("arith", "sum", 1, 2)),
+         ("#platforms", new_message("arith", "sum", 1, 2)),
+         ("@calc_if", new_message("arith", "sum", 3, 4)),
+         ("#platforms", new_message("arith", "sum", 1, 2))])
+    print("after counter shared between channels: {}".format(results))
+    assert results == [True, True, True, False], "Third matching operation on any channel should be faked"
+
+    # NOTE: template's fields that are None are not compared. Sender of template made by new_message is None
+    results = run_operations(
+        fake_op_message("arith", proto_failure("Faked op"), on_message=PM(None, "arith", None, (1, 2))),
+        [("@calc_if", new_message("arith", "sum", 2, 1)),
+         ("@calc_if", new_message("arith", "mult", 1, 2)),
+         ("@calc_if", new_message("arith", "sum", 1, 2))])
+    print("template without method: {}".format(results))
+    assert results == [True, False, True], "Any method with the same args should match template without method, once"
+
+    results = run_operations(
+        fake_op_message("arith", proto_failure("Faked sum"), on_message=new_message("arith", "sum", 1, 2).replace(
+            sender="other")),
+        [("@calc_if", new_message("arith", "sum", 1, 2))])
+    print("template with other sender: {}".format(results))
+    assert results == [True], "Operation of other sender shouldn't match template"
+
+    results = run_operations(
+        fake_op_message("arith", proto_failure("Faked sum"), on_message=new_message("arith", "sum", 1, 2)),
+        [("@calc_if", new_message("arith", "sum", 2, 1)),
+         ("@calc_if", new_message("arith", "sum", 1, 2))])
+    print("template with args: {}".format(results))
+    assert results == [True, False], "Only operation with the same args should match template with args"
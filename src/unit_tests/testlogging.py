@@ -0,0 +1,83 @@
+import os
+import tempfile
+import threading
+
+import core.simple_logging as simple_logging
+
+
+class Probe(object):
+    """
+    Counts it's formatting
+    """
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __format__(self, format_spec):
+        self.formatted += 1
+        return "probe"
+
+
+def run_lazy_logging(log):
+    """
+    Logs message with probe while output is off, then while it's on
+    :param log: vlog or tlog
+    :return: tuple with amount of probe's formatting while output is off and on and printed lines
+    """
+    printed = []
+    probe = Probe()
+    name = "vprint_worker" if log is simple_logging.vlog else "tprint_worker"
+    worker = getattr(simple_logging, name)
+    try:
+        setattr(simple_logging, name, simple_logging.no_print)
+        log("value {} of {name}", probe, name=name)
+        off = probe.formatted
+        setattr(simple_logging, name, lambda *args: printed.append(' '.join(args)))
+        log("value {} of {name}", probe, name=name)
+        on = probe.formatted - off
+    finally:
+        setattr(simple_logging, name, worker)
+    return off, on, printed
+
+
+def run_sink(writers, lines):
+    """
+    Writes lines into BufferedSink from multiple threads. Interval is long enough so lines are written on close
+    :return: list with lines of each writer as they were written into file
+    """
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        sink = simple_logging.BufferedSink(path, interval=60.0)
+
+        def writer(n):
+            for i in range(lines):
+                sink.write("{} {}\n".format(n, i))
+                if i == lines // 2:
+                    sink.flush()
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sink.close()
+        with open(path) as f:
+            written = [line.split() for line in f.read().splitlines()]
+    finally:
+        os.remove(path)
+    return [[int(i) for n, i in written if int(n) == w] for w in range(writers)]
+
+
+if __name__ == "__main__":
+    for log in (simple_logging.vlog, simple_logging.tlog):
+        off, on, printed = run_lazy_logging(log)
+        print("{}: formatted {} times while output is off, {} times while it's on: {}".format(
+            log.__name__, off, on, printed))
+        assert off == 0, "Message shouldn't be formatted while output is off"
+        assert on == 1 and len(printed) == 1 and printed[0].startswith("value probe of "), \
+            "Message should be formatted once while output is on"
+
+    written = run_sink(4, 10000)
+    print("sink: {} lines written".format(sum(len(w) for w in written)))
+    assert all(w == list(range(10000)) for w in written), "Each line should be written once and in order"
@@ -0,0 +1,60 @@
+import contextlib
+import io
+
+import core.simple_logging as simple_logging
+from core.platformix_core import pref, new_message
+from core.testenv import TestEnv
+
+
+stack_env = 'test_env:\n  - name: "mailboxes"\n    tcpio:\n      - name: "calc_tcpio"\n        port: 0\n' \
+            '        host: "127.0.0.1"\n        mock: 1\n        mock_eval: 1\n' \
+            '    calc:\n      - name: "calc_if"\n        platform: "calc_tcpio"\n        io_interface: "stream_io"\n'
+
+
+def run_batch(operations, capacity, policy):
+    """
+    Sends batch of arith transactions to calc all at once, ignoring backpressure
+    :return: tuple with list of replies of calc (None if there were no reply) and calc's mailbox stats
+    """
+    pref.direct_calls = False
+    pref.mailbox_capacity = capacity
+    pref.mailbox_overflow = policy
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            env = TestEnv(description=stack_env)
+            env.instantiate()
+            env.start_platforms()
+            calc = env.farm.expose_data().platforms["calc_if"]
+            env.farm.congested = lambda channel, message: False
+            r = env.transactions("@calc_if", [new_message("arith", "sum", i, 1) for i in range(operations)],
+                                 in_flight=None, more_info=True)
+            env.stop_platforms()
+    finally:
+        pref.direct_calls = True
+        pref.mailbox_capacity = None
+        pref.mailbox_overflow = "block"
+    return [replies.get("calc_if", None) for replies in r["replies"]], calc.mailbox_stats
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    replies, stats = run_batch(100, 8, "drop_oldest")
+    print("drop_oldest: {}".format(stats))
+    assert all(m is not None for m in replies), "Each request should be replied, dropped ones too"
+    survived = [i for i, m in enumerate(replies) if m.is_success]
+    assert survived == list(range(100 - 8, 100)), "Newest requests should survive, but survived {}".format(survived)
+    assert all(m.is_failure for m in replies[:100 - 8]), "Dropped requests should be replied with failure"
+    assert stats["dropped"] == 100 - 8 and stats["rejected"] == 0, "Unexpected mailbox stats {}".format(stats)
+    assert replies[-1].kwargs["value"] == 100, "Unexpected result {}".format(replies[-1].serialize())
+
+    replies, stats = run_batch(100, 8, "reject")
+    print("reject: {}".format(stats))
+    survived = [i for i, m in enumerate(replies) if m is not None and m.is_success]
+    assert survived == list(range(8)), "Oldest requests should survive, but survived {}".format(survived)
+    assert stats["rejected"] == 100 - 8 and stats["dropped"] == 0, "Unexpected mailbox stats {}".format(stats)
+
+    replies, stats = run_batch(100, None, "block")
+    print("unbounded: {}".format(stats))
+    assert all(m is not None and m.is_success for m in replies), "All requests should be completed"
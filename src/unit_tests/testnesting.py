@@ -0,0 +1,102 @@
+import contextlib
+import io
+import sys
+import time
+
+import core.simple_logging as simple_logging
+from core.platformix_core import pref, new_message, PlatformMessage as PM
+from core.testenv import TestEnv
+
+
+stack_env = 'test_env:\n  - name: "nesting"\n    tcpio:\n      - name: "calc_tcpio"\n        port: 0\n' \
+            '        host: "127.0.0.1"\n        mock: 1\n        mock_eval: 1\n' \
+            '    calc:\n      - name: "calc_if"\n        platform: "calc_tcpio"\n        io_interface: "stream_io"\n'
+
+
+def make_env():
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=stack_env)
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def run_callbacks(operations):
+    """
+    Calc waits for reply of it's parent (mocked TcpIO) while parent makes request back to calc (callback)
+    before replying. Callback should be served by calc within it's wait
+    :return: tuple with results of operations, results of callbacks and elapsed time
+    """
+    env = make_env()
+    tcpio = env.farm.expose_data().platforms["calc_tcpio"]
+    tcp_send = tcpio.tcp_send
+    callbacks = []
+
+    def send(data):
+        if "+" not in data:     # NOTE: callback itself is 'mult' so it's passed to app as is
+            return tcp_send(data)
+        c = tcpio.request(new_message("arith", "mult", 2, 3), None, [], {}, channel="@calc_if", timeout=1.0)
+        state = tcpio._pop_request_state(c)
+        callbacks.append(state is not None and tcpio._request_state_is_success(state)
+                         and PM.parse(state["__message__"]).reply_data["value"] == 6)
+        return tcp_send(data)
+
+    tcpio.tcp_send = send
+    start_time = time.perf_counter()
+    results = [env.transaction("@calc_if", new_message("arith", "sum", i, 1)) for i in range(operations)]
+    elapsed = time.perf_counter() - start_time
+    env.stop_platforms()
+    return results, callbacks, elapsed
+
+
+def run_batch(operations):
+    """
+    Sends batch of arith transactions to calc all at once. Calc makes request to it's parent for each operation
+    :return: tuple with result of batch and max stack depth within calc's handler
+    """
+    env = make_env()
+    calc = env.farm.expose_data().platforms["calc_if"]
+    calculate = calc.calculate
+    depth = [0]
+
+    def probe(*args, **kwargs):
+        f = sys._getframe()
+        d = 0
+        while f is not None:
+            d += 1
+            f = f.f_back
+        depth[0] = max(depth[0], d)
+        return calculate(*args, **kwargs)
+
+    calc.calculate = probe
+    r = env.transactions("@calc_if", [new_message("arith", "sum", i, 1) for i in range(operations)], in_flight=None)
+    env.stop_platforms()
+    return r["result"], depth[0]
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    for mode in ("sync", "multithreading", "asyncio"):
+        pref.asyncio = mode == "asyncio"
+        pref.multithreading = mode == "multithreading"
+        for direct_calls in (True, False):
+            pref.direct_calls = direct_calls
+            results, callbacks, elapsed = run_callbacks(10)
+            print("{} farm, callbacks, direct calls {}: {} operations, {} callbacks in {:.3f}s".format(
+                mode, direct_calls, sum(results), sum(callbacks), elapsed))
+            assert all(r is True for r in results), "All operations should succeed"
+            assert len(callbacks) == 10 and all(callbacks), "All callbacks should be served"
+            assert elapsed < 1.0, "Callbacks shouldn't be completed by timeout"
+
+        pref.direct_calls = False
+        result_100, depth_100 = run_batch(100)
+        result_1000, depth_1000 = run_batch(1000)
+        print("{} farm, batch: max stack depth {} for 100 operations, {} for 1000 operations".format(
+            mode, depth_100, depth_1000))
+        assert result_100 is True and result_1000 is True, "All operations should succeed"
+        assert depth_100 == depth_1000, "Stack depth shouldn't grow with amount of queued requests"
+        pref.direct_calls = True
+    pref.asyncio = False
+    pref.multithreading = False
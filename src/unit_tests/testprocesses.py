@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+
+import core.simple_logging as simple_logging
+from core.platformix_core import pref, new_message
+from core.platformix_process import PlatformProcess
+from core.testenv import TestEnv
+
+
+stack_env = 'test_env:\n  - name: "processes"\n' \
+            '    calc:\n      - name: "calc_if"\n        process: True\n        mock: 1\n'
+
+
+def run_transactions(operations):
+    """
+    Issues arith transactions to calc that is hosted by child process, then stops it
+    :return: tuple with results of operations, child's pid, True if platforms were stopped, True if child has exited
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=stack_env)
+        env.instantiate()
+        env.start_platforms()
+    calc = env.farm.expose_data().platforms["calc_if"]
+    assert isinstance(calc, PlatformProcess), "Platform should be hosted by child process"
+    results = []
+    for i in range(operations):
+        r = env.transaction("@calc_if", new_message("arith", "sum", i, 1), more_info=True)
+        results.append(r["result"] is True and r["replies"]["calc_if"].reply_data["value"] == i + 1)
+    env.stop_platforms()
+    stopped = env.farm.all_is_stopped
+    env.farm.close_processes()
+    return results, calc._process.pid, stopped, not calc._process.is_alive()
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    for mode in ("sync", "multithreading", "asyncio"):
+        pref.asyncio = mode == "asyncio"
+        pref.multithreading = mode == "multithreading"
+        results, pid, stopped, exited = run_transactions(10)
+        print("{} farm: {} of {} operations succeed within process {}".format(mode, sum(results), len(results), pid))
+        assert all(results), "All operations should succeed"
+        assert pid != os.getpid(), "Platform should be hosted by other process"
+        assert stopped, "Platform should be stopped"
+        assert exited, "Child process should exit"
+    pref.asyncio = False
+    pref.multithreading = False
@@ -0,0 +1,103 @@
+import contextlib
+import io
+
+import core.simple_logging as simple_logging
+from core.platformix_core import pref, new_message, CoverageRulesBase, Tap
+from core.testenv import TestEnv
+
+
+def observers_env(capacity):
+    return 'test_env:\n  - name: "taps"\n    calc:\n      - name: "calc_if"\n        mock: 1\n' \
+        '    scoreboard:\n      - name: "calc_sb"\n        rules: "ip.arith.scoreboard_arith_all"\n' \
+        '        tap_capacity: {0}\n' \
+        '        cmd:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+        '        res:\n          channel: "@calc_if"\n          interface: "arith"\n' \
+        '    coverage:\n      - name: "calc_cov"\n        rules: "unit_tests.testtaps"\n' \
+        '        tap_capacity: {0}\n        channel: "@calc_if"\n        interface: "arith"\n'.format(capacity)
+
+
+class Coverage(CoverageRulesBase):
+    """
+    Counts sampled operations
+    """
+
+    def __init__(self, host, **kwargs):
+        super(Coverage, self).__init__(host, **kwargs)
+        self._operations = 0
+
+    @property
+    def coverage(self):
+        return self._operations, 1
+
+    def receive_message(self, context, message):
+        if not message.is_reply:
+            self._operations += 1
+
+
+def make_env(capacity):
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=observers_env(capacity))
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def run_batch(operations, capacity):
+    """
+    Issues batch of arith transactions while messages are observed by taps of small capacity
+    :return: tuple with list of observed records, scoreboard's summary and amount of batches of tap
+    """
+    env = make_env(capacity)
+    records = []
+    tap = Tap("recorder", records.extend, [("arith", None)], capacity)
+    env.farm.add_tap(tap, "@calc_if")
+    r = env.transactions("@calc_if", [new_message("arith", "sum", i, 1) for i in range(operations)], in_flight=None)
+    assert r["result"] is True, "All operations should succeed"
+    scoreboard = env.farm.expose_data().platforms["calc_sb"].scoreboard
+    env.stop_platforms()
+    return records, scoreboard, tap.batches
+
+
+def run_flush():
+    """
+    Sends arith message without completing transaction, so observed messages stay buffered by taps
+    :return: tuple with scoreboard's and coverage's state before and after summary is requested
+    """
+    env = make_env(1000)
+    sb = env.farm.expose_data().platforms["calc_sb"]
+    cov = env.farm.expose_data().platforms["calc_cov"]
+    context, message = env._start_transaction("@calc_if", new_message("arith", "sum", 1, 2))
+    env.farm.send_message(context, message, processing=1)
+    env.farm.settle()
+    before = sb.success, cov._rules.coverage[0]
+    after = sb.scoreboard["success"], cov.coverage[0]
+    env.stop_platforms()
+    return before, after
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    for mode in ("sync", "multithreading", "asyncio"):
+        pref.asyncio = mode == "asyncio"
+        pref.multithreading = mode == "multithreading"
+        records, scoreboard, batches = run_batch(100, 7)
+        print("{} farm: {} records in {} batches, scoreboard {}".format(mode, len(records), batches, scoreboard))
+        commands = set()
+        for context, message in records:
+            if message.is_reply:
+                assert context.str in commands, "Response on {} is observed before command".format(context.str)
+            else:
+                commands.add(context.str)
+        assert len(commands) == 100, "All commands should be observed"
+        assert batches > 1, "Records should be delivered in batches"
+        assert scoreboard["success"] == 100 and scoreboard["errors"] == 0 and scoreboard["unhandled"] == 0, \
+            "Scoreboard should check response after command"
+    pref.asyncio = False
+    pref.multithreading = False
+
+    before, after = run_flush()
+    print("flush: scoreboard and coverage before summary {}, after {}".format(before, after))
+    assert before == (0, 0), "Messages shouldn't be checked before transaction is ended"
+    assert after == (1, 1), "Summary should check buffered messages"
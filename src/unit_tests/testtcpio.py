@@ -0,0 +1,165 @@
+import contextlib
+import io
+import socket
+import threading
+import time
+
+import core.simple_logging as simple_logging
+from core.testenv import TestEnv
+
+
+def tcpio_env(port, options):
+    return 'test_env:\n  - name: "tcpio"\n    tcpio:\n      - name: "app_tcpio"\n        host: "127.0.0.1"\n' \
+           '        port: {}\n        timeout: 0.1\n{}'.format(port, ''.join('        {}: {}\n'.format(k, v)
+                                                                        for k, v in options.items()))
+
+
+def app(handler):
+    """
+    Starts thread that accepts single connection and serves it with handler
+    :return: tuple with listening socket and it's port
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn = server.accept()[0]
+        with conn:
+            handler(conn)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server, server.getsockname()[1]
+
+
+def echo(conn):
+    while True:
+        data = conn.recv(65536)
+        if len(data) == 0:
+            return
+        conn.sendall(data)
+
+
+def lines(conn):
+    """
+    Replies on each line with line in upper case. Reply on 'slow' is delayed and reply on 'split' is sent in parts
+    """
+    pending = b""
+    while True:
+        data = conn.recv(65536)
+        if len(data) == 0:
+            return
+        pending += data
+        while b"\n" in pending:
+            line, pending = pending.split(b"\n", 1)
+            if line == b"slow":
+                time.sleep(0.5)
+            if line == b"split":
+                conn.sendall(b"SP")
+                time.sleep(0.2)     # NOTE: longer than socket's timeout
+                conn.sendall(b"LIT\nSPL")
+                time.sleep(0.2)
+                conn.sendall(b"IT\n")
+            else:
+                conn.sendall(line.upper() + b"\n")
+
+
+def lengths(conn):
+    """
+    Replies on any data with length prefixed frames. Frames and their prefixes are sent in parts
+    """
+    conn.recv(65536)
+    conn.sendall(b"\x00\x00")
+    time.sleep(0.2)
+    conn.sendall(b"\x00\x03abc\x00\x00\x00\x02d")
+    time.sleep(0.2)
+    conn.sendall(b"e")
+    conn.recv(65536)
+
+
+def run(handler, test, **options):
+    """
+    Starts TcpIO that is connected to app and calls test with it
+    :return: test's result
+    """
+    server, port = app(handler)
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=tcpio_env(port, options))
+        env.instantiate()
+        env.start_platforms()
+    try:
+        return test(env.farm.expose_data().platforms["app_tcpio"])
+    finally:
+        env.stop_platforms()
+        server.close()
+
+
+def stream_test(tcpio):
+    """
+    Sends items of all kinds at once and receives them into small receive buffer
+    :return: list of received data
+    """
+    result = []
+    r = tcpio.tcp_send(["abc", b"\x00\x01", bytearray(b"xy"), memoryview(b"z")])
+    assert r.success, "Send failed"
+    r = tcpio.tcp_receive(8, decode=None)
+    assert r.success, "Receive failed"
+    result.append(r.retval)
+    # NOTE: more buffers than system allows to send at once
+    r = tcpio.tcp_send([bytes([i % 256]) * 50 for i in range(2000)])
+    assert r.success, "Send failed"
+    r = tcpio.tcp_receive(2000 * 50, decode=None)
+    assert r.success, "Receive failed"
+    result.append(r.retval)
+    r = tcpio.tcp_send("text")
+    assert r.success, "Send failed"
+    r = tcpio.tcp_receive(0)
+    assert r.success, "Receive failed"
+    result.append(r.retval)
+    result.append(tcpio.tcp_send(12345).success)
+    return result
+
+
+def lines_test(tcpio):
+    """
+    Receives frames that are split across partial reads, then completes transaction by timeout
+    and makes next transaction while response to timeouted one is late
+    :return: list of received frames and results of transactions
+    """
+    result = []
+    assert tcpio.tcp_send("split").success, "Send failed"
+    r = tcpio.tcp_receive(2)
+    result.append(r.retval if r.success else None)
+    r = tcpio.tcp_transact(["one", "slow", "two"], timeout=0.2)
+    result.append(r.success)
+    r = tcpio.tcp_transact(["three", "four"])
+    result.append(r.retval if r.success else None)
+    return result
+
+
+def lengths_test(tcpio):
+    assert tcpio.tcp_send(b"go").success, "Send failed"
+    r = tcpio.tcp_receive(2)
+    return r.retval if r.success else None
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+    simple_logging.eprint_worker = simple_logging.no_print
+
+    mixed, large, text, wrong = run(echo, stream_test, receive_buffer=4)
+    print("stream: received {} bytes, {} bytes and '{}'".format(len(mixed), len(large), text))
+    assert mixed == b"abc\x00\x01xyz", "Unexpected data {}".format(mixed)
+    assert large == b"".join(bytes([i % 256]) * 50 for i in range(2000)), "Unexpected large data"
+    assert text == "text", "Unexpected text '{}'".format(text)
+    assert not wrong, "Send of data of unsupported type should fail"
+
+    split, timeouted, late = run(lines, lines_test, receive_buffer=4, framing="line")
+    print("line framing: split frames {}, timeouted transaction succeed {}, next transaction {}".format(
+        split, timeouted, late))
+    assert split == ["SPLIT", "SPLIT"], "Unexpected frames {}".format(split)
+    assert not timeouted, "Transaction should be failed by timeout"
+    assert late == ["THREE", "FOUR"], "Responses to timeouted transaction should be dropped, got {}".format(late)
+
+    split = run(lengths, lengths_test, receive_buffer=4, framing="length")
+    print("length framing: split frames {}".format(split))
+    assert split == ["abc", "de"], "Unexpected frames {}".format(split)
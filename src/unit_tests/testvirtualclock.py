@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import io
+import socket
+import threading
+import time
+
+import core.simple_logging as simple_logging
+from core.platformix_core import pref, new_message
+from core.testenv import TestEnv
+
+
+flat_env = 'test_env:\n  - name: "virtual clock"\n    platforms:\n      platformix:\n' \
+           '        - name: "p0"\n        - name: "p1"\n'
+
+late_app_env = 'test_env:\n  - name: "late app"\n    tcpio:\n      - name: "app_tcpio"\n        port: {}\n' \
+               '        host: "127.0.0.1"\n        connect_timeout: 5\n'
+
+
+def make_env(description):
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = TestEnv(description=description)
+        env.instantiate()
+        env.start_platforms()
+    return env
+
+
+def run_timeouts(mode, requests, timeout):
+    """
+    Sends requests that are never replied so they are completed by timeout
+    :return: tuple with requests states, elapsed real time and farm's time
+    """
+    env = make_env(flat_env)
+    p = env.farm.expose_data().platforms["p0"]
+    message = new_message("nosuch", "call")     # NOTE: p1 doesn't support interface so request is never replied
+    states = []
+
+    def run():
+        for i in range(requests):
+            c = p.request(message, None, [], {}, channel="@p1", timeout=timeout)
+            while p.waiting_reply_on(c, None):
+                env.farm.settle()
+                env.farm.clock.sleep(0.001)
+            states.append(p._pop_request_state(c))
+
+    async def run_async():
+        for i in range(requests):
+            states.append(await p.request_async(message, channel="@p1", timeout=timeout))
+
+    start_time = time.perf_counter()
+    if mode == "asyncio":
+        asyncio.run(run_async())
+    else:
+        run()
+    elapsed = time.perf_counter() - start_time
+    farm_time = env.farm.clock.now()
+    env.stop_platforms()
+    return states, elapsed, farm_time
+
+
+def run_late_app(delay):
+    """
+    Starts TcpIO while app starts listening after a delay
+    :return: tuple with True if TcpIO were started and elapsed real time
+    """
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+
+    def app():
+        time.sleep(delay)
+        server.listen(1)
+        server.accept()[0].close()
+
+    t = threading.Thread(target=app, daemon=True)
+    t.start()
+    start_time = time.perf_counter()
+    try:
+        env = make_env(late_app_env.format(server.getsockname()[1]))
+        started = env.farm.all_is_running
+        env.stop_platforms()
+    except AssertionError:
+        started = False
+    elapsed = time.perf_counter() - start_time
+    t.join(5.0)
+    server.close()
+    return started, elapsed
+
+
+if __name__ == "__main__":
+    simple_logging.vprint_worker = simple_logging.no_print
+    simple_logging.tprint_worker = simple_logging.no_print
+
+    pref.virtual_clock = True
+    for mode in ("sync", "multithreading", "asyncio"):
+        pref.asyncio = mode == "asyncio"
+        pref.multithreading = mode == "multithreading"
+        states, elapsed, farm_time = run_timeouts(mode, 5, 10.0)
+        print("{} farm: 5 requests timeouted in {:.3f}s, farm's time {:.3f}s".format(mode, elapsed, farm_time))
+        assert len(states) == 5 and all(s is not None and s["__success__"] is False for s in states), \
+            "All requests should be failed by timeout"
+        assert farm_time >= 5 * 10.0, "Farm's time should pass timeouts"
+        assert elapsed < 5.0, "Timeouts shouldn't take real time"
+    pref.asyncio = False
+    pref.multithreading = False
+
+    started, elapsed = run_late_app(1.0)
+    print("app listening after 1s: started {} in {:.3f}s".format(started, elapsed))
+    assert started, "App should be waited in real time"
+    assert elapsed >= 1.0, "App should be waited in real time"
+    pref.virtual_clock = False